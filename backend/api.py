@@ -3,48 +3,287 @@ ScheduGator Flask API Server
 Connects React frontend to Python backend (Gemma 3 + Solver)
 """
 
-from flask import Flask, request, jsonify
+from prefork import memory_usage, startup_phase, startup_report, format_report
+from flask import Flask, Response, g, request, jsonify
 from flask_cors import CORS
 import os
 import json
+import queue
+import threading
+import time
+from concurrent.futures import as_completed
+from datetime import date, datetime
 from dotenv import load_dotenv
 
 # Import our backend modules
-from brain import GemmaBrain
+from brain import GemmaBrain, search_cache_key
+from catalog import get_catalog
+from conflicts import conflict_report
+from export import TERM_END, TERM_START, build_ics, check_range
+from meetings import DAY_BITS, DAY_ORDER, PERIOD_LABELS, format_slot
 from search import search_catalog
-from solver_bridge import SolverBridge
+from solver_bridge import SOLVER_WORKERS, SolverBridge, get_solver_pool, after_fork as solver_after_fork
+from sessions import create_session_store, new_session_id
+from majors import MajorRegistry, major_code_from_context
+from tracing import add_span_listener, get_logger
+from http_cache import compressed_cache_stats, etag_for, init_app as init_http_cache, not_modified
+from singleflight import SingleFlight
+from ratelimit import Limiter, init_app as init_rate_limits
+import metrics
 import re
 
 # Load environment
 load_dotenv()
 
+log = get_logger("api")
+
 # Initialize Flask
 app = Flask(__name__)
-CORS(app)  # Enable CORS for React frontend
+CORS(app, expose_headers=['ETag'])  # Enable CORS for React frontend (ETag readable for conditional POSTs)
+init_http_cache(app)  # ETags, Cache-Control and compression (http_cache.py)
+
+# Everything built here is immutable after startup, so under gunicorn --preload
+# it is built once in the master and shared by the workers (gunicorn.conf.py)
+
+# Major requirements by code, with pre-encoded responses (reloaded when bucket_1.json changes)
+with startup_phase("majors"):
+    majors = MajorRegistry()
 
 # Initialize the AI brain and solver
-brain = GemmaBrain()
-solver = SolverBridge()
-
-# Load major requirements
-current_dir = os.path.dirname(os.path.abspath(__file__))
-bucket_path = os.path.join(current_dir, '..', 'data', 'bucket_1.json')
-with open(bucket_path, 'r') as f:
-    major_requirements = json.load(f)
-
-# Normalize critical tracking to required_courses if it was placed under gpa_gate
-for major in major_requirements:
-    gpa_gate = major.get('gpa_gate')
-    if isinstance(gpa_gate, dict) and 'critical_tracking' in gpa_gate:
-        gpa_critical = gpa_gate.pop('critical_tracking')
-        if gpa_critical is not None:
-            required_courses = major.setdefault('required_courses', {})
-            if 'critical_tracking' not in required_courses:
-                required_courses['critical_tracking'] = gpa_critical
+with startup_phase("catalog"):
+    get_catalog()
+with startup_phase("solver"):
+    solver = SolverBridge()
+with startup_phase("brain"):
+    brain = GemmaBrain(majors=majors)
+    brain.preload()
+
+# Identical searches and solves running at the same moment share one computation
+search_flight = SingleFlight("search")
+solve_flight = SingleFlight("solve")
+
+# Typed query-string parameters for GET /api/search
+SEARCH_INT_PARAMS = ('min_level', 'max_level', 'min_words', 'max_words')
+SEARCH_BOOL_PARAMS = ('is_ai', 'civicLiteracy', 'international', 'diversity')
+
+# Largest batch accepted by /api/generate-schedules
+MAX_SCHEDULE_BUNDLES = int(os.getenv('SCHEDUGATOR_MAX_SCHEDULE_BUNDLES', 500))
+
+# Most sections in one schedule export or conflict report
+MAX_SCHEDULE_SECTIONS = int(os.getenv('SCHEDUGATOR_MAX_SCHEDULE_SECTIONS', 200))
+
+# Seconds between keep-alive comments on idle chat streams
+SSE_KEEPALIVE_SECONDS = 15
+# Events buffered per chat stream before the turn waits for the client
+STREAM_QUEUE_SIZE = 256
+
+# Per-user conversation state (in-memory LRU, or SQLite shared across workers)
+session_store = create_session_store()
+
+
+def after_fork():
+    """Run in each worker forked from a preloaded master (gunicorn post_fork):
+    thread pools, model clients, SQLite connections and solver processes are
+    per-process, so they are recreated lazily here instead of inherited."""
+    brain.after_fork()
+    session_store.after_fork()
+    limiter.after_fork()
+    solver_after_fork()
+
+
+# ==================== METRICS ====================
+# Per-route latency here; per-stage timings from tracing spans (prompt_build,
+# model_call, tool_call, chat_turn...); solver stats from solver_bridge.
+
+add_span_listener(metrics.observe_span)
+
+
+def observe_request(route, method, status, seconds):
+    metrics.observe('http_request_duration_seconds', seconds, route=route, method=method, status=str(status))
+
+
+@app.before_request
+def _start_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def _time_request(response):
+    start = g.get('request_start')
+    if start is not None:
+        # The URL rule, not the path, so /api/major/<major_code> is one series
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        method, status = request.method, response.status_code
+        if response.is_streamed:
+            # Timed until the last chunk has been sent
+            response.call_on_close(lambda: observe_request(route, method, status, time.perf_counter() - start))
+        else:
+            observe_request(route, method, status, time.perf_counter() - start)
+    return response
+
+
+def _state_gauges():
+    index = get_catalog()
+    yield 'catalog_courses', len(index), {}
+    yield 'catalog_load_seconds', index.load_seconds, {}
+    yield 'sessions_active', len(session_store), {}
+    yield 'majors_loaded', len(majors), {}
+    for name, stats in _cache_stats():
+        yield 'cache_entries', stats['size'], {'cache': name}
+    for flight in (search_flight, solve_flight, brain.search_flight):
+        yield 'singleflight_in_flight', flight.stats()['in_flight'], {'group': flight.name}
+    yield 'chat_in_flight', limiter.chat_in_flight, {}
+    yield 'chat_concurrency_limit', limiter.chat_concurrency, {}
+    for phase, seconds in STARTUP['phases'].items():
+        yield 'startup_seconds', seconds, {'phase': phase}
+    for name, mb in memory_usage().items():
+        yield 'process_memory_bytes', mb * 1024 * 1024, {'kind': name[:-3]}
+
+
+def _cache_counters():
+    for name, stats in _cache_stats():
+        yield 'cache_hits_total', stats['hits'], {'cache': name}
+        yield 'cache_misses_total', stats['misses'], {'cache': name}
+        yield 'cache_evictions_total', stats['evictions'], {'cache': name}
+
+
+def _cache_stats():
+    caches = dict(brain.cache_stats(), compressed=compressed_cache_stats())
+    return [(name, stats) for name, stats in sorted(caches.items()) if stats]
+
+
+metrics.add_collector(_state_gauges)
+metrics.add_collector(_cache_counters, kind='counter')
+
+
+# Per-client rate limits and the chat concurrency limit (ratelimit.py).
+# Registered after the timer so rejected requests are timed too.
+limiter = Limiter()
+init_rate_limits(app, limiter)
+
+
+def _session_id(data, headers=None):
+    """Session id from the request body or X-Session-Id header; new sessions get a fresh id."""
+    headers = request.headers if headers is None else headers
+    session_id = (data or {}).get('session_id') or headers.get('X-Session-Id')
+    return str(session_id)[:64] if session_id else new_session_id()
+
+
+def _chat_args(data):
+    """process_input arguments for a chat request: message, major (resolved to its rules) and schedule."""
+    major_context = data.get('major')
+    major_code = data.get('major_code')
+    major_rules = None
+
+    if not major_code:
+        major_code = major_code_from_context(major_context)
+
+    if major_code:
+        major_rules = majors.rules(major_code)
+        if major_rules:
+            log.debug("📋 Found major_rules for %s", major_code)
+        else:
+            log.warning("⚠️ Major code '%s' not found in bucket_1.json", major_code)
+
+    return {
+        'text': data.get('message', ''),
+        'major_context': major_context,
+        'major_rules': major_rules,
+        'major_code': major_code,
+        'current_courses': data.get('current_courses', []),
+    }
+
+
+def _chat_response(response, session):
+    """/api/chat response body for process_input's answer: the display text,
+    the courses from its __COURSES_ADDED_ marker, and the session id."""
+    # Guard against empty tool_calls responses leaking to the UI
+    try:
+        parsed = json.loads(response)
+        if isinstance(parsed, dict) and parsed.get("tool_calls") == []:
+            response = (
+                "I can help with that. Please tell me your major and any preferences "
+                "(morning/evening, days off, AP/dual enrollment credits)."
+            )
+    except json.JSONDecodeError:
+        pass
+
+    # Extract courses added marker if present
+    added_courses = []
+    courses_marker_match = re.search(r'__COURSES_ADDED_(.+?)__COURSES_ADDED__', response)
+    if courses_marker_match:
+        try:
+            courses_json = courses_marker_match.group(1)
+            added_courses = json.loads(courses_json)
+            log.debug("✅ Extracted %d courses from response", len(added_courses))
+        except (json.JSONDecodeError, IndexError) as e:
+            log.warning("⚠️ Error parsing courses marker: %s", e)
+
+    # Strip the marker from the displayed text
+    response_display = re.sub(r'__COURSES_ADDED_.+?__COURSES_ADDED__', '', response).strip()
+
+    return {
+        'response': response_display,
+        'status': 'success',
+        'added_courses': added_courses,
+        'session_id': session.session_id
+    }
+
+
+def _schedule_args(data):
+    """(course codes, major rules) for a schedule request."""
+    major_code = data.get('major_code')
+    major_rules = majors.rules(major_code) if major_code else None
+    return data.get('courses', []), major_rules
+
+
+def _solve_key(course_codes, major_rules):
+    """Requests with the same course codes (any case) for the same major have the same schedule."""
+    return tuple(str(code).upper() for code in course_codes), (major_rules or {}).get('major_code')
+
+
+def _solve(course_codes, major_rules):
+    return solve_flight.do(_solve_key(course_codes, major_rules),
+                           solver.validate_and_solve, course_codes, major_rules)
+
+
+def _schedule_response(schedule):
+    """Response body for the solver's result (None when nothing fits)."""
+    if schedule is None:
+        return {
+            'success': False,
+            'error': 'No conflict-free schedule found',
+            'message': 'Try selecting fewer courses or courses with more available sections'
+        }
+
+    return {
+        'success': True,
+        'schedule': schedule,
+        'courses_scheduled': len(schedule),
+        'status': 'success'
+    }
+
+
+def _encoded_json(body, etag):
+    """Response for pre-encoded JSON; answers 304 when the client's ETag matches."""
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+
+def _sse(event):
+    """One Server-Sent Events frame; the event's type doubles as the SSE event name."""
+    return f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
 
 
 # ==================== ENDPOINTS ====================
 
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """This worker's metrics in Prometheus text format."""
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -53,7 +292,13 @@ def health_check():
         'services': {
             'brain': 'ready',
             'solver': 'ready',
-            'catalog_size': len(solver.catalog)
+            'catalog_size': len(solver.catalog),
+            'catalog_version': solver.index.version,
+            'sessions': len(session_store),
+            'caches': brain.cache_stats(),
+            'startup': STARTUP,
+            'memory': memory_usage(),
+            'coalescing': {flight.name: flight.stats() for flight in (search_flight, solve_flight, brain.search_flight)}
         }
     })
 
@@ -62,84 +307,161 @@ def health_check():
 def chat():
     """
     Main chat endpoint - sends user message to Gemma 3
-    Request: { "message": "Show me CS tracking courses", "major": "CPS - Engineering", "major_code": "CPS", "current_courses": [{code, name, classNum}, ...] }
-    Response: { "response": "...", "tool_used": "search_catalog", "added_courses": [...] }
+    Request: { "message": "Show me CS tracking courses", "major": "CPS - Engineering", "major_code": "CPS", "current_courses": [{code, name, classNum}, ...], "session_id": "..." }
+    Response: { "response": "...", "tool_used": "search_catalog", "added_courses": [...], "session_id": "..." }
+    The session id may also be sent as an X-Session-Id header; omit it to start a new session.
     """
     try:
         data = request.json
-        user_message = data.get('message', '')
-        major_context = data.get('major')
-        major_code = data.get('major_code')
-        current_courses = data.get('current_courses', [])
-        major_rules = None
+        chat_args = _chat_args(data)
+        user_message = chat_args['text']
 
-        if not major_code and isinstance(major_context, str) and major_context:
-            match = re.search(r"\(([A-Z]{2,4})\)", major_context)
-            if match:
-                major_code = match.group(1)
-            else:
-                token = major_context.split("-")[0].strip().upper()
-                if 2 <= len(token) <= 4 and token.isalpha():
-                    major_code = token
-
-        if major_code:
-            major_rules = next(
-                (m for m in major_requirements if m.get('major_code') == major_code),
-                None
-            )
-            if major_rules:
-                print(f"📋 Found major_rules for {major_code}: {len(json.dumps(major_rules))} chars")
-            else:
-                print(f"⚠️ Major code '{major_code}' not found in bucket_1.json")
-        
         if not user_message:
             return jsonify({'error': 'Message is required'}), 400
         
-        # Process through Gemma brain
-        response = brain.process_input(
-            user_message,
-            major_context=major_context,
-            major_rules=major_rules,
-            major_code=major_code,
-            current_courses=current_courses
-        )
-
-        # Guard against empty tool_calls responses leaking to the UI
-        try:
-            parsed = json.loads(response)
-            if isinstance(parsed, dict) and parsed.get("tool_calls") == []:
-                response = (
-                    "I can help with that. Please tell me your major and any preferences "
-                    "(morning/evening, days off, AP/dual enrollment credits)."
-                )
-        except json.JSONDecodeError:
-            pass
-        
-        # Extract courses added marker if present
-        added_courses = []
-        courses_marker_match = re.search(r'__COURSES_ADDED_(.+?)__COURSES_ADDED__', response)
-        if courses_marker_match:
-            try:
-                courses_json = courses_marker_match.group(1)
-                added_courses = json.loads(courses_json)
-                print(f"✅ Extracted {len(added_courses)} courses from response")
-            except (json.JSONDecodeError, IndexError) as e:
-                print(f"⚠️ Error parsing courses marker: {e}")
-        
-        # Strip the marker from the displayed text
-        response_display = re.sub(r'__COURSES_ADDED_.+?__COURSES_ADDED__', '', response).strip()
-        
-        return jsonify({
-            'response': response_display,
-            'status': 'success',
-            'added_courses': added_courses
-        })
-    
+        # Process through Gemma brain with this user's own history
+        session = session_store.get(_session_id(data))
+        response = brain.process_input(session=session, **chat_args)
+        session_store.save(session)
+
+        return jsonify(_chat_response(response, session))
+
     except Exception as e:
-        print(f"❌ Chat error: {e}")
+        log.exception("❌ Chat error: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/chat/stream', methods=['POST'])
+def chat_stream():
+    """
+    Streaming chat over Server-Sent Events. Same request body as /api/chat.
+    Events (each "data:" is JSON with an "event" field):
+        session        {"session_id"}
+        token          {"text"}                 answer text as the model produces it
+        tool_start     {"calls"}                tools about to run
+        tool_result    {"name", "parameters", "result"}
+        courses_added  {"courses"}              replaces the __COURSES_ADDED_ marker
+        done           {"text", "courses_added"}
+        error          {"message"}
+    Comment lines (": ping") are sent while waiting so proxies keep the connection open.
+    """
+    data = request.json or {}
+    chat_args = _chat_args(data)
+    if not chat_args['text']:
+        return jsonify({'error': 'Message is required'}), 400
+    session = session_store.get(_session_id(data))
+    events = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+    # Set when the client has gone (the server closes the generator below)
+    client_gone = threading.Event()
+
+    def put(event):
+        """Queue an event for the client; False once the client has gone."""
+        while not client_gone.is_set():
+            try:
+                events.put(event, timeout=1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run():
+        turn = brain.run_turn(session=session, **chat_args)
+        try:
+            # Checked between steps, so a closed stream makes no further model or tool calls
+            for event in turn:
+                if not put(event):
+                    log.debug("🔌 Chat stream client gone; stopping the turn")
+                    return
+            session_store.save(session)
+        except Exception as e:
+            log.exception("❌ Chat stream error: %s", e)
+            put({'event': 'error', 'message': str(e)})
+        finally:
+            turn.close()
+        put(None)
+
+    # The turn runs on its own thread so the response can send keep-alives between events
+    threading.Thread(target=run, name="chat-stream", daemon=True).start()
+
+    def generate():
+        try:
+            yield _sse({'event': 'session', 'session_id': session.session_id})
+            while True:
+                try:
+                    event = events.get(timeout=SSE_KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    yield ": ping\n\n"
+                    continue
+                if event is None:
+                    return
+                yield _sse(event)
+        finally:
+            # Also runs when the server closes the response early (client disconnected)
+            client_gone.set()
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',  # Tell nginx not to buffer the stream
+    })
+
+
+def _search_params(data):
+    """search_catalog arguments from a search request's JSON body."""
+    return {
+        'query': data.get('query'),
+        'queries': data.get('queries'),
+        'dept': data.get('dept'),
+        'min_level': data.get('min_level', 1000),
+        'max_level': data.get('max_level', 7000),
+        'is_ai': data.get('is_ai'),
+        'sort_by': data.get('sort_by'),
+        'quest': data.get('quest'),
+        'min_words': data.get('min_words'),
+        'max_words': data.get('max_words'),
+        'civicLiteracy': data.get('civicLiteracy', False),
+        'international': data.get('international', False),
+        'diversity': data.get('diversity', False),
+        'fields': data.get('fields'),
+        'section_fields': data.get('section_fields')
+    }
+
+
+def _query_string_data(args):
+    """GET /api/search query string as the equivalent JSON body."""
+    data = {}
+    for name, value in args.items():
+        if name in SEARCH_INT_PARAMS:
+            data[name] = int(value)
+        elif name in SEARCH_BOOL_PARAMS:
+            data[name] = value.lower() in ('1', 'true', 'yes')
+        elif name != 'queries':
+            data[name] = value
+    queries = [q for value in args.getlist('queries') for q in value.split(',') if q]
+    if queries:
+        data['queries'] = queries
+    return data
+
+
+def _search_response(params):
+    """Search results, or 304 when the client already has them. The ETag covers
+    the catalog version and the normalized parameters, so it is known before
+    the search runs."""
+    etag = etag_for(get_catalog().version, search_cache_key(params))
+    if not_modified(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+
+    results = search_flight.do(etag, search_catalog, **params)
+    response = jsonify({
+        'results': results,
+        'count': len(results),
+        'status': 'success'
+    })
+    response.set_etag(etag)
+    return response
+
+
 @app.route('/api/search', methods=['POST'])
 def search():
     """
@@ -153,36 +475,34 @@ def search():
         "sort_by": "asc",  // Optional: "asc", "desc", or omit
         "civicLiteracy": false,
         "international": false,
-        "diversity": false
+        "diversity": false,
+        "fields": "compact",  // Optional: preset name or list of course fields
+        "section_fields": ["classNum", "meetTimes"]  // Optional
     }
+    Sending the previous response's ETag as If-None-Match gets a 304 if nothing changed.
     """
     try:
-        data = request.json
-        
-        results = search_catalog(
-            query=data.get('query'),
-            queries=data.get('queries'),
-            dept=data.get('dept'),
-            min_level=data.get('min_level', 1000),
-            max_level=data.get('max_level', 7000),
-            is_ai=data.get('is_ai'),
-            sort_by=data.get('sort_by'),
-            quest=data.get('quest'),
-            min_words=data.get('min_words'),
-            max_words=data.get('max_words'),
-            civicLiteracy=data.get('civicLiteracy', False),
-            international=data.get('international', False),
-            diversity=data.get('diversity', False)
-        )
-        
-        return jsonify({
-            'results': results,
-            'count': len(results),
-            'status': 'success'
-        })
+        return _search_response(_search_params(request.json))
     
     except Exception as e:
-        print(f"❌ Search error: {e}")
+        log.exception("❌ Search error: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/search', methods=['GET'])
+def search_get():
+    """
+    Same search as POST with the parameters in the query string, so browsers and
+    proxies can cache and revalidate it:
+    GET /api/search?query=COP&min_level=3000&queries=COP,CIS&diversity=true&fields=code,name
+    """
+    try:
+        return _search_response(_search_params(_query_string_data(request.args)))
+
+    except ValueError as e:
+        return jsonify({'error': f'Invalid search parameter: {e}'}), 400
+    except Exception as e:
+        log.exception("❌ Search error: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -201,41 +521,288 @@ def generate_schedule():
     """
     try:
         data = request.json
-        course_codes = data.get('courses', [])
-        major_code = data.get('major_code')
+        course_codes, major_rules = _schedule_args(data)
         
         if not course_codes:
             return jsonify({'error': 'No courses provided'}), 400
         
-        print(f"🔧 Generating schedule for: {course_codes}")
-        
-        # Get major rules if provided
-        major_rules = None
-        if major_code:
-            major_rules = next(
-                (m for m in major_requirements if m['major_code'] == major_code),
-                None
-            )
+        log.debug("🔧 Generating schedule for: %s", course_codes)
         
         # Run the solver
-        schedule = solver.validate_and_solve(course_codes, major_rules)
-        
-        if schedule is None:
-            return jsonify({
-                'success': False,
-                'error': 'No conflict-free schedule found',
-                'message': 'Try selecting fewer courses or courses with more available sections'
-            }), 200
-        
-        return jsonify({
-            'success': True,
-            'schedule': schedule,
-            'courses_scheduled': len(schedule),
-            'status': 'success'
-        })
+        schedule = _solve(course_codes, major_rules)
+        return jsonify(_schedule_response(schedule))
     
     except Exception as e:
-        print(f"❌ Schedule generation error: {e}")
+        log.exception("❌ Schedule generation error: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+
+def _bundle_jobs(data):
+    """Unique (course codes, major rules, bundle indexes) jobs for a batch
+    request, plus each bundle's id. Raises ValueError for a malformed batch."""
+    bundles = data.get('bundles')
+    if not isinstance(bundles, list) or not bundles:
+        raise ValueError('bundles must be a non-empty list')
+    if len(bundles) > MAX_SCHEDULE_BUNDLES:
+        raise ValueError(f'At most {MAX_SCHEDULE_BUNDLES} bundles per request')
+
+    ids = []
+    jobs = {}
+    for index, bundle in enumerate(bundles):
+        if isinstance(bundle, list):
+            bundle = {'courses': bundle}
+        if not isinstance(bundle, dict) or not bundle.get('courses'):
+            raise ValueError(f'Bundle {index} has no courses')
+        course_codes, major_rules = _schedule_args({'major_code': data.get('major_code'), **bundle})
+        ids.append(bundle.get('id', index))
+        # Identical course lists for the same major are solved once
+        jobs.setdefault(_solve_key(course_codes, major_rules), (course_codes, major_rules, []))[2].append(index)
+    return list(jobs.values()), ids
+
+
+def _solve_jobs(jobs):
+    """Yield (job, schedule or exception) as each job finishes. Jobs fan out
+    over the solver worker processes unless there is only one (or workers
+    are disabled)."""
+    if SOLVER_WORKERS <= 0 or len(jobs) == 1:
+        for job in jobs:
+            try:
+                yield job, _solve(job[0], job[1])
+            except Exception as e:
+                yield job, e
+        return
+
+    pool = get_solver_pool()
+    futures = {pool.submit(job[0], job[1]): job for job in jobs}
+    for future in as_completed(futures):
+        try:
+            yield futures[future], future.result()
+        except Exception as e:
+            yield futures[future], e
+
+
+@app.route('/api/generate-schedules', methods=['POST'])
+def generate_schedules():
+    """
+    Solve many course lists in one request (a cohort, or alternative plans)
+    Request: {
+        "bundles": [
+            {"id": "alice", "courses": ["COP3502", "MAC2312"], "major_code": "CPS"},
+            ["COP3503", "MAC2313"]  // A bare list is just the courses
+        ],
+        "major_code": "CPS"  // Optional default for every bundle
+    }
+    Response: NDJSON, one line per bundle as soon as it is solved (not in request order), then a summary:
+        {"index": 0, "id": "alice", "success": true, "schedule": [...], "courses_scheduled": 2, "status": "success"}
+        {"done": true, "bundles": 2, "solved": 2, "seconds": 0.012}
+    """
+    try:
+        jobs, ids = _bundle_jobs(request.json or {})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    log.debug("🔧 Generating schedules for %d bundles (%d unique)", len(ids), len(jobs))
+
+    def generate():
+        start = time.perf_counter()
+        solved = 0
+        for (course_codes, major_rules, indexes), schedule in _solve_jobs(jobs):
+            if isinstance(schedule, Exception):
+                log.error("❌ Schedule generation error for %s: %s", course_codes, schedule)
+                body = {'success': False, 'error': str(schedule)}
+            else:
+                body = _schedule_response(schedule)
+                solved += len(indexes) if schedule is not None else 0
+            for index in indexes:
+                yield json.dumps({'index': index, 'id': ids[index], **body}) + "\n"
+        yield json.dumps({
+            'done': True,
+            'bundles': len(ids),
+            'solved': solved,
+            'seconds': round(time.perf_counter() - start, 3)
+        }) + "\n"
+
+    return Response(generate(), mimetype='application/x-ndjson', headers={
+        'X-Accel-Buffering': 'no',  # Deliver each line as it is solved
+    })
+
+
+def _class_nums(value):
+    """classNums from a JSON list or a comma-separated string. Raises ValueError."""
+    if isinstance(value, str):
+        value = [part for part in value.split(',') if part.strip()]
+    if not isinstance(value, list) or not value:
+        raise ValueError('class_nums must be a non-empty list')
+    if len(value) > MAX_SCHEDULE_SECTIONS:
+        raise ValueError(f'At most {MAX_SCHEDULE_SECTIONS} sections per schedule')
+    try:
+        return [int(class_num) for class_num in value]
+    except (TypeError, ValueError):
+        raise ValueError('class_nums must be numbers')
+
+
+def _compile_sections(class_nums):
+    """([(mask, course, section)], classNums not in the catalog), using the
+    solver's precompiled sections."""
+    compiled, not_found = [], []
+    for class_num in class_nums:
+        section = solver.compile_section(class_num)
+        if section is None:
+            not_found.append(class_num)
+        else:
+            compiled.append(section)
+    return compiled, not_found
+
+
+def _overlap_body(slot):
+    days, period_begin, period_end, minute_begin, minute_end = slot
+    return {
+        'days': [day for day in DAY_ORDER if days & DAY_BITS[day]],
+        'periods': [PERIOD_LABELS[period_begin], PERIOD_LABELS[period_end]],
+        'minutes': [minute_begin, minute_end] if minute_begin is not None else None,
+        'text': format_slot(slot),
+    }
+
+
+def _conflict_response(class_nums):
+    """Conflict report body for one schedule."""
+    compiled, not_found = _compile_sections(class_nums)
+
+    def describe(i):
+        _, course, section = compiled[i]
+        return {'classNum': section.get('classNum'), 'code': course['code']}
+
+    conflicts = conflict_report([(mask, section) for mask, _, section in compiled])
+    return {
+        'conflict_free': not conflicts,
+        'conflicts': [
+            {'sections': [describe(i), describe(j)], 'overlaps': [_overlap_body(slot) for slot in overlaps]}
+            for i, j, overlaps in conflicts
+        ],
+        'sections': len(compiled),
+        # No fixed meeting time (TBA, online): never in conflict
+        'unscheduled': [section.get('classNum') for mask, _, section in compiled if not mask],
+        'not_found': not_found,
+    }
+
+
+@app.route('/api/schedule/conflicts', methods=['POST'])
+def schedule_conflicts():
+    """
+    Every pair of sections in a schedule that meet at the same time, by the
+    same rule /api/generate-schedule uses
+    Request: { "class_nums": [12345, 23456] }
+         or: { "schedules": [{"id": "alice", "class_nums": [...]}, [...]] }  // Many at once
+    Response: {
+        "conflict_free": false,
+        "conflicts": [{"sections": [{"classNum": 12345, "code": "COP3502C"}, {...}],
+                       "overlaps": [{"days": ["M", "W"], "periods": ["3", "3"], "minutes": [575, 625], "text": "MW 3 (9:35-10:25)"}]}],
+        "sections": 2, "unscheduled": [], "not_found": []
+    }
+    The batch form answers {"reports": [{"index": 0, "id": "alice", ...}]}.
+    """
+    try:
+        data = request.json or {}
+        schedules = data.get('schedules')
+        if schedules is None:
+            return jsonify({**_conflict_response(_class_nums(data.get('class_nums'))), 'status': 'success'})
+
+        if not isinstance(schedules, list) or not schedules:
+            raise ValueError('schedules must be a non-empty list')
+        if len(schedules) > MAX_SCHEDULE_BUNDLES:
+            raise ValueError(f'At most {MAX_SCHEDULE_BUNDLES} schedules per request')
+        reports = []
+        for index, schedule in enumerate(schedules):
+            if isinstance(schedule, list):
+                schedule = {'class_nums': schedule}
+            if not isinstance(schedule, dict):
+                raise ValueError(f'Schedule {index} has no class_nums')
+            reports.append({'index': index, 'id': schedule.get('id', index),
+                            **_conflict_response(_class_nums(schedule.get('class_nums')))})
+        return jsonify({'reports': reports, 'status': 'success'})
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        log.exception("❌ Conflict report error: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/schedule/ics', methods=['GET', 'POST'])
+def schedule_ics():
+    """
+    Download a schedule as an iCalendar (.ics) file
+    GET /api/schedule/ics?class_nums=12345,23456&start=2026-01-12&end=2026-04-22&name=My%20Spring&tz=America/New_York
+    POST: the same parameters as JSON, class_nums as a list
+    Everything but class_nums is optional (default: the current term, campus time).
+    GET responses carry an ETag, so calendar apps subscribed to the URL get 304s.
+    """
+    try:
+        data = request.get_json(silent=True) if request.method == 'POST' else request.args
+        data = data or {}
+        class_nums = _class_nums(data.get('class_nums'))
+        start = date.fromisoformat(data['start']) if data.get('start') else None
+        end = date.fromisoformat(data['end']) if data.get('end') else None
+        check_range(start or TERM_START, end or TERM_END)
+        index = get_catalog()
+
+        etag = etag_for(index.version, class_nums, start, end, data.get('name'), data.get('tz'))
+        if not_modified(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+
+        compiled, not_found = _compile_sections(class_nums)
+        if not_found:
+            return jsonify({'error': 'Sections not found', 'not_found': not_found}), 404
+
+        # Stamped with the catalog build time, so the same ETag always has the same body
+        stamp = datetime.fromisoformat(index.stats['built_at'])
+        options = {'tz': data['tz']} if data.get('tz') else {}
+        body = build_ics([(course, section) for _, course, section in compiled],
+                         start, end, calendar_name=data.get('name'), stamp=stamp, **options)
+        response = Response(body, mimetype='text/calendar', headers={
+            'Content-Disposition': 'attachment; filename="schedugator-schedule.ics"',
+        })
+        response.set_etag(etag)
+        return response
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        log.exception("❌ Calendar export error: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/eligibility', methods=['POST'])
+def check_eligibility():
+    """
+    Check prerequisites without asking the model
+    Request: {
+        "completed": ["MAC2311", "COP3502C"],
+        "courses": ["MAC2312", "COP3503C", "COP3530"]
+    }
+    Response: {
+        "eligible": ["MAC2312", "COP3503C"],
+        "blocked": [{"code": "COP3530", "missing": ["COP3503", "COT3100"]}]
+    }
+    "missing" is the fewest courses that would unblock it (one side of an OR, not both).
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        completed = data.get('completed') or []
+        course_codes = data.get('courses') or []
+
+        if not course_codes:
+            return jsonify({'error': 'No courses provided'}), 400
+        if not isinstance(course_codes, list) or not isinstance(completed, list):
+            return jsonify({'error': 'completed and courses must be lists of course codes'}), 400
+
+        result = solver.check_eligibility(completed, course_codes)
+        return jsonify({**result, 'status': 'success'})
+
+    except Exception as e:
+        log.exception("❌ Eligibility error: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -243,32 +810,19 @@ def generate_schedule():
 def get_majors():
     """Get list of available majors from bucket_1.json"""
     try:
-        majors_list = [
-            {
-                'major_code': m['major_code'],
-                'college': m.get('college', 'Unknown'),
-                'total_credits': m.get('total_credits', 120)
-            }
-            for m in major_requirements
-        ]
-        
-        return jsonify({
-            'majors': majors_list,
-            'count': len(majors_list),
-            'status': 'success'
-        })
+        return _encoded_json(*majors.listing())
     
     except Exception as e:
-        print(f"❌ Majors error: {e}")
+        log.exception("❌ Majors error: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
 @app.route('/api/init-major', methods=['POST'])
 def init_major():
     """
-    Initialize major context on the brain (no chat message)
-    Request: { "major": "CPS - Engineering", "major_code": "CPS" }
-    Response: { "status": "initialized" }
+    Initialize major context for the caller's session (no chat message)
+    Request: { "major": "CPS - Engineering", "major_code": "CPS", "session_id": "..." }
+    Response: { "status": "initialized", "session_id": "..." }
     """
     try:
         data = request.json
@@ -277,28 +831,26 @@ def init_major():
         if not major_code:
             return jsonify({'error': 'major_code is required'}), 400
         
-        # Find major rules
-        major_rules = next(
-            (m for m in major_requirements if m.get('major_code') == major_code),
-            None
-        )
+        major = majors.get(major_code)
         
-        if major_rules:
-            # Set the brain's internal state but don't send a message
-            brain.last_major_code = major_code
-            brain.last_major_rules = major_rules
-            major_json = json.dumps(major_rules, ensure_ascii=True)
-            print(f"📋 ✅ Injecting full bucket_1 JSON for major: {major_code} ({len(major_json)} chars)")
+        if major:
+            # Set this session's major but don't send a message
+            session = session_store.get(_session_id(data))
+            session.last_major_code = major_code
+            session.last_major_rules = major.rules
+            session_store.save(session)
+            log.debug("📋 Session major set to %s", major_code)
             return jsonify({
                 'status': 'initialized',
                 'major_code': major_code,
-                'context_size': len(major_json)
+                'context_size': len(major.prompt_section),
+                'session_id': session.session_id
             })
         else:
             return jsonify({'error': f'Major {major_code} not found'}), 404
     
     except Exception as e:
-        print(f"❌ Init major error: {e}")
+        log.exception("❌ Init major error: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -307,30 +859,27 @@ def init_major():
 def get_major_details(major_code):
     """Get detailed requirements for a specific major"""
     try:
-        major = next(
-            (m for m in major_requirements if m['major_code'] == major_code.upper()),
-            None
-        )
+        major = majors.get(major_code)
         
         if not major:
             return jsonify({'error': f'Major {major_code} not found'}), 404
         
-        return jsonify({
-            'major': major,
-            'status': 'success'
-        })
+        return _encoded_json(major.body, major.etag)
     
     except Exception as e:
-        print(f"❌ Major details error: {e}")
+        log.exception("❌ Major details error: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
 # ==================== RUN SERVER ====================
 
+STARTUP = startup_report()
+log.info("🚀 API loaded in %s", format_report(STARTUP))
+
 if __name__ == '__main__':
     print("🐊 ScheduGator API Starting...")
     print(f"📚 Catalog loaded: {len(solver.catalog)} courses")
-    print(f"🎓 Majors available: {len(major_requirements)}")
+    print(f"🎓 Majors available: {len(majors)}")
     print(f"🔑 API Key: {'✅ Found' if os.getenv('GEMINI_API_KEY') else '❌ Missing'}")
     
     port = int(os.getenv('PORT', 5000))
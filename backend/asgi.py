@@ -0,0 +1,233 @@
+"""
+ScheduGator ASGI entry point
+
+    uvicorn asgi:app --app-dir backend --port 5000
+
+Under WSGI every /api/chat request holds a worker thread for the whole turn,
+which is mostly waiting on the model. Here the chat routes run on the event
+loop with GemmaBrain's async driver, so a waiting turn costs a coroutine
+rather than a worker:
+
+    POST /api/chat, /api/chat/stream   native async (same bodies and events as api.py)
+    POST /api/generate-schedule        solver on worker processes (SolverPool)
+    everything else                    the Flask app, on asgiref's thread pool
+
+SCHEDUGATOR_SOLVER_WORKERS sets the number of solver processes (default 2).
+The native routes have the same per-client rate limits as under Flask
+(ratelimit.py); chats are capped at SCHEDUGATOR_ASYNC_CHAT_CONCURRENCY
+(default 256) in flight, since here they don't hold threads.
+"""
+
+import asyncio
+import json
+import os
+import time
+
+from asgiref.wsgi import WsgiToAsgi
+
+import api
+import ratelimit
+from singleflight import SingleFlight
+from solver_bridge import SOLVER_WORKERS, get_solver_pool
+from tracing import get_logger
+
+log = get_logger("asgi")
+
+flask_app = WsgiToAsgi(api.app)
+
+# Identical schedule requests in flight on the loop share one solve
+solves = SingleFlight("solve_async")
+
+# Shares the Flask app's buckets; only the concurrency limit differs
+limiter = ratelimit.Limiter(store=api.limiter.store,
+                            chat_concurrency=int(os.getenv("SCHEDUGATOR_ASYNC_CHAT_CONCURRENCY", 256)))
+
+# Flask-CORS adds this to the Flask routes; preflight requests still go through Flask
+CORS_HEADERS = [(b"access-control-allow-origin", b"*")]
+
+
+class Headers:
+    """Case-insensitive .get over ASGI header pairs, enough for api._session_id."""
+
+    def __init__(self, raw):
+        self._headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in raw}
+
+    def get(self, name, default=None):
+        return self._headers.get(name.lower(), default)
+
+
+async def _read_json(receive):
+    body = b""
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return None
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+    try:
+        return json.loads(body or b"{}")
+    except json.JSONDecodeError:
+        return None
+
+
+async def _send_json(send, payload, status=200, headers=()):
+    body = json.dumps(payload).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+                   + CORS_HEADERS + [(k.lower().encode(), v.encode()) for k, v in headers],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def chat(data, headers, send):
+    chat_args = api._chat_args(data)
+    if not chat_args['text']:
+        return await _send_json(send, {'error': 'Message is required'}, 400)
+    try:
+        session = await asyncio.to_thread(api.session_store.get, api._session_id(data, headers))
+        response = await api.brain.aprocess_input(session=session, **chat_args)
+        await asyncio.to_thread(api.session_store.save, session)
+    except Exception as e:
+        log.exception("❌ Chat error: %s", e)
+        return await _send_json(send, {'error': str(e)}, 500)
+    await _send_json(send, api._chat_response(response, session))
+
+
+async def chat_stream(data, headers, receive, send):
+    chat_args = api._chat_args(data)
+    if not chat_args['text']:
+        return await _send_json(send, {'error': 'Message is required'}, 400)
+    session = await asyncio.to_thread(api.session_store.get, api._session_id(data, headers))
+    events = asyncio.Queue()
+
+    async def run():
+        try:
+            async for event in api.brain.arun_turn(session=session, **chat_args):
+                await events.put(event)
+            await asyncio.to_thread(api.session_store.save, session)
+        except Exception as e:
+            log.exception("❌ Chat stream error: %s", e)
+            await events.put({'event': 'error', 'message': str(e)})
+        await events.put(None)
+
+    async def watch_disconnect():
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+    # The turn runs as its own task so keep-alives can be sent between events
+    # and a client that goes away cancels it
+    turn = asyncio.create_task(run())
+    disconnect = asyncio.create_task(watch_disconnect())
+    disconnect.add_done_callback(lambda _: turn.cancel())
+    try:
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"text/event-stream"), (b"cache-control", b"no-cache"),
+                        (b"x-accel-buffering", b"no")] + CORS_HEADERS,
+        })
+        frame = api._sse({'event': 'session', 'session_id': session.session_id})
+        while frame is not None:
+            await send({"type": "http.response.body", "body": frame.encode("utf-8"), "more_body": True})
+            # Wait for the next event, a disconnect or the keep-alive, whichever
+            # comes first: the server drops sends after a disconnect without
+            # raising, so the loop has to notice it here
+            next_event = asyncio.ensure_future(events.get())
+            done, _ = await asyncio.wait({next_event, disconnect}, timeout=api.SSE_KEEPALIVE_SECONDS,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if next_event not in done:
+                next_event.cancel()
+                if disconnect in done:
+                    return
+                frame = ": ping\n\n"
+                continue
+            event = next_event.result()
+            frame = api._sse(event) if event is not None else None
+        await send({"type": "http.response.body", "body": b""})
+    finally:
+        disconnect.cancel()
+        turn.cancel()
+
+
+async def generate_schedule(data, send):
+    course_codes, major_rules = api._schedule_args(data)
+    if not course_codes:
+        return await _send_json(send, {'error': 'No courses provided'}, 400)
+    try:
+        schedule = await solves.ado(api._solve_key(course_codes, major_rules),
+                                    get_solver_pool().validate_and_solve, course_codes, major_rules)
+    except Exception as e:
+        log.exception("❌ Schedule generation error: %s", e)
+        return await _send_json(send, {'error': str(e)}, 500)
+    await _send_json(send, api._schedule_response(schedule))
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            # Start the solver workers now rather than on the first schedule request
+            get_solver_pool()
+            log.info("🚀 ASGI app ready (%d solver workers)", SOLVER_WORKERS)
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            get_solver_pool().shutdown()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+NATIVE_ROUTES = {"/api/chat", "/api/chat/stream", "/api/generate-schedule"}
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await lifespan(receive, send)
+    if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in NATIVE_ROUTES:
+        return await flask_app(scope, receive, send)
+
+    # Same latency histogram as the Flask routes (api.observe_request)
+    start = time.perf_counter()
+    status = 500
+
+    async def send_timed(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        await send(message)
+
+    try:
+        await native(scope, receive, send_timed)
+    finally:
+        api.observe_request(scope["path"], "POST", status, time.perf_counter() - start)
+
+
+async def native(scope, receive, send):
+    headers = Headers(scope["headers"])
+    release = None
+    if ratelimit.ENABLED:
+        kind = "solve" if scope["path"] == "/api/generate-schedule" else "chat"
+        client = ratelimit.client_address((scope.get("client") or (None,))[0], headers.get("x-forwarded-for"))
+        release, retry_after = limiter.admit(client, kind)
+        if release is None:
+            body, status, extra = ratelimit.too_many_requests(retry_after)
+            return await _send_json(send, body, status, extra.items())
+    try:
+        await route(scope, headers, receive, send)
+    finally:
+        if release is not None:
+            release()
+
+
+async def route(scope, headers, receive, send):
+    data = await _read_json(receive)
+    if not isinstance(data, dict):
+        return await _send_json(send, {'error': 'Request body must be a JSON object'}, 400)
+    if scope["path"] == "/api/chat":
+        await chat(data, headers, send)
+    elif scope["path"] == "/api/chat/stream":
+        await chat_stream(data, headers, receive, send)
+    else:
+        await generate_schedule(data, send)
@@ -1,17 +1,117 @@
+import asyncio
+import contextvars
+import hashlib
 import json
 import os
 import re
-from google import genai
-from google.genai import types
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from search import search_catalog
+from catalog import get_catalog, normalize_text
+from cache import TTLCache
+from sessions import ChatSession
+from singleflight import SingleFlight
+from compaction import compact_course, fit_tool_results, request_type, requested_fields
+from llm import create_provider
+from majors import prompt_section
+from toolcalls import EMPTY_TOOL_CALLS_RE, extract_tool_calls, strip_code_fences
+import metrics
+from tracing import get_logger, lazy, span, start_trace
 
 load_dotenv()
 
-# --- GEMMA 3 SETUP ---
-# Gemma 3 27B is best for local/agentic tasks
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
-MODEL_ID = "gemma-3-27b-it"
+log = get_logger("brain")
+
+# Threads for running one turn's independent tool calls concurrently
+TOOL_WORKERS = int(os.getenv("SCHEDUGATOR_TOOL_WORKERS", 8))
+
+# L1 search_catalog cache (keyed on catalog version, so a new catalog never serves stale results)
+SEARCH_CACHE_SIZE = int(os.getenv("SCHEDUGATOR_SEARCH_CACHE_SIZE", 2048))
+SEARCH_CACHE_TTL = float(os.getenv("SCHEDUGATOR_SEARCH_CACHE_TTL", 3600))
+# L2 answer cache. Opt-in: a hit replays an earlier answer without looking at
+# this conversation's history, which suits repeated catalog questions only.
+ANSWER_CACHE_ENABLED = os.getenv("SCHEDUGATOR_ANSWER_CACHE", "0") == "1"
+ANSWER_CACHE_SIZE = int(os.getenv("SCHEDUGATOR_ANSWER_CACHE_SIZE", 512))
+ANSWER_CACHE_TTL = float(os.getenv("SCHEDUGATOR_ANSWER_CACHE_TTL", 900))
+
+
+# search_catalog flags whose default is False (is_ai=False is a filter: non-AI courses only)
+SEARCH_FALSE_DEFAULTS = ("civicLiteracy", "international", "diversity")
+
+
+def search_cache_key(params):
+    """Canonical form of search_catalog parameters: defaults dropped, case-insensitive fields folded."""
+    params = dict(params)
+    if isinstance(params.get("query"), list):
+        params["queries"], params["query"] = params["query"], None
+    normalized = {}
+    for name, value in params.items():
+        if value is None or value == "" or value == [] or (value is False and name in SEARCH_FALSE_DEFAULTS):
+            continue
+        if name == "query":
+            value = str(value).lower()
+        elif name == "queries" and isinstance(value, list):
+            value = [str(q).lower() for q in value]
+        elif name in ("dept", "quest"):
+            values = value if isinstance(value, list) else [value]
+            value = [normalize_text(v) for v in values]
+        normalized[name] = value
+    return json.dumps(normalized, sort_keys=True, default=str)
+
+
+def normalize_message(text):
+    """Case, whitespace and trailing punctuation don't change the question."""
+    return " ".join(text.casefold().split()).strip(" ?!.")
+
+
+def schedule_fingerprint(current_courses):
+    """Order-independent digest of the sections already on the student's schedule."""
+    entries = sorted(f"{c.get('code')}:{c.get('classNum')}" for c in current_courses or [])
+    return hashlib.sha1("|".join(entries).encode("utf-8")).hexdigest()[:16]
+
+COURSES_MARKER_RE = re.compile(r'__COURSES_ADDED_(.*?)__COURSES_ADDED__', re.DOTALL)
+# Streaming pauses at the first character that may start tool JSON, a code fence or the marker
+STREAM_HOLD_RE = re.compile(r'[{`]|__')
+ELECTIVES_RE = re.compile(r'\b(technical\s+)?electives?\b', re.IGNORECASE)
+SEARCH_TRIGGER_RE = re.compile(
+    r'\b(search|find|look for|show me sections|what sections|any sections|do it for real)\b', re.IGNORECASE
+)
+COURSE_CODE_RE = re.compile(r'\b([A-Z]{2,4}\d{3,4}[A-Z]?)\b', re.IGNORECASE)
+
+
+class ModelCall:
+    """Turn step: one model round-trip, performed by the driver."""
+
+    __slots__ = ('prompt', 'system_prompt', 'purpose', 'stream')
+
+    def __init__(self, prompt, system_prompt=None, purpose="initial", stream=False):
+        self.prompt = prompt
+        self.system_prompt = system_prompt
+        self.purpose = purpose
+        self.stream = stream
+
+
+class ModelReply:
+    """Driver's answer to a ModelCall: full text, and how much of it was already streamed."""
+
+    __slots__ = ('text', 'streamed')
+
+    def __init__(self, text, streamed=0):
+        self.text = text
+        self.streamed = streamed
+
+
+class RunTools:
+    """Turn step: execute a batch of tool calls; the driver sends back tool_results."""
+
+    __slots__ = ('calls', 'session')
+
+    def __init__(self, calls, session):
+        self.calls = calls
+        self.session = session
+
 
 # Define the specialized Gemma system prompt
 GEMMA_SYSTEM_PROMPT = """
@@ -105,108 +205,83 @@ Available Functions:
 """
 
 class GemmaBrain:
-    def __init__(self):
-        # We use a standard chat session but handle the tool calls manually
-        self.chat = client.chats.create(model=MODEL_ID)
-        self.last_major_code = None
-        self.last_major_context = None
-        self.last_major_rules = None  # Store major rules for reuse
-        self.recent_messages = []
+    def __init__(self, provider=None, majors=None):
+        # Model backend (Gemini client, or the scripted stand-in for load tests).
+        # We send standalone prompts and handle the tool calls manually.
+        self.provider = provider or create_provider()
+        # Optional MajorRegistry whose prebuilt prompt sections are used for its own rules
+        self.majors = majors
+        # Conversation state lives in per-user ChatSessions; this one is only
+        # used when process_input is called without a session (CLI/tests)
+        self.default_session = ChatSession("default")
         self.max_history = 4
-        # Path to the catalog
-        self.catalog_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'universal_base_catalog.json')
-    def _compact_course(self, course):
-        compact = {
-            "code": course.get("code"),
-            "name": course.get("name"),
-            "dept": course.get("dept"),
-            "credits": course.get("credits"),
-            "description": course.get("description"),
-            "prereqs": course.get("prereqs")
+        # major_code -> (major_rules, rendered system prompt)
+        self._system_prompts = {}
+        self._prompt_lock = threading.Lock()
+        self._tools = {
+            "search_catalog": self.search_catalog_tool,
+            "add_course": self.add_course_tool,
+        }
+        # Shared by all requests; tool calls are short, CPU-light lookups
+        self._tool_pool = ThreadPoolExecutor(max_workers=TOOL_WORKERS, thread_name_prefix="tool")
+        # L1: search_catalog results; L2 (opt-in): whole answers for repeated questions
+        self._search_cache = TTLCache(maxsize=SEARCH_CACHE_SIZE, ttl=SEARCH_CACHE_TTL)
+        # Concurrent misses for the same search run it once
+        self.search_flight = SingleFlight("chat_search")
+        self.answer_cache = TTLCache(maxsize=ANSWER_CACHE_SIZE, ttl=ANSWER_CACHE_TTL) if ANSWER_CACHE_ENABLED else None
+
+    def preload(self):
+        """Before fork (gunicorn --preload): import the model SDK once for all workers."""
+        self.provider.preload()
+
+    def after_fork(self):
+        """In a forked worker: the parent's tool threads don't exist here and
+        its model client must not be shared, so both are recreated lazily."""
+        self._tool_pool = ThreadPoolExecutor(max_workers=TOOL_WORKERS, thread_name_prefix="tool")
+        self.provider.after_fork()
+
+    def cache_stats(self):
+        """Size and hit rate of the search and answer caches."""
+        return {
+            "search": self._search_cache.stats(),
+            "answer": self.answer_cache.stats() if self.answer_cache is not None else None,
         }
-
-        sections = course.get("sections")
-        if isinstance(sections, list):
-            compact_sections = []
-            for section in sections[:3]:
-                instructors = section.get("instructors")
-                instructor = None
-                if isinstance(instructors, list) and instructors:
-                    instructor = ", ".join(instructors)
-
-                section_credits = section.get("credits")
-                if compact.get("credits") is None and section_credits is not None:
-                    compact["credits"] = section_credits
-
-                compact_sections.append({
-                    "section": section.get("section") or section.get("classNum"),
-                    "instructor": instructor,
-                    "credits": section_credits,
-                    "sectWeb": section.get("sectWeb"),
-                    "meetTimes": section.get("meetTimes")
-                })
-            compact["sections"] = compact_sections
-            compact["sections_count"] = len(sections)
-
-        return compact
 
     def _build_system_prompt_with_major(self, major_rules=None):
-        """Build full system prompt including current major's requirements.
+        """Full system prompt including the current major's requirements, memoized per major.
         This ensures major rules are always in the system prompt, not as context messages."""
-        prompt = GEMMA_SYSTEM_PROMPT
-        
-        if major_rules:
-            major_code = major_rules.get("major_code", "Unknown")
-            required_courses = major_rules.get("required_courses", {})
-            critical_tracking = required_courses.get("critical_tracking", []) if isinstance(required_courses, dict) else []
-            technical_electives = major_rules.get("technical_electives", {})
-            gpa_gate = major_rules.get("gpa_gate", {})
-            semester_plan = major_rules.get("semester_plan", [])
-            
-            # Build the GOLD rules section for this specific major
-            major_section = f"\n--- ACTIVE MAJOR REQUIREMENTS: {major_code} ---\n"
-            
-            if critical_tracking:
-                major_section += f"CRITICAL TRACKING COURSES (Gold Rules for {major_code}):\n"
-                major_section += f"These must be completed early and are GPA gates: {', '.join(critical_tracking)}\n"
-            
-            if gpa_gate:
-                critical_min = gpa_gate.get("critical_tracking_min")
-                uf_min = gpa_gate.get("uf_cumulative_min")
-                if critical_min or uf_min:
-                    major_section += f"GPA GATES: "
-                    gates = []
-                    if critical_min:
-                        gates.append(f"Critical Tracking min={critical_min}")
-                    if uf_min:
-                        gates.append(f"UF Cumulative min={uf_min}")
-                    major_section += ", ".join(gates) + "\n"
-            
-            if isinstance(technical_electives, dict) and technical_electives:
-                total_req = technical_electives.get("total_required", 0)
-                if total_req:
-                    major_section += f"TECHNICAL ELECTIVES: Must complete {total_req} credit hours from approved list\n"
-            
-            if semester_plan:
-                major_section += f"SUGGESTED SEQUENCE: {len(semester_plan)} semesters planned\n"
-            
-            # Add the full major rules as JSON for reference
-            major_json = json.dumps(major_rules, indent=2, ensure_ascii=True)
-            major_section += f"\nFull Major Requirements (JSON):\n{major_json}\n"
-            
-            prompt += major_section
-        
+        if not major_rules:
+            return GEMMA_SYSTEM_PROMPT
+
+        major_code = major_rules.get("major_code")
+        # Rules straight from the registry come with their section prebuilt
+        major = self.majors.get(major_code) if self.majors is not None else None
+        if major is not None and major.rules is major_rules:
+            return GEMMA_SYSTEM_PROMPT + major.prompt_section
+
+        cached = self._system_prompts.get(major_code)
+        # Same dict (registry) or equal rules (e.g. reloaded from a session store)
+        if cached and (cached[0] is major_rules or cached[0] == major_rules):
+            return cached[1]
+
+        prompt = self._render_system_prompt(major_rules)
+        with self._prompt_lock:
+            self._system_prompts[major_code] = (major_rules, prompt)
         return prompt
 
-    def _send_prompt(self, prompt):
-        chat = client.chats.create(model=MODEL_ID)
-        return chat.send_message(prompt)
+    def _render_system_prompt(self, major_rules):
+        if not major_rules:
+            return GEMMA_SYSTEM_PROMPT
+        return GEMMA_SYSTEM_PROMPT + prompt_section(major_rules)
+
+    def _send_prompt(self, prompt, system_prompt=None):
+        return self.provider.send(prompt, system_prompt=system_prompt)
 
-    def _build_history_block(self):
-        if not self.recent_messages:
+    def _build_history_block(self, session):
+        if not session.recent_messages:
             return ""
         lines = []
-        for role, content in self.recent_messages[-self.max_history:]:
+        for role, content in list(session.recent_messages)[-self.max_history:]:
             label = "User" if role == "user" else "Assistant"
             lines.append(f"{label}: {content}")
         return "\n".join(lines) + "\n"
@@ -214,67 +289,9 @@ class GemmaBrain:
     def _extract_tool_calls_with_preamble(self, text):
         """Extract JSON tool calls and preamble text from a response.
         Returns tuple: (calls, preamble_text)
-        preamble_text is everything before the first JSON object.
+        preamble_text is everything before the first tool call.
         """
-        try:
-            parsed = json.loads(text)
-            print(f"✅ JSON Parsed successfully. Type: {type(parsed)}")
-            
-            if isinstance(parsed, dict):
-                print(f"   Dict keys: {list(parsed.keys())}")
-                # If dict has "tool_calls" key, unwrap and return the actual call list
-                if "tool_calls" in parsed:
-                    tool_calls_list = parsed.get("tool_calls")
-                    print(f"   Found 'tool_calls' key with {len(tool_calls_list)} items")
-                    if tool_calls_list == []:
-                        return None, text
-                    print(f"   ✅ Returning unwrapped tool_calls list: {len(tool_calls_list)} calls")
-                    return tool_calls_list, ""
-                # Otherwise return the dict as a single call (shouldn't happen, but keep for compatibility)
-                print(f"   No 'tool_calls' key, wrapping dict as single call")
-                return [parsed], ""
-            if isinstance(parsed, list):
-                print(f"   Parsed as list with {len(parsed)} items")
-                return parsed, ""
-        except json.JSONDecodeError as e:
-            print(f"❌ JSON parse failed: {e}")
-            pass
-
-        calls = []
-        stack = []
-        first_json_start = None
-        
-        for i, ch in enumerate(text):
-            if ch == '{':
-                if not stack and first_json_start is None:
-                    first_json_start = i
-                stack.append(i)
-            elif ch == '}' and stack:
-                start = stack.pop()
-                if stack:
-                    continue
-                chunk = text[start:i + 1]
-                if '"name"' not in chunk and '"tool_calls"' not in chunk:
-                    continue
-                try:
-                    call = json.loads(chunk)
-                    if isinstance(call, dict) and "tool_calls" in call:
-                        tool_calls_list = call.get("tool_calls") or []
-                        if tool_calls_list:
-                            calls.extend(tool_calls_list)
-                    elif isinstance(call, list):
-                        calls.extend(call)
-                    else:
-                        calls.append(call)
-                except json.JSONDecodeError:
-                    continue
-
-        # Extract preamble (everything before first JSON)
-        preamble = ""
-        if first_json_start is not None and first_json_start > 0:
-            preamble = text[:first_json_start].strip()
-        
-        return (calls if calls else None, preamble)
+        return extract_tool_calls(text)
 
     def _extract_tool_calls(self, text):
         """Extract JSON tool calls from a response that may contain extra text."""
@@ -336,7 +353,21 @@ class GemmaBrain:
 
         return "Requirements summary: " + "; ".join(parts)
 
-    def search_catalog_tool(
+    def search_catalog_tool(self, **params):
+        """search_catalog tool with results cached per catalog version and normalized parameters (L1)."""
+        key = (get_catalog().version, search_cache_key(params))
+        result = self._search_cache.get(key)
+        if result is not None:
+            metrics.increment("search_cache_lookups_total", result="hit")
+            return result
+        metrics.increment("search_cache_lookups_total", result="miss")
+        result = self.search_flight.do(key, self._search_catalog, **params)
+        # Cached results are shared between turns; nothing downstream mutates them
+        if result.get("status") == "success":
+            self._search_cache.set(key, result)
+        return result
+
+    def _search_catalog(
         self,
         query=None,
         queries=None,
@@ -369,8 +400,11 @@ class GemmaBrain:
                         "Use course codes or 3-letter prefixes like 'COP', 'MAC', or 'PHY'."
                     )
                 }
+        # Only send course fields the filters asked about
+        fields = requested_fields({"dept": dept, "quest": quest, "min_words": min_words,
+                                   "max_words": max_words, "is_ai": is_ai})
         if queries and isinstance(queries, list):
-            print(f"🔍 Executing tool: search_catalog(queries={queries}, {dept=}, {min_level=}, {max_level=}, {is_ai=}, {sort_by=}, {quest=}, {min_words=}, {max_words=}, {civicLiteracy=}, {international=}, {diversity=})")
+            log.debug("🔍 search_catalog(queries=%s, dept=%s, min_level=%s, max_level=%s)", queries, dept, min_level, max_level)
             batched = []
             for q in queries:
                 results = search_catalog(
@@ -387,11 +421,11 @@ class GemmaBrain:
                     international=international or False,
                     diversity=diversity or False,
                 )
-                compact = [self._compact_course(course) for course in results]
+                compact = [compact_course(course, fields) for course in results]
                 batched.append({"query": q, "results": compact, "count": len(compact)})
             return {"results": batched, "status": "success"}
 
-        print(f"🔍 Executing tool: search_catalog({query=}, {dept=}, {min_level=}, {max_level=}, {is_ai=}, {sort_by=}, {quest=}, {min_words=}, {max_words=}, {civicLiteracy=}, {international=}, {diversity=})")
+        log.debug("🔍 search_catalog(query=%s, dept=%s, min_level=%s, max_level=%s)", query, dept, min_level, max_level)
         results = search_catalog(
             query=query,
             dept=dept,
@@ -406,51 +440,362 @@ class GemmaBrain:
             international=international or False,
             diversity=diversity or False,
         )
-        compact = [self._compact_course(course) for course in results]
+        compact = [compact_course(course, fields) for course in results]
         return {"results": compact, "count": len(compact), "status": "success"}
 
     def add_course_tool(self, classNum):
         """Add a single course section by class number"""
-        print(f"➕ Executing tool: add_course(classNum={classNum})")
+        log.debug("➕ add_course(classNum=%s)", classNum)
         
         try:
             classNum = int(classNum)
         except (TypeError, ValueError):
             return {"status": "error", "message": f"classNum must be an integer, got {classNum}"}
         
-        # Load catalog
-        with open(self.catalog_path, 'r') as f:
-            catalog = json.load(f)
-        
-        # Find the section by classNum
-        for course in catalog:
-            for section in course.get("sections", []):
-                if section.get("classNum") == classNum:
-                    # Found it! Return course data
-                    course_data = {
-                        "code": course.get("code"),
-                        "name": course.get("name"),
-                        "instructors": section.get("instructors", []),
-                        "credits": section.get("credits", 0),
-                        "classNum": classNum,
-                        "meetTimes": section.get("meetTimes", []),
-                        "dept": course.get("dept", "")
-                    }
-                    print(f"✅ Found section: {course_data['code']} classNum={classNum}")
-                    return {
-                        "status": "success",
-                        "course": course_data,
-                        "message": f"Added {course.get('code')} section {classNum}"
-                    }
+        # Find the section by classNum (O(1) via the precomputed classNum index)
+        course, section = get_catalog().find_section(classNum)
+        if section is not None:
+            # Found it! Return course data
+            course_data = {
+                "code": course.get("code"),
+                "name": course.get("name"),
+                "instructors": section.get("instructors", []),
+                "credits": section.get("credits", 0),
+                "classNum": classNum,
+                "meetTimes": section.get("meetTimes", []),
+                "dept": course.get("dept", "")
+            }
+            log.debug("✅ Found section: %s classNum=%s", course_data['code'], classNum)
+            return {
+                "status": "success",
+                "course": course_data,
+                "message": f"Added {course.get('code')} section {classNum}"
+            }
         
         return {
             "status": "error",
             "message": f"Section with classNum {classNum} not found in catalog"
         }
 
-    def process_input(self, text, major_context=None, major_rules=None, major_code=None, current_courses=None):
-        # 1. Send prompt with Gemma instructions
-        
+    def _answer_prompt(self, text, tool_results):
+        # The answer call is the last one of the turn, so tell the model not to chain tools
+        with span("prompt_build", purpose="answer"):
+            payload, stats = fit_tool_results(tool_results)
+        kind = request_type(tool_results)
+        metrics.increment("tool_result_chars_raw_total", len(json.dumps(tool_results)), request_type=kind)
+        metrics.increment("tool_result_chars_prompt_total", stats["chars"], request_type=kind)
+        if stats["dropped"]:
+            metrics.increment("tool_result_courses_dropped_total", stats["dropped"], request_type=kind)
+        return (
+            f"Tool results:\n{payload}\n\n"
+            f"The user asked: {text}\n"
+            "Answer the user now in plain text. Do not return JSON or tool calls."
+        )
+
+    def _looks_like_tool_json(self, text):
+        """True if an answer is (another) tool call or an empty tool_calls object instead of text."""
+        stripped = text.strip()
+        if not stripped.startswith(("{", "[")):
+            return False
+        lowered = stripped.lower()
+        return '"tool_call' in lowered or ('"name"' in lowered and '"parameters"' in lowered)
+
+    def _summarize_tool_results(self, tool_results):
+        """Plain-text answer built locally from tool results, used instead of
+        re-prompting the model when its post-tool answer is unusable."""
+        lines = []
+        for tr in tool_results:
+            result = tr.get("result") or {}
+            if tr.get("name") == "add_course" or result.get("status") != "success":
+                if result.get("message"):
+                    lines.append(result["message"])
+                continue
+
+            groups = result.get("results") or []
+            if groups and "query" in groups[0]:
+                courses = [course for group in groups for course in group.get("results", [])]
+            else:
+                courses = groups
+            if not courses:
+                lines.append("I couldn't find any matching courses in the catalog.")
+                continue
+            for course in courses:
+                sections = course.get("sections") or []
+                section_text = "; ".join(
+                    f"{s.get('section')} ({', '.join(s.get('meetings') or []) or 'TBA'})" for s in sections
+                ) or "no sections listed"
+                lines.append(f"- {course.get('code')} {course.get('name')}: {section_text}")
+
+        if not lines:
+            return "✅ Tool executed successfully."
+        return "Here is what I found:\n" + "\n".join(lines)
+
+    def _expand_tool_call(self, call, session):
+        """(name, parameters) to execute for one model tool call."""
+        name = call.get("name")
+        params = call.get("parameters") or {}
+        query = params.get("query", "")
+
+        # Auto-expand "technical electives" to CISE prefixes + explicit codes
+        if name == "search_catalog" and isinstance(query, str) and ELECTIVES_RE.search(query):
+            log.debug("🤖 'technical electives' query - expanding to CISE prefixes")
+            tech_electives = (session.last_major_rules or {}).get("technical_electives", {})
+
+            # Get explicit allowed codes from tech_electives dict
+            explicit_codes = []
+            if isinstance(tech_electives, dict):
+                explicit_codes = tech_electives.get("explicit_allowed_codes", [])
+
+            # CISE department prefixes ONLY
+            cise_prefixes = ["COP", "CEN", "CIS", "CNT", "CDA", "CAP", "COT"]
+
+            # Transform parameters to use queries list
+            params = {
+                **params,
+                "query": None,
+                "queries": cise_prefixes + explicit_codes,
+                "min_level": params.get("min_level") or 4000,
+                "dept": None,  # Remove dept filter since we're using prefixes
+            }
+            log.debug("✅ Expanded to queries: %s", params['queries'])
+        return name, params
+
+    def _run_tool(self, name, params):
+        try:
+            with span("tool_call", tool=name):
+                return self._tools[name](**params)
+        except Exception as e:
+            log.warning("⚠️ Tool %s failed: %s", name, e)
+            return {"status": "error", "message": f"{name} failed: {e}"}
+
+    def _plan_tool_calls(self, calls, session):
+        """Expanded (name, params, key) per known call, and the unique calls by key."""
+        planned = []
+        unique = {}
+        for call in calls:
+            if not isinstance(call, dict) or call.get("name") not in self._tools:
+                log.warning("⚠️ Skipping unknown tool call: %s", call)
+                continue
+            name, params = self._expand_tool_call(call, session)
+            key = json.dumps([name, params], sort_keys=True, default=str)
+            planned.append((name, params, key))
+            unique.setdefault(key, (name, params))
+
+        log.debug("🔍 %d tool calls, %d unique", len(calls), len(unique))
+        if len(planned) > len(unique):
+            metrics.increment("tool_calls_deduplicated_total", len(planned) - len(unique))
+        return planned, unique
+
+    def _execute_tool_calls(self, calls, session):
+        """Run the model's tool calls and return [{name, parameters, result}] in call order.
+
+        Identical calls run once and share a result; independent calls run
+        concurrently on the tool pool, so a mixed batch takes as long as its
+        slowest call.
+        """
+        planned, unique = self._plan_tool_calls(calls, session)
+        if len(unique) == 1:
+            results = {key: self._run_tool(name, params) for key, (name, params) in unique.items()}
+        else:
+            # Each pool task runs in a copy of this context so its spans join the current trace
+            futures = {key: self._tool_pool.submit(contextvars.copy_context().run, self._run_tool, name, params)
+                       for key, (name, params) in unique.items()}
+            results = {key: future.result() for key, future in futures.items()}
+
+        return [
+            {"name": name, "parameters": params, "result": results[key]}
+            for name, params, key in planned
+        ]
+
+    async def _aexecute_tool_calls(self, calls, session):
+        """_execute_tool_calls for the async driver: the calls run on the tool
+        pool while the event loop serves other turns."""
+        planned, unique = self._plan_tool_calls(calls, session)
+        loop = asyncio.get_running_loop()
+        keys = list(unique)
+        outputs = await asyncio.gather(*(
+            loop.run_in_executor(self._tool_pool, contextvars.copy_context().run, self._run_tool, *unique[key])
+            for key in keys
+        ))
+        results = dict(zip(keys, outputs))
+        return [
+            {"name": name, "parameters": params, "result": results[key]}
+            for name, params, key in planned
+        ]
+
+    def _split_courses_marker(self, text):
+        """(text without the __COURSES_ADDED_ marker, courses listed in it)."""
+        match = COURSES_MARKER_RE.search(text)
+        if not match:
+            return text, []
+        try:
+            courses = json.loads(match.group(1))
+        except json.JSONDecodeError:
+            courses = []
+        return COURSES_MARKER_RE.sub('', text).rstrip(), courses
+
+    def _release_point(self, text, sent):
+        """(end, stop): how far a partial reply may be streamed, and whether
+        streaming stops there for good. Anything from the first '{', '`' or
+        '__' (tool JSON, code fences, the courses marker) is held back."""
+        match = STREAM_HOLD_RE.search(text, sent)
+        if match:
+            return match.start(), True
+        # A trailing '_' may be the start of the marker
+        return (len(text) - 1 if text.endswith("_") else len(text)), False
+
+    def _stream_model_call(self, call):
+        """Sync driver for one ModelCall. Yields token events while the reply
+        still looks like prose (see _release_point). Returns a ModelReply."""
+        metrics.increment("model_calls_total", purpose=call.purpose)
+        with span("model_call", purpose=call.purpose, prompt_chars=len(call.prompt)) as model_span:
+            if not call.stream:
+                return ModelReply(self._send_prompt(call.prompt, system_prompt=call.system_prompt).text, 0)
+
+            text = ""
+            sent = 0
+            stopped = False
+            for chunk in self.provider.stream(call.prompt, system_prompt=call.system_prompt):
+                if not text:
+                    model_span.attrs["first_chunk_ms"] = round((time.perf_counter() - model_span.start) * 1000, 1)
+                text += chunk
+                if stopped:
+                    continue
+                end, stopped = self._release_point(text, sent)
+                if end > sent and text[:end].strip():
+                    yield {"event": "token", "text": text[sent:end]}
+                    sent = end
+            return ModelReply(text, sent)
+
+    async def _astream_model_call(self, call):
+        """Async driver for one ModelCall: the same token events as
+        _stream_model_call, followed by the ModelReply itself (async
+        generators can't return a value)."""
+        metrics.increment("model_calls_total", purpose=call.purpose)
+        with span("model_call", purpose=call.purpose, prompt_chars=len(call.prompt)) as model_span:
+            if not call.stream:
+                response = await self.provider.asend(call.prompt, system_prompt=call.system_prompt)
+                yield ModelReply(response.text, 0)
+                return
+
+            text = ""
+            sent = 0
+            stopped = False
+            async for chunk in self.provider.astream(call.prompt, system_prompt=call.system_prompt):
+                if not text:
+                    model_span.attrs["first_chunk_ms"] = round((time.perf_counter() - model_span.start) * 1000, 1)
+                text += chunk
+                if stopped:
+                    continue
+                end, stopped = self._release_point(text, sent)
+                if end > sent and text[:end].strip():
+                    yield {"event": "token", "text": text[sent:end]}
+                    sent = end
+            yield ModelReply(text, sent)
+
+    def run_turn(self, text, major_context=None, major_rules=None, major_code=None, current_courses=None, session=None):
+        """Run one chat turn, yielding events as they happen:
+
+            token          {"text"}                    answer text, streamed
+            tool_start     {"calls": [{name, parameters}]}
+            tool_result    {"name", "parameters", "result"}
+            courses_added  {"courses": [...]}
+            done           {"text", "courses_added"}   the complete answer
+
+        This is the synchronous driver: it performs the model calls and tool
+        batches that _turn asks for and relays its events.
+        """
+        turn = self._turn(text, major_context, major_rules, major_code, current_courses, session)
+        reply = None
+        error = None
+        with start_trace("chat_turn", major=major_code):
+            while True:
+                try:
+                    step = turn.throw(error) if error else turn.send(reply)
+                except StopIteration:
+                    return
+                reply = error = None
+                try:
+                    if isinstance(step, ModelCall):
+                        reply = yield from self._stream_model_call(step)
+                    elif isinstance(step, RunTools):
+                        with span("tools", calls=len(step.calls)):
+                            reply = self._execute_tool_calls(step.calls, step.session)
+                    else:
+                        yield step
+                except Exception as e:
+                    error = e
+
+    def process_input(self, text, major_context=None, major_rules=None, major_code=None, current_courses=None, session=None):
+        """Run one chat turn and return the full response text, with added
+        courses appended in the __COURSES_ADDED_ marker (see run_turn for the
+        streaming form)."""
+        response_text = ""
+        for event in self.run_turn(text, major_context, major_rules, major_code, current_courses, session):
+            if event["event"] == "done":
+                response_text = self._with_courses_marker(event["text"], event["courses_added"])
+        return response_text
+
+    async def arun_turn(self, text, major_context=None, major_rules=None, major_code=None, current_courses=None, session=None):
+        """Async driver for the same turn as run_turn, with the same events.
+        Model calls await the provider's async client and tool batches run on
+        the tool pool, so one event loop can hold many turns that are waiting
+        on the model."""
+        turn = self._turn(text, major_context, major_rules, major_code, current_courses, session)
+        reply = None
+        error = None
+        with start_trace("chat_turn", major=major_code):
+            while True:
+                try:
+                    step = turn.throw(error) if error else turn.send(reply)
+                except StopIteration:
+                    return
+                reply = error = None
+                try:
+                    if isinstance(step, ModelCall):
+                        async for item in self._astream_model_call(step):
+                            if isinstance(item, ModelReply):
+                                reply = item
+                            else:
+                                yield item
+                    elif isinstance(step, RunTools):
+                        with span("tools", calls=len(step.calls)):
+                            reply = await self._aexecute_tool_calls(step.calls, step.session)
+                    else:
+                        yield step
+                except Exception as e:
+                    error = e
+
+    async def aprocess_input(self, text, major_context=None, major_rules=None, major_code=None, current_courses=None, session=None):
+        """process_input for async callers."""
+        response_text = ""
+        async for event in self.arun_turn(text, major_context, major_rules, major_code, current_courses, session):
+            if event["event"] == "done":
+                response_text = self._with_courses_marker(event["text"], event["courses_added"])
+        return response_text
+
+    def _with_courses_marker(self, text, courses):
+        if not courses:
+            return text
+        return f"{text}\n\n__COURSES_ADDED_{json.dumps(courses)}__COURSES_ADDED__"
+
+    def _turn(self, text, major_context, major_rules, major_code, current_courses, session):
+        """The chat turn as a generator: yields events for the client and
+        ModelCall / RunTools requests for the driver, which sends back a
+        ModelReply or the tool results. Keeping I/O in the driver lets the
+        same logic run blocking, streamed or async.
+
+        Protocol: one model call that either answers directly or returns tool
+        calls as JSON; if tools run, exactly one more call turns their results
+        into the answer. A turn therefore costs at most two model calls; cases
+        that used to trigger extra retries are handled locally and counted in
+        metrics as model_round_trips_avoided_total.
+        """
+        # Per-user history and active major (see sessions.py)
+        if session is None:
+            session = self.default_session
+        metrics.increment("chat_turns_total")
+
         # Format current schedule if provided
         schedule_context = ""
         if current_courses and len(current_courses) > 0:
@@ -460,284 +805,152 @@ class GemmaBrain:
                 name = course.get('name', 'Unknown Course')
                 schedule_context += f"- {code}: {name}\n"
             schedule_context += "(User already has these courses. When making recommendations or checking conflicts, keep this in mind.)\n"
-            print(f"📅 Schedule context: {len(current_courses)} courses in schedule")
+            log.debug("📅 Schedule context: %d courses", len(current_courses))
         
         # If major_rules not passed but major_code matches cached, use cached rules
-        if not major_rules and major_code == self.last_major_code and self.last_major_rules:
-            major_rules = self.last_major_rules
+        if not major_rules and major_code == session.last_major_code and session.last_major_rules:
+            major_rules = session.last_major_rules
         
         # Cache the major for use in this session
-        if major_code != self.last_major_code:
-            self.last_major_code = major_code
-            self.last_major_rules = major_rules
-            print(f"📋 ✅ Major switched to: {major_code}")
-
-        history_block = self._build_history_block()
-        # Build system prompt with major rules baked in
-        full_system_prompt = self._build_system_prompt_with_major(major_rules if major_code else None)
-        response = self._send_prompt(f"{full_system_prompt}\n{schedule_context}{history_block}User: {text}")
-        print("🧠 Raw model response:")
-        print(response.text)
-
-        # 2. Resolve tool calls (including chained calls) with a small loop
-        response_text = response.text
-        
+        if major_code != session.last_major_code:
+            session.last_major_code = major_code
+            session.last_major_rules = major_rules
+            log.debug("📋 Major switched to: %s", major_code)
+
+        def finish(reply_text, streamed=0, preamble_text="", added_courses=(), cache_key=None):
+            """Events closing the turn; records the exchange in the session history."""
+            reply_text, marker_courses = self._split_courses_marker(reply_text)
+            added_courses = list(added_courses) or marker_courses
+            if streamed < len(reply_text):
+                yield {"event": "token", "text": reply_text[streamed:]}
+            response_text = reply_text
+            if preamble_text.strip():
+                response_text = preamble_text + "\n\n" + response_text
+            if added_courses:
+                log.debug("✅ Added %d courses to response", len(added_courses))
+                yield {"event": "courses_added", "courses": added_courses}
+            if cache_key is not None:
+                self.answer_cache.set(cache_key, response_text)
+            session.recent_messages.append(("user", text))
+            session.recent_messages.append(("assistant", self._with_courses_marker(response_text, added_courses)))
+            yield {"event": "done", "text": response_text, "courses_added": added_courses}
+
+        # Repeated catalog question within this major and schedule: replay the answer (L2)
+        answer_key = None
+        if self.answer_cache is not None:
+            answer_key = (get_catalog().version, major_code, normalize_message(text),
+                          schedule_fingerprint(current_courses))
+            cached_answer = self.answer_cache.get(answer_key)
+            metrics.increment("answer_cache_lookups_total", result="hit" if cached_answer is not None else "miss")
+            if cached_answer is not None:
+                log.debug("⚡ Answer cache hit - skipping model calls")
+                yield from finish(cached_answer)
+                return
+
+        # 1. Model call #1: answer directly or request tools
+        with span("prompt_build", purpose="initial"):
+            history_block = self._build_history_block(session)
+            # Build system prompt with major rules baked in
+            full_system_prompt = self._build_system_prompt_with_major(major_rules if major_code else None)
+        reply = yield ModelCall(
+            f"{schedule_context}{history_block}User: {text}",
+            system_prompt=full_system_prompt,
+            purpose="initial",
+            stream=True
+        )
+        response_text = reply.text
+        log.debug("🧠 Raw model response: %s", response_text)
+
         # Strip markdown code fences if present (model might wrap JSON in ```json...```)
-        response_text = re.sub(r'^\s*```(?:json)?\s*', '', response_text)
-        response_text = re.sub(r'\s*```\s*$', '', response_text)
-        print(f"📝 After stripping markdown: {response_text[:100]}...")
+        response_text = strip_code_fences(response_text)
         
         # Check if response already contains the marker with courses (early exit if successful)
-        marker_match = re.search(r'__COURSES_ADDED_(.*?)__COURSES_ADDED__', response_text)
-        if marker_match:
-            print("✅ Found courses marker in raw response - returning immediately")
-            self.recent_messages.append(("user", text))
-            self.recent_messages.append(("assistant", response_text))
-            return response_text
-        
-        try:
-            parsed = json.loads(response_text)
-            if isinstance(parsed, dict) and parsed.get("tool_calls") == []:
-                full_sys_prompt = self._build_system_prompt_with_major(major_rules)
-                response_text = self._send_prompt(
-                    f"{full_sys_prompt}\n"
-                    f"User: {text}\n"
-                    "Respond directly with guidance. Do not return tool_calls or JSON."
-                ).text
-        except json.JSONDecodeError:
-            pass
-        tools_executed_in_response = False
-        preamble_text = ""  # Store any preamble before tool calls
-        for iteration in range(3):
-            calls, preamble = self._extract_tool_calls_with_preamble(response_text)
-            if preamble and not preamble_text:
-                preamble_text = preamble  # Save preamble from first iteration
-            if calls is None:
-                pass
-            if not calls:
-                # Only force search on FIRST iteration if no tools were called yet
-                # Do NOT force if we've already executed tools (iteration > 0 or tools_executed_in_response is True)
-                search_trigger = re.search(
-                    r'\b(search|find|look for|show me sections|what sections|any sections|do it for real)\b',
-                    text, re.IGNORECASE
+        if COURSES_MARKER_RE.search(response_text):
+            log.debug("✅ Courses marker in raw response - returning it")
+            yield from finish(response_text, reply.streamed)
+            return
+
+        with span("parse_tool_calls", chars=len(response_text)):
+            calls, preamble_text = self._extract_tool_calls_with_preamble(response_text)
+
+        if not calls:
+            # 2a. No tools requested. If the user asked to search for a course code,
+            # run that search ourselves rather than asking the model again.
+            search_trigger = SEARCH_TRIGGER_RE.search(text)
+            course_match = COURSE_CODE_RE.search(text)
+            if search_trigger and course_match:
+                course_code = course_match.group(1).upper()
+                log.info("⚠️ Model skipped search_catalog - searching %s locally", course_code)
+                calls = [{"name": "search_catalog", "parameters": {"query": course_code}}]
+                metrics.increment("forced_searches_total")
+                preamble_text = ""
+            elif EMPTY_TOOL_CALLS_RE.search(response_text):
+                # Empty tool_calls is a non-answer; one direct-answer retry (call #2)
+                reply = yield ModelCall(
+                    f"{history_block}User: {text}\n"
+                    "Respond directly with guidance. Do not return tool_calls or JSON.",
+                    system_prompt=full_system_prompt,
+                    purpose="direct_retry",
+                    stream=True
                 )
-                if search_trigger and iteration == 0 and not tools_executed_in_response:
-                    print("⚠️ User asked for search but AI didn't call search_catalog - forcing tool call")
-                    # Extract course code from user input
-                    course_match = re.search(r'\b([A-Z]{2,4}\d{3,4}[A-Z]?)\b', text, re.IGNORECASE)
-                    if course_match:
-                        course_code = course_match.group(1).upper()
-                        print(f"🔍 Forcing search for: {course_code}")
-                        result = self.search_catalog_tool(query=course_code)
-                        tool_results = [{
-                            "name": "search_catalog",
-                            "parameters": {"query": course_code},
-                            "result": result
-                        }]
-                        # Build AI response with tool results (let AI decide format based on context)
-                        tool_results_json = json.dumps(tool_results)
-                        response_text = self._send_prompt(
-                            f"Tool results:\n{tool_results_json}\n\nAnswer the user now:"
-                        ).text
-                        print(f"🤖 Forced search response:")
-                        print(response_text)
-                        self.recent_messages.append(("user", text))
-                        self.recent_messages.append(("assistant", response_text))
-                        return response_text
-                
-                try:
-                    parsed = json.loads(response_text)
-                    if isinstance(parsed, dict) and parsed.get("tool_calls") == []:
-                        full_sys_prompt = self._build_system_prompt_with_major(major_rules)
-                        response_text = self._send_prompt(
-                            f"{full_sys_prompt}\n"
-                            f"User: {text}\n"
-                            "Respond directly with guidance. Do not return tool_calls or JSON."
-                        ).text
-                except json.JSONDecodeError:
-                    pass
-
-                self.recent_messages.append(("user", text))
-                self.recent_messages.append(("assistant", response_text))
-                return response_text
-
-            tool_results = []
-            search_calls = [call for call in calls if call.get("name") == "search_catalog"]
-            add_course_calls = [call for call in calls if call.get("name") == "add_course"]
-            
-            print(f"🔍 Extracted {len(calls)} total calls: {len(search_calls)} search, {len(add_course_calls)} add_course")
-            
-            # Handle batched search_catalog calls
-            if len(search_calls) > 1:
-                queries = []
-                shared = {
-                    "dept": None,
-                    "min_level": None,
-                    "max_level": None,
-                    "is_ai": None,
-                    "quest": None,
-                    "min_words": None,
-                    "max_words": None,
-                    "civicLiteracy": None,
-                    "international": None,
-                    "diversity": None,
-                }
-                for call in search_calls:
-                    params = call.get("parameters", {})
-                    if params.get("query"):
-                        queries.append(params.get("query"))
-                    for key in shared:
-                        if params.get(key) is not None:
-                            shared[key] = params.get(key)
-
-                result = self.search_catalog_tool(queries=queries, **shared)
-                tool_results.append({
-                    "name": "search_catalog",
-                    "parameters": {"queries": queries, **shared},
-                    "result": result
-                })
+                yield from finish(reply.text, reply.streamed)
+                return
             else:
-                # Handle individual calls (search_catalog or add_course)
-                for call in calls:
-                    if call.get("name") == "search_catalog":
-                        params = call.get("parameters", {})
-                        query = params.get("query", "")
-                        
-                        # Auto-expand "technical electives" to CISE prefixes + explicit codes
-                        if query and re.search(r'\b(technical\s+)?electives?\b', query, re.IGNORECASE):
-                            print(f"🤖 Detected 'technical electives' query - auto-expanding to CISE prefixes")
-                            tech_electives = (self.last_major_rules or {}).get("technical_electives", {})
-                            
-                            # Get explicit allowed codes from tech_electives dict
-                            explicit_codes = []
-                            if isinstance(tech_electives, dict):
-                                explicit_codes = tech_electives.get("explicit_allowed_codes", [])
-                            
-                            # CISE department prefixes ONLY
-                            cise_prefixes = ["COP", "CEN", "CIS", "CNT", "CDA", "CAP", "COT"]
-                            
-                            # Transform parameters to use queries list
-                            params = {
-                                **params,
-                                "query": None,
-                                "queries": cise_prefixes + explicit_codes,
-                                "min_level": params.get("min_level") or 4000,
-                                "dept": None,  # Remove dept filter since we're using prefixes
-                            }
-                            print(f"✅ Expanded to queries: {params['queries']}")
-                        
-                        result = self.search_catalog_tool(**params)
-                        tool_results.append({
-                            "name": call.get("name"),
-                            "parameters": params,
-                            "result": result
-                        })
-                    elif call.get("name") == "add_course":
-                        result = self.add_course_tool(**call.get("parameters", {}))
-                        tool_results.append({
-                            "name": call.get("name"),
-                            "parameters": call.get("parameters", {}),
-                            "result": result
-                        })
-
-            print("🔧 Tool results payload:")
-            print(json.dumps(tool_results, indent=2, ensure_ascii=True))
-            tools_executed_in_response = True  # Mark that we've now executed tools
-            
-            # Collect any courses added by add_course tool
-            added_courses = []
-            for tr in tool_results:
-                if tr.get("name") == "add_course" and tr.get("result", {}).get("status") == "success":
-                    course_data = tr.get("result", {}).get("course")
-                    if course_data:
-                        added_courses.append(course_data)
-
-            # Try to get AI response, but handle timeouts gracefully
-            try:
-                # Build tool results prompt
-                tool_results_json = json.dumps(tool_results)
-                # Don't force rigid formatting - let the AI respond naturally based on previous instructions
-                response_text = self._send_prompt(
-                    f"Tool results:\n{tool_results_json}\n\nAnswer the user now:"
-                ).text
-                print(f"🤖 AI response after tool execution:")
-                print(response_text)
-                
-                # Check if response already contains the marker with courses (from successful add_course calls)
-                marker_match = re.search(r'__COURSES_ADDED_(.*?)__COURSES_ADDED__', response_text)
-                if marker_match:
-                    print("✅ Found courses marker in response - returning immediately")
-                    # Prepend preamble if it exists
-                    if preamble_text.strip():
-                        response_text = preamble_text + "\n\n" + response_text
-                    self.recent_messages.append(("user", text))
-                    self.recent_messages.append(("assistant", response_text))
-                    return response_text
-                
-                # Check if AI returned empty tool_calls (common bug - force real response)
-                is_malformed = False
-                if re.search(r'^\s*{\s*"tool_calls"\s*:\s*\[\s*\]\s*}\s*$', response_text):
-                    print("⚠️ AI returned empty tool_calls after execution - forcing real response")
-                    is_malformed = True
-                # Also catch malformed tool call attempts (e.g., {"tool_call": {...}})
-                elif response_text.strip().startswith('{') and '"tool_call' in response_text.lower():
-                    print("⚠️ AI returned malformed tool call after execution - forcing real response")
-                    is_malformed = True
-                
-                if is_malformed:
-                    response_text = self._send_prompt(
-                        f"Do not return JSON or tool calls. Provide ONLY plain text about these results:\n"
-                        f"{json.dumps(tool_results)}"
-                    ).text
-                    print(f"🤖 Forced response:")
-                    print(response_text)
-                    # IMPORTANT: After forcing a response, do not continue the loop - break immediately
-                    # Add courses if any and return
-                    if added_courses:
-                        courses_json = json.dumps(added_courses)
-                        marker = f"\n\n__COURSES_ADDED_{courses_json}__COURSES_ADDED__"
-                        response_text += marker
-                        print(f"✅ Added {len(added_courses)} courses to response marker")
-                    # Prepend preamble if it exists
-                    if preamble_text.strip():
-                        response_text = preamble_text + "\n\n" + response_text
-                    self.recent_messages.append(("user", text))
-                    self.recent_messages.append(("assistant", response_text))
-                    return response_text
-            except Exception as e:
-                print(f"⚠️ AI response generation failed: {e}")
-                # If AI fails but we have courses, still return them
-                if added_courses:
-                    course_names = [c.get('code') for c in added_courses]
-                    response_text = f"✅ Added {', '.join(course_names)} to your schedule!"
-                else:
-                    # Generic success message for other tools
-                    response_text = "✅ Tool executed successfully."
-                # Prepend preamble if it exists
-                if preamble_text.strip():
-                    response_text = preamble_text + "\n\n" + response_text
-            
-            # If courses were added, include them in a special marker for the frontend
+                yield from finish(response_text, reply.streamed)
+                return
+        if reply.streamed:
+            # The preamble already went out as tokens; the answer follows it
+            preamble_text = response_text[:reply.streamed]
+            yield {"event": "token", "text": "\n\n"}
+
+        # 2b. Execute tools, then model call #2 turns the results into the answer
+        yield {"event": "tool_start", "calls": [
+            {"name": call.get("name"), "parameters": call.get("parameters", {})}
+            for call in calls if isinstance(call, dict)
+        ]}
+        tool_results = yield RunTools(calls, session)
+        log.debug("🔧 Tool results: %s", lazy(json.dumps, tool_results))
+        for tr in tool_results:
+            yield {"event": "tool_result", **tr}
+
+        # Collect any courses added by add_course tool
+        added_courses = []
+        for tr in tool_results:
+            if tr.get("name") == "add_course" and tr.get("result", {}).get("status") == "success":
+                course_data = tr.get("result", {}).get("course")
+                if course_data:
+                    added_courses.append(course_data)
+
+        # Only answers grounded purely in successful catalog searches are reusable
+        cacheable = answer_key is not None and all(
+            tr["name"] == "search_catalog" and tr["result"].get("status") == "success" for tr in tool_results
+        )
+        streamed = 0
+        try:
+            reply = yield ModelCall(self._answer_prompt(text, tool_results), purpose="answer", stream=True)
+            response_text, streamed = reply.text, reply.streamed
+            log.debug("🤖 Answer after tools: %s", response_text)
+
+            # Chained or malformed tool JSON: answer from the results we already
+            # have instead of spending another round-trip on a forced retry
+            if not COURSES_MARKER_RE.search(response_text) and self._looks_like_tool_json(response_text):
+                log.info("⚠️ Model returned tool JSON instead of an answer - summarizing locally")
+                metrics.increment("model_round_trips_avoided_total", reason="malformed_answer")
+                response_text, streamed = self._summarize_tool_results(tool_results), 0
+                cacheable = False
+        except Exception as e:
+            cacheable = False
+            log.warning("⚠️ Answer generation failed: %s", e)
+            metrics.increment("model_errors_total", purpose="answer")
             if added_courses:
-                courses_json = json.dumps(added_courses)
-                marker = f"\n\n__COURSES_ADDED_{courses_json}__COURSES_ADDED__"
-                response_text += marker
-                print(f"✅ Added {len(added_courses)} courses to response marker")
-                # Prepend preamble if it exists
-                if preamble_text.strip():
-                    response_text = preamble_text + "\n\n" + response_text
-                # Save to history and return immediately - don't continue the loop
-                self.recent_messages.append(("user", text))
-                self.recent_messages.append(("assistant", response_text))
-                return response_text
-
-        # Return structured response with text and any added courses
-        # Prepend preamble if it exists
-        if preamble_text.strip():
-            response_text = preamble_text + "\n\n" + response_text
-        self.recent_messages.append(("user", text))
-        self.recent_messages.append(("assistant", response_text))
-        return response_text
+                course_names = [c.get('code') for c in added_courses]
+                response_text = f"✅ Added {', '.join(course_names)} to your schedule!"
+            else:
+                response_text = self._summarize_tool_results(tool_results)
+
+        yield from finish(response_text, streamed, preamble_text, added_courses,
+                          cache_key=answer_key if cacheable else None)
+
 
 if __name__ == "__main__":
     brain = GemmaBrain()
@@ -0,0 +1,89 @@
+"""
+Precompute search artifacts for the course catalog.
+
+Run after gatorobber.py (which calls this automatically):
+    python backend/build_catalog.py [--catalog path/to/catalog.json]
+
+Compare worker memory with and without string interning:
+    python backend/build_catalog.py --measure-memory
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from catalog import load_catalog, artifacts_path_for, CATALOG_PATH
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Runs in a fresh interpreter so each measurement starts from a clean heap
+_MEASURE_SCRIPT = """
+import gc, json, sys
+from build_catalog import current_rss_mb
+from catalog import load_catalog
+before = current_rss_mb()
+catalog = load_catalog(sys.argv[1], compact=sys.argv[2] == '1')
+gc.collect()
+print(json.dumps({'before_mb': before, 'after_mb': current_rss_mb()}))
+"""
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB (peak RSS where /proc is unavailable)."""
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def build_catalog(catalog_path=None):
+    """Rebuild the artifact file for a catalog and return the loaded Catalog."""
+    catalog = load_catalog(catalog_path, rebuild=True)
+    stats = catalog.stats
+    print(f"--- 🧱 Built catalog artifacts {catalog.version}: "
+          f"{stats['courses']} courses, {stats['sections']} sections, "
+          f"{stats['departments']} departments -> {artifacts_path_for(catalog_path or CATALOG_PATH)} ---")
+    return catalog
+
+
+def measure_memory(catalog_path=None):
+    """Report catalog RSS cost loaded plain vs. interned, each in a fresh process."""
+    catalog_path = os.path.abspath(catalog_path or CATALOG_PATH)
+    results = {}
+    for label, flag in (('plain', '0'), ('interned', '1')):
+        output = subprocess.run(
+            [sys.executable, '-c', _MEASURE_SCRIPT, catalog_path, flag],
+            cwd=current_dir, capture_output=True, text=True, check=True
+        ).stdout
+        results[label] = json.loads(output.strip().splitlines()[-1])
+
+    for label, rss in results.items():
+        if rss['after_mb'] is None:
+            print(f"   {label:>8}: RSS not available on this platform")
+            continue
+        print(f"   {label:>8}: {rss['after_mb']:.1f} MB total, "
+              f"{rss['after_mb'] - rss['before_mb']:.1f} MB for the catalog")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Precompute catalog search artifacts")
+    parser.add_argument('--catalog', default=None)
+    parser.add_argument('--measure-memory', action='store_true',
+                        help='Report RSS for the loaded catalog with and without interning')
+    args = parser.parse_args()
+    if args.measure_memory:
+        measure_memory(args.catalog)
+    else:
+        build_catalog(args.catalog)
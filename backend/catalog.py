@@ -0,0 +1,287 @@
+"""
+Shared catalog loader with precomputed search artifacts.
+
+Everything derived from universal_base_catalog.json (code and classNum
+indexes, department acronyms, Gen Ed flags, section time keys) is computed
+once by build_catalog.py and saved next to the catalog, stamped with a
+content hash of the catalog and requirements files. Workers load the
+ready-made structures; a missing, stale or mismatched artifact file is
+detected by its hash and rebuilt automatically.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+from meetings import ensure_slots, earliest_minutes
+from prereqs import ensure_prereq_exprs
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+CATALOG_PATH = os.path.join(current_dir, '..', 'data', 'universal_base_catalog.json')
+UF_REQUIREMENTS_PATH = os.path.join(current_dir, '..', 'data', 'uf_universal_requirements.json')
+
+# Bump when the artifact layout changes so old files are rebuilt
+ARTIFACT_FORMAT = 2
+
+# Gen Ed flag bits stored per course
+GEN_ED_CIVIC = 1
+GEN_ED_INTERNATIONAL = 2
+GEN_ED_DIVERSITY = 4
+
+INTERNATIONAL_PREFIXES = ['INT', 'ISS', 'LAT', 'AFH', 'ASH', 'EUH']
+# Note: diversity courses are harder to identify by code alone; we rely on description keywords
+DIVERSITY_KEYWORDS = ['diversity', 'cultural', 'african', 'latino', 'lgbtq', 'gender', 'race', 'ethnicity']
+
+
+def artifacts_path_for(catalog_path):
+    base, _ = os.path.splitext(catalog_path)
+    return base + '.artifacts.json'
+
+
+def _read_bytes(path):
+    if not os.path.exists(path):
+        return b''
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def normalize_text(value):
+    if value is None:
+        return ""
+    return re.sub(r"[^a-z0-9]+", "", str(value).lower())
+
+
+def dept_acronym(dept):
+    """'Computer & Information Science & Engineering' -> 'cise'"""
+    words = re.findall(r"[A-Za-z]+", str(dept or ""))
+    return "".join(word[0].lower() for word in words if len(word) > 1)
+
+
+def _gen_ed_flags(course, civic_courses, international_courses):
+    code = course['code'].upper()
+    description = (course.get('description') or '').lower()
+    name = (course.get('name') or '').lower()
+
+    flags = 0
+    if code in civic_courses:
+        flags |= GEN_ED_CIVIC
+    if (code in international_courses or
+            any(prefix in code for prefix in INTERNATIONAL_PREFIXES) or
+            'international' in description):
+        flags |= GEN_ED_INTERNATIONAL
+    if any(keyword in description or keyword in name for keyword in DIVERSITY_KEYWORDS):
+        flags |= GEN_ED_DIVERSITY
+    return flags
+
+
+def _intern_value(value):
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, list):
+        return [_intern_value(v) for v in value]
+    return value
+
+
+def _freeze(value):
+    """Hashable key for a JSON value. Every part is keyed with its type, since
+    True == 1 == 1.0 would otherwise share one object."""
+    if isinstance(value, (list, tuple)):
+        return type(value), tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return dict, tuple((k, _freeze(v)) for k, v in value.items())
+    return type(value), value
+
+
+def intern_catalog(courses):
+    """Deduplicate repeated data in a loaded catalog, in place.
+
+    Department names, instructor names, section types and every meetTimes key
+    and value are interned; identical meetTimes dicts, meetTimes lists,
+    instructor lists and slot tuples are shared between sections. Shared
+    objects are treated as read-only by every caller.
+    """
+    shared = {}
+
+    def share(value):
+        return shared.setdefault(_freeze(value), value)
+
+    for course in courses:
+        for key in ('dept', 'code'):
+            if isinstance(course.get(key), str):
+                course[key] = sys.intern(course[key])
+        if isinstance(course.get('quest'), list):
+            course['quest'] = share(_intern_value(course['quest']))
+
+        for section in course.get('sections', []):
+            if isinstance(section.get('sectWeb'), str):
+                section['sectWeb'] = sys.intern(section['sectWeb'])
+            if isinstance(section.get('instructors'), list):
+                section['instructors'] = share(_intern_value(section['instructors']))
+
+            meet_times = section.get('meetTimes')
+            if isinstance(meet_times, list):
+                meet_times = [
+                    share({sys.intern(k): _intern_value(v) for k, v in mt.items()})
+                    if isinstance(mt, dict) else mt
+                    for mt in meet_times
+                ]
+                section['meetTimes'] = share(meet_times)
+
+            slots = section.get('slots')
+            if isinstance(slots, list):
+                section['slots'] = share(tuple(share(tuple(slot)) for slot in slots))
+
+    return courses
+
+
+def build_artifacts(courses, version, uf_requirements=None):
+    """Compute every derived search structure for a loaded catalog."""
+    uf_requirements = uf_requirements or {}
+    civic_courses = {
+        c.upper() for c in uf_requirements.get('civicLiteracy', {}).get('courses', [])
+    }
+    international_courses = {
+        c.upper() for c in uf_requirements.get('international', {}).get('examples', [])
+    }
+
+    code_index = {}
+    class_index = {}
+    depts = {}
+    gen_ed_flags = []
+    section_earliest = []
+    section_count = 0
+
+    for course_idx, course in enumerate(courses):
+        code_index.setdefault(course['code'].upper(), []).append(course_idx)
+
+        dept = course.get('dept') or ''
+        if dept not in depts:
+            depts[dept] = [normalize_text(dept), dept_acronym(dept)]
+
+        gen_ed_flags.append(_gen_ed_flags(course, civic_courses, international_courses))
+
+        earliest = []
+        for section_idx, section in enumerate(course.get('sections', [])):
+            if section.get('classNum') is not None:
+                class_index[str(section['classNum'])] = [course_idx, section_idx]
+            earliest.append(earliest_minutes(section))
+        section_earliest.append(earliest)
+        section_count += len(earliest)
+
+    return {
+        'format': ARTIFACT_FORMAT,
+        'version': version,
+        'code_index': code_index,
+        'class_index': class_index,
+        'depts': depts,
+        'gen_ed_flags': gen_ed_flags,
+        'section_earliest': section_earliest,
+        'stats': {
+            'courses': len(courses),
+            'sections': section_count,
+            'departments': len(depts),
+            'built_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        },
+    }
+
+
+class Catalog:
+    """In-memory catalog plus its precomputed indexes."""
+
+    def __init__(self, courses, artifacts, load_seconds=0.0):
+        self.courses = courses
+        self.version = artifacts['version']
+        self.code_index = artifacts['code_index']
+        self.class_index = {int(k): tuple(v) for k, v in artifacts['class_index'].items()}
+        self.depts = artifacts['depts']
+        self.gen_ed_flags = artifacts['gen_ed_flags']
+        self.section_earliest = artifacts['section_earliest']
+        self.stats = artifacts['stats']
+        self.load_seconds = load_seconds
+
+    def __len__(self):
+        return len(self.courses)
+
+    def find_courses(self, code):
+        """All catalog entries for a course code."""
+        return [self.courses[i] for i in self.code_index.get(str(code).upper(), [])]
+
+    def find_section(self, class_num):
+        """Return (course, section) for a classNum, or (None, None)."""
+        location = self.class_index.get(class_num)
+        if location is None:
+            return None, None
+        course = self.courses[location[0]]
+        return course, course['sections'][location[1]]
+
+
+def load_catalog(catalog_path=None, requirements_path=None, rebuild=False, compact=True):
+    """Load the catalog and its artifacts, rebuilding them if stale or missing.
+    compact=True interns repeated strings and shares identical meeting data (see intern_catalog)."""
+    catalog_path = catalog_path or CATALOG_PATH
+    requirements_path = requirements_path or UF_REQUIREMENTS_PATH
+    artifacts_path = artifacts_path_for(catalog_path)
+    start = time.perf_counter()
+
+    catalog_bytes = _read_bytes(catalog_path)
+    if not catalog_bytes:
+        raise FileNotFoundError(f"Catalog not found at {catalog_path}")
+    requirements_bytes = _read_bytes(requirements_path)
+    version = hashlib.sha256(catalog_bytes + requirements_bytes).hexdigest()[:16]
+
+    courses = json.loads(catalog_bytes)
+    del catalog_bytes
+    # Catalogs ingested before slot/prerequisite compilation are upgraded in memory
+    ensure_slots(courses)
+    ensure_prereq_exprs(courses)
+    if compact:
+        intern_catalog(courses)
+
+    artifacts = None
+    if not rebuild and os.path.exists(artifacts_path):
+        try:
+            with open(artifacts_path, 'r') as f:
+                artifacts = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️  Unreadable catalog artifacts ({e}) - rebuilding")
+            artifacts = None
+        if artifacts and (artifacts.get('format') != ARTIFACT_FORMAT or artifacts.get('version') != version):
+            print(f"⚠️  Catalog artifacts are stale ({artifacts.get('version')} != {version}) - rebuilding")
+            artifacts = None
+
+    if artifacts is None:
+        uf_requirements = json.loads(requirements_bytes) if requirements_bytes else {}
+        artifacts = build_artifacts(courses, version, uf_requirements)
+        try:
+            with open(artifacts_path, 'w') as f:
+                json.dump(artifacts, f, separators=(',', ':'))
+        except OSError as e:
+            print(f"⚠️  Could not save catalog artifacts to {artifacts_path}: {e}")
+
+    return Catalog(courses, artifacts, load_seconds=time.perf_counter() - start)
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog():
+    """Process-wide catalog, loaded on first use."""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = load_catalog()
+    return _catalog
+
+
+def set_catalog(index):
+    """Replace the process-wide catalog (tools and tests pointed at another file)."""
+    global _catalog
+    with _catalog_lock:
+        _catalog = index
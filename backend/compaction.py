@@ -0,0 +1,257 @@
+"""
+Compaction of tool results before they go back into the model prompt.
+
+Search results are rendered at the richest level that fits the character
+budget (SCHEDUGATOR_TOOL_RESULT_BUDGET, ~4 characters per token):
+
+    level 0  truncated description, prereqs, up to 3 sections with instructor and meetings
+    level 1  no description
+    level 2  2 sections, no instructor
+    level 3  1 section, no prereqs
+
+If even level 3 is too large, the lowest-priority courses are dropped
+(later results first, round-robin across batched queries so every query
+keeps its best matches) and the group notes how many were omitted.
+
+    python backend/compaction.py --catalog data/universal_base_catalog.json
+
+prints the prompt size before and after compaction for typical requests.
+"""
+
+import argparse
+import copy
+import json
+import os
+
+from meetings import format_meetings
+
+TOOL_RESULT_BUDGET = int(os.getenv("SCHEDUGATOR_TOOL_RESULT_BUDGET", 6000))
+DESCRIPTION_CHARS = 160
+MAX_SECTIONS = 3
+LEVELS = 4
+
+# Course fields only worth sending when the search filtered on them
+FILTER_FIELDS = {
+    "dept": "dept",
+    "quest": "quest",
+    "min_words": "writingWords",
+    "max_words": "writingWords",
+    "is_ai": "isAI",
+}
+
+_SEPARATORS = (",", ":")
+
+
+def truncate(text, limit):
+    """Cut text at a word boundary, marking the cut with an ellipsis."""
+    if not text or len(text) <= limit:
+        return text
+    cut = text[:limit].rsplit(" ", 1)[0]
+    return cut.rstrip(",.;:") + "…"
+
+
+def compact_course(course, extra_fields=()):
+    """Level-0 rendering of a catalog course for tool results."""
+    compact = {
+        "code": course.get("code"),
+        "name": course.get("name"),
+        "credits": course.get("credits"),
+        "description": truncate(course.get("description"), DESCRIPTION_CHARS),
+        "prereqs": course.get("prereqs") or None,
+    }
+    for field in extra_fields:
+        if course.get(field) not in (None, "", [], 0, False):
+            compact[field] = course.get(field)
+
+    sections = course.get("sections")
+    if isinstance(sections, list):
+        compact_sections = []
+        for section in sections[:MAX_SECTIONS]:
+            instructors = section.get("instructors")
+            section_credits = section.get("credits")
+            if compact.get("credits") is None and section_credits is not None:
+                compact["credits"] = section_credits
+
+            compact_section = {
+                "section": section.get("section") or section.get("classNum"),
+                "instructor": ", ".join(instructors) if isinstance(instructors, list) and instructors else None,
+                "meetings": format_meetings(section),
+            }
+            # Only flag non-classroom delivery (online/hybrid); classroom is the default
+            if section.get("sectWeb") and section.get("sectWeb") != "PC":
+                compact_section["sectWeb"] = section.get("sectWeb")
+            compact_sections.append(compact_section)
+        compact["sections"] = compact_sections
+        compact["sections_count"] = len(sections)
+
+    return {key: value for key, value in compact.items() if value is not None}
+
+
+def requested_fields(params):
+    """Extra course fields to include for a search_catalog call's filters."""
+    return tuple(sorted({field for param, field in FILTER_FIELDS.items() if params.get(param)}))
+
+
+def shrink_course(compact, level):
+    """A copy of a level-0 course reduced to the given level."""
+    course = dict(compact)
+    if level >= 1:
+        course.pop("description", None)
+    if level >= 2 and "sections" in course:
+        course["sections"] = [
+            {k: v for k, v in section.items() if k != "instructor"}
+            for section in course["sections"][:2]
+        ]
+    if level >= 3:
+        course.pop("prereqs", None)
+        if "sections" in course:
+            course["sections"] = course["sections"][:1]
+    return course
+
+
+def _dumps(value):
+    return json.dumps(value, separators=_SEPARATORS, ensure_ascii=False)
+
+
+def _course_groups(tool_results):
+    """Every dict holding a "results" list of courses (one per query for batched searches)."""
+    groups = []
+    for tr in tool_results:
+        result = tr.get("result")
+        if tr.get("name") != "search_catalog" or not isinstance(result, dict):
+            continue
+        items = result.get("results") or []
+        if items and isinstance(items[0], dict) and "query" in items[0]:
+            groups.extend(items)
+        else:
+            groups.append(result)
+    return groups
+
+
+def _prompt_course_for_add(course):
+    """add_course results carry raw meetTimes for the frontend; the model only needs the summary."""
+    section = {"meetTimes": course.get("meetTimes") or []}
+    return {
+        "code": course.get("code"),
+        "name": course.get("name"),
+        "classNum": course.get("classNum"),
+        "credits": course.get("credits"),
+        "meetings": format_meetings(section),
+    }
+
+
+def fit_tool_results(tool_results, budget=None):
+    """JSON for the answer prompt, fitted to the character budget.
+
+    Returns (payload, stats) where stats records the level used, the number
+    of courses dropped and the payload size.
+    """
+    budget = budget or TOOL_RESULT_BUDGET
+    results = copy.deepcopy(tool_results)
+    for tr in results:
+        result = tr.get("result")
+        if tr.get("name") == "add_course" and isinstance(result, dict) and result.get("course"):
+            result["course"] = _prompt_course_for_add(result["course"])
+
+    groups = _course_groups(results)
+    originals = [list(group["results"]) for group in groups]
+
+    payload = _dumps(results)
+    level = 0
+    while len(payload) > budget and level < LEVELS - 1:
+        level += 1
+        for group, courses in zip(groups, originals):
+            group["results"] = [shrink_course(course, level) for course in courses]
+        payload = _dumps(results)
+
+    dropped = 0
+    if len(payload) > budget and groups:
+        # Priority: rank within its query first, then query order (round-robin)
+        entries = sorted(
+            ((rank, g, course) for g, group in enumerate(groups)
+             for rank, course in enumerate(group["results"])),
+            key=lambda entry: (entry[0], entry[1])
+        )
+        # Leave room for the "omitted" note each group may gain
+        excess = len(payload) - budget + len(',"omitted":000') * len(groups)
+        while entries and excess > 0:
+            rank, g, course = entries.pop()
+            excess -= len(_dumps(course)) + 1
+            dropped += 1
+        kept = {}
+        for rank, g, course in entries:
+            kept.setdefault(g, []).append(course)
+        for g, group in enumerate(groups):
+            omitted = len(group["results"]) - len(kept.get(g, []))
+            group["results"] = kept.get(g, [])
+            if omitted:
+                group["omitted"] = omitted
+        payload = _dumps(results)
+
+    return payload, {"level": level, "dropped": dropped, "chars": len(payload)}
+
+
+def request_type(tool_results):
+    """Label for metrics: the tool mix and whether searches were batched."""
+    names = sorted({tr.get("name") for tr in tool_results})
+    if names == ["search_catalog"]:
+        batched = len(tool_results) > 1 or any((tr.get("parameters") or {}).get("queries") for tr in tool_results)
+        return "search_batch" if batched else "search"
+    if names == ["add_course"]:
+        return "add_course"
+    return "mixed" if names else "none"
+
+
+def measure(courses, budget=None):
+    """Prompt characters before (full compact courses, default JSON) and after compaction,
+    for typical request types against a loaded catalog."""
+    from search import search_catalog
+
+    def legacy_course(course):
+        # Pre-compaction rendering: full description and prereqs, dept, sectWeb, 3 sections
+        compact = compact_course(course, extra_fields=("dept",))
+        compact["description"] = course.get("description")
+        return compact
+
+    prefixes = sorted({course["code"][:3] for course in courses if course.get("code")})
+    scenarios = {
+        "single code": [{"query": courses[0]["code"]}],
+        "prefix": [{"query": prefixes[0]}],
+        "batch x12": [{"query": prefix, "min_level": 3000} for prefix in prefixes[:12]],
+        "gen ed filter": [{"diversity": True}],
+    }
+    report = {}
+    for label, param_list in scenarios.items():
+        legacy, fitted = [], []
+        for params in param_list:
+            found = search_catalog(**params)
+            legacy.append({"query": params.get("query"), "results": [legacy_course(c) for c in found]})
+            fitted.append({"query": params.get("query"),
+                           "results": [compact_course(c, requested_fields(params)) for c in found]})
+        before = json.dumps([{"name": "search_catalog", "parameters": {}, "result": {"results": legacy, "status": "success"}}])
+        payload, stats = fit_tool_results(
+            [{"name": "search_catalog", "parameters": {}, "result": {"results": fitted, "status": "success"}}], budget
+        )
+        report[label] = {"before": len(before), "after": len(payload), **stats}
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure tool-result prompt size before/after compaction")
+    parser.add_argument('--catalog', help='Catalog JSON (default: data/universal_base_catalog.json)')
+    parser.add_argument('--budget', type=int, default=TOOL_RESULT_BUDGET, help='Character budget')
+    args = parser.parse_args(argv)
+
+    from catalog import load_catalog, set_catalog
+    index = load_catalog(args.catalog)
+    set_catalog(index)
+    report = measure(index.courses, args.budget)
+    for label, row in report.items():
+        saved = 1 - row["after"] / row["before"] if row["before"] else 0
+        print(f"   {label:<14} {row['before']:>8} -> {row['after']:>6} chars "
+              f"(~{row['after'] // 4} tokens, level {row['level']}, "
+              f"{row['dropped']} dropped, {saved:.0%} smaller)")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,57 +1,96 @@
-def solve_schedule(required_courses, current_schedule=[]):
-    # BASE CASE: If we have no more courses to pick, we've succeeded!
-    if not required_courses:
-        return current_schedule
-
-    # 1. CHOOSE: Pick the first course from our "Missing" list
-    target_course = required_courses[0]
-    remaining_courses = required_courses[1:]
-
-    # 2. EXPLORE: Try every available section for that course
-    for section in target_course['sections']:
-        # Check if this section fits in our current schedule
-        if not has_global_conflict(current_schedule + [section]):
-
-            # Recursive call: Try to fill the rest of the slots with this section added
-            result = solve_schedule(remaining_courses, current_schedule + [section])
-
-            # If the recursion eventually found a full schedule, pass it up!
-            if result is not None:
-                return result
-
-    # 3. UNCHOOSE: If no sections for this course worked with our
-    # current picks, return None to trigger the "Backtrack" in the previous call.
-    return None
-def has_global_conflict(sections_list):
-    # Map evening periods to continue the sequence (11 -> 12, 13, 14)
-    period_map = {
-        "1": 1, "2": 2, "3": 3, "4": 4, "5": 5, "6": 6,
-        "7": 7, "8": 8, "9": 9, "10": 10, "11": 11,
-        "E1": 12, "E2": 13, "E3": 14
-    }
-
-    # Include 'S' just in case a lab or online exam has a Saturday slot
-    daily_slots = {day: [] for day in ["M", "T", "W", "R", "F", "S"]}
-
-    for section in sections_list:
-        for time_slot in section.get('meetTimes', []):
-            # Use .get() and the map to safely handle 'E' strings
-            try:
-                start = period_map.get(str(time_slot['meetPeriodBegin']))
-                end = period_map.get(str(time_slot['meetPeriodEnd']))
-            except KeyError:
-                continue # Skip TBA or irregular times
-
-            if start is None or end is None:
+from meetings import section_slots
+
+
+# Bits per day in an occupancy mask (periods are 1-14)
+DAY_STRIDE = 16
+
+
+def occupancy_mask(section):
+    """A section's meeting periods as one integer: bit (day * 16 + period) is
+    set for every period it meets, so two sections conflict exactly when
+    their masks share a bit: they meet on a common day in overlapping
+    periods."""
+    mask = 0
+    for slot in section_slots(section):
+        days, start, end = slot[0], slot[1], slot[2]
+        if start is None or end is None or not days or end < start:
+            continue # Skip TBA or irregular times
+        periods = ((1 << (end - start + 1)) - 1) << start
+        day = 0
+        while days:
+            if days & 1:
+                mask |= periods << (day * DAY_STRIDE)
+            days >>= 1
+            day += 1
+    return mask
+
+
+def solve_compiled(options, stats=None):
+    """Backtracking over precompiled sections.
+
+    options: one list of (mask, section) per course.
+    Returns one section per course, in the same order, with no two masks
+    overlapping, or None. Courses with the fewest sections are placed
+    first so dead ends are found early. If a stats dict is given, its
+    'nodes' is set to the number of sections tried."""
+    order = sorted(range(len(options)), key=lambda i: len(options[i]))
+    chosen = [None] * len(options)
+    nodes = 0
+
+    def place(depth, used):
+        nonlocal nodes
+        if depth == len(order):
+            return True
+        course = order[depth]
+        for mask, section in options[course]:
+            nodes += 1
+            if not mask & used:
+                chosen[course] = section
+                if place(depth + 1, used | mask):
+                    return True
+        return False
+
+    solved = place(0, 0)
+    if stats is not None:
+        stats['nodes'] = nodes
+    return chosen if solved else None
+
+
+def _timed(slot):
+    # Same meetings occupancy_mask counts
+    return slot[0] and slot[1] is not None and slot[2] is not None and slot[2] >= slot[1]
+
+
+def _overlaps(section_a, section_b):
+    """The shared time of every pair of meetings that overlap, as slots."""
+    overlaps = []
+    for a in filter(_timed, section_slots(section_a)):
+        for b in filter(_timed, section_slots(section_b)):
+            days = a[0] & b[0]
+            begin, end = max(a[1], b[1]), min(a[2], b[2])
+            if not days or begin > end:
                 continue
+            minute_begin = minute_end = None
+            if None not in (a[3], a[4], b[3], b[4]) and max(a[3], b[3]) < min(a[4], b[4]):
+                minute_begin, minute_end = max(a[3], b[3]), min(a[4], b[4])
+            overlaps.append([days, begin, end, minute_begin, minute_end])
+    return overlaps
 
-            for day in time_slot['meetDays']:
-                # Compare against current day's commitments
-                for existing_start, existing_end in daily_slots.get(day, []):
-                    # Logic: If (Start_A <= End_B) AND (End_A >= Start_B), they overlap
-                    if max(start, existing_start) <= min(end, existing_end):
-                        return True
 
-                daily_slots[day].append((start, end))
+def conflict_report(options):
+    """Every pair of sections that conflict, by the same rule as the solver.
 
-    return False
+    options: [(mask, section)] as from occupancy_mask.
+    Returns [(i, j, overlaps)] for each conflicting pair i < j, where
+    overlaps are slots (see meetings.py) covering the shared time. Pairs are
+    found by their masks, so only conflicting pairs have their meetings
+    compared."""
+    conflicts = []
+    for i, (mask_a, section_a) in enumerate(options):
+        if not mask_a:
+            continue
+        for j in range(i + 1, len(options)):
+            mask_b, section_b = options[j]
+            if mask_a & mask_b:
+                conflicts.append((i, j, _overlaps(section_a, section_b)))
+    return conflicts
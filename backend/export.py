@@ -0,0 +1,210 @@
+"""
+Calendar export (iCalendar, RFC 5545) for a list of sections.
+
+    build_ics(sections, start, end)    VCALENDAR text, one weekly event per meeting
+
+Events come from the sections' precomputed slots (meetings.py), the same
+data the solver uses, so nothing is parsed again per export. Each meeting
+becomes one event repeating on its days from the first class day on or
+after `start` through `end`, in the campus time zone, which is described by
+a VTIMEZONE covering those dates. Meetings without days or clock times
+(TBA, online) are left out.
+
+The term defaults to SCHEDUGATOR_TERM_START / SCHEDUGATOR_TERM_END
+(Spring 2026, the term ingested by gatorobber.py).
+"""
+
+import os
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from meetings import DAY_BITS, DAY_ORDER, section_slots
+
+TERM_START = date.fromisoformat(os.getenv("SCHEDUGATOR_TERM_START", "2026-01-12"))
+TERM_END = date.fromisoformat(os.getenv("SCHEDUGATOR_TERM_END", "2026-04-22"))
+DEFAULT_TIMEZONE = "America/New_York"
+DEFAULT_CALENDAR_NAME = "ScheduGator Schedule"
+
+# Longest export (about a year) and the years accepted for it
+MAX_RANGE_DAYS = 370
+MIN_YEAR, MAX_YEAR = 2000, 2100
+
+# RRULE day names, in meetings.DAY_ORDER (Monday first, like date.weekday())
+BYDAY = ["MO", "TU", "WE", "TH", "FR", "SA"]
+
+# Longest content line in octets before it is folded
+LINE_OCTETS = 75
+
+
+def escape(text):
+    """Escape a TEXT value (backslash, semicolon, comma, newline)."""
+    return (str(text).replace("\\", "\\\\").replace(";", "\\;")
+            .replace(",", "\\,").replace("\n", "\\n"))
+
+
+def fold(line):
+    """Split a content line into 75-octet pieces, continuations starting with a space."""
+    pieces = []
+    current, size = "", 0
+    for char in line:
+        octets = len(char.encode("utf-8"))
+        if size + octets > LINE_OCTETS:
+            pieces.append(current)
+            current, size = " ", 1
+        current += char
+        size += octets
+    pieces.append(current)
+    return pieces
+
+
+def _local(moment):
+    return moment.strftime("%Y%m%dT%H%M%S")
+
+
+def _utc(moment):
+    return moment.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _offset(delta):
+    minutes = int(delta.total_seconds()) // 60
+    sign = "-" if minutes < 0 else "+"
+    return f"{sign}{abs(minutes) // 60:02d}{abs(minutes) % 60:02d}"
+
+
+# Offset changes are months apart, so checking once a week finds each one
+TRANSITION_STEP = timedelta(days=7)
+
+
+def check_range(start, end):
+    """Raise ValueError unless start..end is an exportable range."""
+    if end < start:
+        raise ValueError("end is before start")
+    if start.year < MIN_YEAR or end.year > MAX_YEAR:
+        raise ValueError(f"Dates must be between {MIN_YEAR} and {MAX_YEAR}")
+    if (end - start).days > MAX_RANGE_DAYS:
+        raise ValueError(f"At most {MAX_RANGE_DAYS} days per export")
+
+
+def _transitions(zone, start, end):
+    """UTC instants in [start, end] where the zone's UTC offset changes."""
+    found = []
+    moment = start
+    while moment < end:
+        step = min(moment + TRANSITION_STEP, end)
+        if moment.astimezone(zone).utcoffset() == step.astimezone(zone).utcoffset():
+            moment = step
+            continue
+        low, high = moment, step
+        # Bisect to the second the new offset starts, then look on from there
+        while high - low > timedelta(seconds=1):
+            middle = low + (high - low) / 2
+            if middle.astimezone(zone).utcoffset() == low.astimezone(zone).utcoffset():
+                low = middle
+            else:
+                high = middle
+        found.append(high.replace(microsecond=0))
+        moment = high
+    return found
+
+
+@lru_cache(maxsize=64)
+def vtimezone(zone, start, end):
+    """VTIMEZONE lines for `zone` from the date `start` through `end`: the
+    observance in effect at the start, then each offset change (DST) in the
+    range, taken from the system time zone database. Cached per term."""
+    begin = datetime.combine(start, time(0, 0), tzinfo=zone)
+    until = datetime.combine(end + timedelta(days=1), time(0, 0), tzinfo=zone)
+    lines = ["BEGIN:VTIMEZONE", f"TZID:{zone.key}"]
+    previous = begin.utcoffset()
+    for moment in [begin.astimezone(timezone.utc)] + _transitions(zone, begin.astimezone(timezone.utc),
+                                                                   until.astimezone(timezone.utc)):
+        local = moment.astimezone(zone)
+        kind = "DAYLIGHT" if local.dst() else "STANDARD"
+        lines += [
+            f"BEGIN:{kind}",
+            # Wall-clock time of the change, in the offset it changes from
+            f"DTSTART:{_local(moment.replace(tzinfo=None) + previous)}",
+            f"TZOFFSETFROM:{_offset(previous)}",
+            f"TZOFFSETTO:{_offset(local.utcoffset())}",
+            f"TZNAME:{local.tzname()}",
+            f"END:{kind}",
+        ]
+        previous = local.utcoffset()
+    lines.append("END:VTIMEZONE")
+    return tuple(lines)
+
+
+def _first_day(start, days):
+    """First date on or after `start` on one of the days in the mask."""
+    for offset in range(7):
+        day = start + timedelta(days=offset)
+        if day.weekday() < len(DAY_ORDER) and days & DAY_BITS[DAY_ORDER[day.weekday()]]:
+            return day
+    return None
+
+
+def _events(course, section, start, until, zone, stamp):
+    """VEVENT lines for each timed meeting of a section."""
+    lines = []
+    raw_meet_times = section.get("meetTimes") or []
+    summary = f"{course['code']} - {course.get('name') or ''}"
+    description = (f"Section {section.get('classNum')}\n"
+                   f"Instructor: {', '.join(section.get('instructors') or []) or 'TBA'}")
+
+    for i, (days, _, _, minute_begin, minute_end) in enumerate(section_slots(section)):
+        if not days or minute_begin is None or minute_end is None:
+            continue  # TBA or online
+        first = _first_day(start, days)
+        if first is None or first > until.date():
+            continue
+        begin = datetime.combine(first, time(minute_begin // 60, minute_begin % 60))
+        end = begin + timedelta(minutes=minute_end - minute_begin)
+        by_day = ",".join(BYDAY[d] for d, name in enumerate(DAY_ORDER) if days & DAY_BITS[name])
+
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:{course['code']}-{section.get('classNum')}-{i}@schedugator",
+            f"DTSTAMP:{_utc(stamp)}",
+            f"SUMMARY:{escape(summary)}",
+            f"DTSTART;TZID={zone.key}:{_local(begin)}",
+            f"DTEND;TZID={zone.key}:{_local(end)}",
+            # UNTIL is in UTC when DTSTART has a time zone
+            f"RRULE:FREQ=WEEKLY;BYDAY={by_day};UNTIL={_utc(until)}",
+        ]
+        raw = raw_meet_times[i] if i < len(raw_meet_times) and isinstance(raw_meet_times[i], dict) else {}
+        location = " ".join(str(part) for part in (raw.get("meetBuilding"), raw.get("meetRoom")) if part)
+        if location:
+            lines.append(f"LOCATION:{escape(location)}")
+        lines += [f"DESCRIPTION:{escape(description)}", "END:VEVENT"]
+    return lines
+
+
+def build_ics(sections, start=None, end=None, calendar_name=None, tz=DEFAULT_TIMEZONE, stamp=None):
+    """iCalendar text for [(course, section)] between the dates `start` and
+    `end` (inclusive; default: the current term). `stamp` is the DTSTAMP of
+    every event (default now). Raises ValueError for an unknown time zone or
+    a range check_range rejects."""
+    start = start or TERM_START
+    end = end or TERM_END
+    check_range(start, end)
+    try:
+        zone = ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown time zone '{tz}'")
+    until = datetime.combine(end, time(23, 59, 59), tzinfo=zone)
+    stamp = stamp or datetime.now(timezone.utc)
+
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//ScheduGator//Schedule Export//EN",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{escape(calendar_name or DEFAULT_CALENDAR_NAME)}",
+        f"X-WR-TIMEZONE:{zone.key}",
+    ] + list(vtimezone(zone, start, end))
+    for course, section in sections:
+        lines += _events(course, section, start, until, zone, stamp)
+    lines.append("END:VCALENDAR")
+    return "".join(piece + "\r\n" for line in lines for piece in fold(line))
@@ -1,13 +1,25 @@
 import requests
 import json
+import os
 import time
+from meetings import normalize_meet_times
+from prereqs import parse_prereqs
+from build_catalog import build_catalog
 
 # --- CONFIGURATION ---
 TERM = "2261"  # Spring 2026
 BASE_URL = "https://one.uf.edu/apix/soc/schedule"
 HEADERS = {"User-Agent": "Mozilla/5.0", "Accept": "application/json"}
 
-def ingest_uf_data():
+def ingest_uf_data(session=requests, delay=0.1, verbose=True, strict=False):
+    """
+    Page through the schedule API and build the processed catalog.
+    Args:
+        session: Anything with a requests-style get() (requests, a Session, or a replay stand-in)
+        delay: Seconds to sleep between pages (anti-throttling)
+        verbose: Print per-page progress
+        strict: Re-raise a failed page instead of returning the courses fetched so far
+    """
     all_processed_courses = []
     last_control = 0
     page_count = 0
@@ -22,7 +34,7 @@ def ingest_uf_data():
         }
         
         try:
-            response = requests.get(BASE_URL, params=params, headers=HEADERS)
+            response = session.get(BASE_URL, params=params, headers=HEADERS)
             response.raise_for_status()
             
             # ONE.UF returns a list containing the data object
@@ -57,6 +69,8 @@ def ingest_uf_data():
                     "dept": dept,
                     "description": course.get("description", ""),
                     "prereqs": course.get("prerequisites", ""),
+                    # Compiled AND/OR expression over course codes (see prereqs.py)
+                    "prereq_expr": parse_prereqs(course.get("prerequisites", "")),
                     "isAI": course.get("isAICourse", False),
                     # grWriting is often per-section; we check the first one
                     "writingWords": int(first_sec.get("grWriting", "0")) if str(first_sec.get("grWriting")).isdigit() else 0,
@@ -65,37 +79,48 @@ def ingest_uf_data():
                 }
 
                 for sec in course.get("sections", []):
+                    meet_times = sec.get("meetTimes", [])
                     processed["sections"].append({
                         "classNum": sec["classNumber"],
                         "instructors": [i["name"] for i in sec.get("instructors", [])],
                         "sectWeb": sec.get("sectWeb", "PC"),
                         "credits": sec["credits"],
-                        "meetTimes": sec.get("meetTimes", [])
+                        "meetTimes": meet_times,
+                        # Parsed once here so search and the solver never re-parse strings
+                        "slots": normalize_meet_times(meet_times)
                     })
                 
                 all_processed_courses.append(processed)
 
             # Progress tracking so you can watch it hit the 'P' block
-            current_prefix = raw_courses[-1]["code"][:3]
-            print(f"Page {page_count} | Total: {len(all_processed_courses)} | Current Prefix: {current_prefix} | Control: {last_control}")
+            if verbose:
+                current_prefix = raw_courses[-1]["code"][:3]
+                print(f"Page {page_count} | Total: {len(all_processed_courses)} | Current Prefix: {current_prefix} | Control: {last_control}")
             
             # Anti-throttling (Crucial for Vultr hosting)
-            time.sleep(0.1) 
+            if delay:
+                time.sleep(delay)
 
         except Exception as e:
             print(f"\n🚨 Ingestion halted at control {last_control}: {e}")
+            if strict:
+                raise
             break
 
     return all_processed_courses
 
 # --- EXECUTION ---
-catalog_data = ingest_uf_data()
+if __name__ == "__main__":
+    catalog_data = ingest_uf_data()
 
-# Save to your Bucket 2 "Universal Base"
-current_dir = os.path.dirname(os.path.abspath(__file__))
-catalog_path = os.path.join(current_dir, '..', 'data', 'universal_base_catalog.json')
+    # Save to your Bucket 2 "Universal Base"
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    catalog_path = os.path.join(current_dir, '..', 'data', 'universal_base_catalog.json')
 
-with open(catalog_path, 'w') as f:
-    json.dump(catalog_data, f, indent=2)
+    with open(catalog_path, 'w') as f:
+        json.dump(catalog_data, f, indent=2)
 
-print(f"--- 🏁 Success: Saved {len(catalog_data)} courses to {catalog_path} ---")
\ No newline at end of file
+    print(f"--- 🏁 Success: Saved {len(catalog_data)} courses to {catalog_path} ---")
+
+    # Precompute indexes/flags once so API workers just load them
+    build_catalog(catalog_path)
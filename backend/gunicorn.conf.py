@@ -0,0 +1,63 @@
+"""
+gunicorn settings for ScheduGator
+
+    gunicorn -c backend/gunicorn.conf.py
+
+The app is loaded once in the master (preload_app) and the workers are forked
+from it, so the catalog, its indexes and the majors are built once and shared
+copy-on-write instead of being loaded by every worker. Per-worker state
+(tool threads, model client, SQLite connections, solver processes) is reset
+after fork and created lazily (api.after_fork).
+
+Settings: PORT (default 5000), WEB_CONCURRENCY workers (default 2),
+SCHEDUGATOR_WORKER_THREADS threads per worker (default 8; a chat turn holds
+one for its whole duration), SCHEDUGATOR_PRELOAD=0 to load the app in each
+worker instead (for comparison). For the async server: -k uvicorn.workers.UvicornWorker
+with wsgi_app asgi:app.
+"""
+
+import gc
+import os
+import sys
+import time
+
+chdir = os.path.dirname(os.path.abspath(__file__))
+wsgi_app = "api:app"
+bind = f"0.0.0.0:{os.getenv('PORT', 5000)}"
+workers = int(os.getenv("WEB_CONCURRENCY", 2))
+worker_class = "gthread"
+threads = int(os.getenv("SCHEDUGATOR_WORKER_THREADS", 8))
+preload_app = os.getenv("SCHEDUGATOR_PRELOAD", "1") == "1"
+# Chat streams stay open while the model answers
+timeout = 120
+
+# No collections while the app loads: freed objects would leave holes in the
+# pages the workers are about to share (Python's gc.freeze() recipe)
+gc.disable()
+
+
+def when_ready(server):
+    # The app is loaded; freeze it before the first worker is forked
+    from prefork import format_report, freeze, startup_report
+    frozen = freeze()
+    gc.enable()
+    server.log.info("🚀 Master ready in %s; %d objects frozen for the workers",
+                    format_report(startup_report()), frozen)
+
+
+def pre_fork(server, worker):
+    # Objects the master created since the last fork (respawns) are shared too
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    worker.forked_at = time.perf_counter()
+    api = sys.modules.get("api")
+    if api is not None:  # Not preloaded: the worker imports its own app after this
+        api.after_fork()
+
+
+def post_worker_init(worker):
+    from prefork import format_memory, memory_usage
+    boot = time.perf_counter() - getattr(worker, "forked_at", time.perf_counter())
+    worker.log.info("👷 Worker %s ready in %.3fs; %s", worker.pid, boot, format_memory(memory_usage()))
@@ -0,0 +1,107 @@
+"""
+HTTP caching and compression for the Flask API.
+
+    etag_for(*parts)      ETag from the catalog version and a normalized request
+    not_modified(etag)    the request's If-None-Match already has this version
+    CACHE_POLICIES        Cache-Control per endpoint (no-store for anything unlisted)
+    init_app(app)         compress large responses and apply the policies
+
+Responses of at least SCHEDUGATOR_COMPRESS_MIN_BYTES (default 1024) are
+compressed with brotli when it is installed and the client accepts it,
+otherwise gzip. A compressed response's ETag is sent weak (like nginx does),
+and compressed bodies are kept per ETag, so repeat hits on an unchanged
+response are not compressed again.
+"""
+
+import gzip
+import hashlib
+import os
+
+from flask import request
+
+from cache import TTLCache
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip only
+    brotli = None
+
+COMPRESS_MIN_BYTES = int(os.getenv("SCHEDUGATOR_COMPRESS_MIN_BYTES", 1024))
+COMPRESSIBLE_TYPES = ("application/json", "text/plain", "text/html", "text/calendar")
+
+# Revalidate searches and calendar exports every time (cheap 304s), let browsers reuse major data for a while
+CACHE_POLICIES = {
+    "search": "no-cache",
+    "search_get": "no-cache",
+    "get_majors": "public, max-age=300",
+    "get_major_details": "public, max-age=300",
+    "schedule_ics": "no-cache",
+}
+
+# (etag, encoding) -> compressed body
+_compressed = TTLCache(maxsize=512, ttl=3600)
+
+
+def etag_for(*parts):
+    """Strong ETag (unquoted) for a response determined entirely by `parts`."""
+    digest = hashlib.sha1("\x1f".join(str(part) for part in parts).encode("utf-8"))
+    return digest.hexdigest()[:20]
+
+
+def not_modified(etag):
+    # Weak comparison: the client may hold the weak ETag of a compressed copy
+    return request.if_none_match.contains_weak(etag)
+
+
+def compressed_cache_stats():
+    return _compressed.stats()
+
+
+def _choose_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+
+def compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+
+def _compress_response(response):
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_TYPES):
+        return
+    response.vary.add("Accept-Encoding")
+    encoding = _choose_encoding()
+    if encoding is None:
+        return
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_BYTES:
+        return
+
+    etag, weak = response.get_etag()
+    compressed = _compressed.get((etag, encoding)) if etag else None
+    if compressed is None:
+        compressed = compress(body, encoding)
+        if etag:
+            _compressed.set((etag, encoding), compressed)
+
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = encoding
+    if etag:
+        response.set_etag(etag, weak=True)
+
+
+def init_app(app):
+    @app.after_request
+    def cache_and_compress(response):
+        if "Cache-Control" not in response.headers:
+            response.headers["Cache-Control"] = CACHE_POLICIES.get(request.endpoint, "no-store")
+        _compress_response(response)
+        return response
@@ -0,0 +1,220 @@
+"""
+Record/replay harness and benchmark for the gatorobber.py ingest pipeline.
+
+Record the raw schedule API pages once (hits one.uf.edu):
+    python backend/ingest_bench.py record --out data/fixtures/2261
+
+Then benchmark the full ingest offline, as often as needed:
+    python backend/ingest_bench.py bench --fixtures data/fixtures/2261 --repeat 3
+
+A recording is only replayed if every page was fetched: record writes a
+manifest.json marking it complete, or incomplete with the error when a
+fetch fails. Each benchmark run happens in a fresh process, so its peak RSS
+is that run's own rather than the high-water mark of earlier runs.
+"""
+
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows: peak RSS is not reported
+    resource = None
+
+import requests
+from gatorobber import ingest_uf_data, TERM
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_FIXTURES = os.path.join(current_dir, '..', 'data', 'fixtures', TERM)
+MANIFEST = 'manifest.json'
+
+
+class IncompleteRecording(Exception):
+    """The recording is missing, or stopped before the last page."""
+
+
+class RecordingSession:
+    """requests-style session that saves every schedule API page it fetches."""
+
+    def __init__(self, out_dir, session=None):
+        self.out_dir = out_dir
+        self.session = session or requests.Session()
+        self.pages = 0
+        os.makedirs(out_dir, exist_ok=True)
+        # Pages from an earlier recording must not mix with this one
+        for old_path in glob.glob(os.path.join(out_dir, 'page_*.json')) + [os.path.join(out_dir, MANIFEST)]:
+            if os.path.exists(old_path):
+                os.remove(old_path)
+
+    def get(self, url, params=None, headers=None):
+        response = self.session.get(url, params=params, headers=headers)
+        response.raise_for_status()
+        page_path = os.path.join(self.out_dir, f"page_{self.pages:04d}.json")
+        with open(page_path, 'w') as f:
+            json.dump({'params': params, 'body': response.json()}, f)
+        self.pages += 1
+        return response
+
+
+    def finish(self, complete, **details):
+        with open(os.path.join(self.out_dir, MANIFEST), 'w') as f:
+            json.dump({'term': TERM, 'complete': complete, 'pages': self.pages, **details}, f)
+
+
+def record(out_dir, session=None):
+    """Fetch every page into out_dir. Raises IncompleteRecording (and marks
+    the recording incomplete) if any fetch fails."""
+    recorder = RecordingSession(out_dir, session)
+    try:
+        catalog = ingest_uf_data(session=recorder, strict=True)
+    except Exception as e:
+        recorder.finish(False, error=str(e))
+        raise IncompleteRecording(f"Recording stopped after {recorder.pages} pages: {e}") from e
+    recorder.finish(True, courses=len(catalog))
+    return recorder.pages, len(catalog)
+
+
+class ReplayResponse:
+    def __init__(self, body):
+        self._body = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._body
+
+
+class ReplaySession:
+    """Stand-in for requests that serves recorded pages keyed by last-control-number."""
+
+    def __init__(self, fixture_dir):
+        try:
+            with open(os.path.join(fixture_dir, MANIFEST), 'r') as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            raise IncompleteRecording(f"No complete recording in {fixture_dir} (no {MANIFEST})")
+        if not manifest.get('complete'):
+            raise IncompleteRecording(f"Recording in {fixture_dir} is incomplete: {manifest.get('error')}")
+        self.pages_by_control = {}
+        for page_path in sorted(glob.glob(os.path.join(fixture_dir, 'page_*.json'))):
+            with open(page_path, 'r') as f:
+                page = json.load(f)
+            control = str(page['params'].get('last-control-number', 0))
+            self.pages_by_control[control] = page['body']
+        if not self.pages_by_control:
+            raise FileNotFoundError(f"No recorded pages in {fixture_dir}")
+        self.requests_served = 0
+
+    def get(self, url, params=None, headers=None):
+        control = str((params or {}).get('last-control-number', 0))
+        self.requests_served += 1
+        # Past the end of the recording the real API returns an empty list
+        return ReplayResponse(self.pages_by_control.get(control, []))
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes on Linux
+    if sys.platform == 'darwin':
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def run_benchmark(fixture_dir, repeat=1):
+    """Run the full ingest against recorded pages and return throughput stats
+    per run, each in a fresh process."""
+    ReplaySession(fixture_dir)  # Fail here, not in a child, if the recording is unusable
+    runs = []
+    for _ in range(repeat):
+        # A new interpreter, not a fork: a forked child starts with this process's peak RSS
+        result = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), 'run-once', '--fixtures', fixture_dir],
+            capture_output=True, text=True, check=True,
+        )
+        runs.append(json.loads(result.stdout.splitlines()[-1]))
+    return runs
+
+
+def _run_once(fixture_dir):
+    """One ingest against recorded pages, with this process's peak RSS."""
+    session = ReplaySession(fixture_dir)
+
+    start = time.perf_counter()
+    catalog = ingest_uf_data(session=session, delay=0, verbose=False)
+    ingest_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    output = json.dumps(catalog, indent=2)
+    serialize_seconds = time.perf_counter() - start
+
+    # The final request is the end-of-data probe, not a page of courses
+    pages = max(session.requests_served - 1, 0)
+    return {
+        'pages': pages,
+        'courses': len(catalog),
+        'sections': sum(len(c['sections']) for c in catalog),
+        'ingest_seconds': ingest_seconds,
+        'pages_per_sec': pages / ingest_seconds if ingest_seconds else 0.0,
+        'courses_per_sec': len(catalog) / ingest_seconds if ingest_seconds else 0.0,
+        'serialize_seconds': serialize_seconds,
+        'output_bytes': len(output.encode('utf-8')),
+        'output_bytes_compact': len(json.dumps(catalog, separators=(',', ':')).encode('utf-8')),
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+
+def _print_run(i, run):
+    rss = f"{run['peak_rss_mb']:.1f} MB" if run['peak_rss_mb'] is not None else "n/a"
+    print(f"Run {i}: {run['pages']} pages, {run['courses']} courses, {run['sections']} sections")
+    print(f"   ⏱️  ingest {run['ingest_seconds']:.3f}s | {run['pages_per_sec']:.1f} pages/sec | {run['courses_per_sec']:.0f} courses/sec")
+    print(f"   💾 output {run['output_bytes'] / 1024:.0f} KB (compact {run['output_bytes_compact'] / 1024:.0f} KB), serialize {run['serialize_seconds']:.3f}s")
+    print(f"   📈 peak RSS {rss}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record and benchmark the ScheduGator ingest pipeline")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    record = sub.add_parser('record', help='Fetch the live schedule API once and save every page')
+    record.add_argument('--out', default=DEFAULT_FIXTURES)
+
+    bench = sub.add_parser('bench', help='Run the ingest pipeline offline against recorded pages')
+    bench.add_argument('--fixtures', default=DEFAULT_FIXTURES)
+    bench.add_argument('--repeat', type=int, default=1)
+    bench.add_argument('--json', action='store_true', help='Print raw stats as JSON')
+
+    run_once = sub.add_parser('run-once', help=argparse.SUPPRESS)
+    run_once.add_argument('--fixtures', default=DEFAULT_FIXTURES)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'run-once':
+        print(json.dumps(_run_once(args.fixtures)))
+        return
+
+    if args.command == 'record':
+        try:
+            pages, courses = record(args.out)
+        except IncompleteRecording as e:
+            sys.exit(f"🚨 {e} - marked incomplete in {args.out}, bench will refuse it")
+        print(f"--- 📼 Recorded {pages} pages ({courses} courses) to {args.out} ---")
+        return
+
+    runs = run_benchmark(args.fixtures, repeat=args.repeat)
+    if args.json:
+        print(json.dumps(runs, indent=2))
+        return
+    for i, run in enumerate(runs, 1):
+        _print_run(i, run)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,305 @@
+"""
+LLM providers for GemmaBrain.
+
+    GeminiProvider     Google GenAI client (Gemma 3 by default); the client is
+                       created lazily on first use, not at import. asend/astream
+                       use its native async client (client.aio)
+    ScriptedProvider   deterministic local stand-in that replays tool-call and
+                       answer responses with configurable latency, for load
+                       testing and profiling the chat pipeline offline
+
+Select with SCHEDUGATOR_LLM ("gemini" or "fake"); fake latency is set with
+SCHEDUGATOR_FAKE_LATENCY_MS.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+
+from tracing import get_logger
+
+log = get_logger("llm")
+
+# --- GEMMA 3 SETUP ---
+# Gemma 3 27B is best for local/agentic tasks
+MODEL_ID = "gemma-3-27b-it"
+
+
+class LLMResponse:
+    """Minimal response object; callers only read .text."""
+
+    __slots__ = ('text',)
+
+    def __init__(self, text):
+        self.text = text
+
+
+class LLMProvider:
+    """Interface: send one prompt (plus optional system prompt prefix) and return an LLMResponse."""
+
+    name = "base"
+
+    def send(self, prompt, system_prompt=None):
+        raise NotImplementedError
+
+    def stream(self, prompt, system_prompt=None):
+        """Yield the response text in chunks as it is generated."""
+        yield self.send(prompt, system_prompt=system_prompt).text
+
+    async def asend(self, prompt, system_prompt=None):
+        """send for async callers. Providers without a native async client
+        run send on a worker thread so the event loop is never blocked."""
+        return await asyncio.to_thread(self.send, prompt, system_prompt)
+
+    async def astream(self, prompt, system_prompt=None):
+        """stream for async callers (one chunk unless overridden)."""
+        response = await self.asend(prompt, system_prompt=system_prompt)
+        yield response.text
+
+    def preload(self):
+        """Before fork: import heavy client libraries once so workers share them.
+        Nothing that opens connections."""
+
+    def after_fork(self):
+        """In a forked worker: drop clients and locks inherited from the parent."""
+
+
+class GeminiProvider(LLMProvider):
+    name = "gemini"
+
+    def __init__(self, api_key=None, model_id=None, context_cache=None):
+        # Settings are read here rather than at import so .env values loaded later still apply
+        self.api_key = api_key or os.getenv("GEMINI_API_KEY")
+        self.model_id = model_id or os.getenv("SCHEDUGATOR_MODEL_ID", MODEL_ID)
+        self._client = None
+        self._types = None
+        # Server-side context caching of the system prompt prefix. Only some models
+        # support it (Gemini yes, Gemma no), so it is opt-in and falls back silently.
+        if context_cache is None:
+            context_cache = os.getenv("SCHEDUGATOR_CONTEXT_CACHE", "0") == "1"
+        self._context_cache_enabled = context_cache
+        self._context_cache_ttl = int(os.getenv("SCHEDUGATOR_CONTEXT_CACHE_TTL", 3600))
+        # system prompt hash -> (cached content name, expires_at)
+        self._context_caches = {}
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from google import genai
+                    from google.genai import types
+                    self._types = types
+                    self._client = genai.Client(api_key=self.api_key)
+        return self._client
+
+    def preload(self):
+        # The SDK takes ~0.7s and tens of MB to import; the client itself
+        # (connection pools) is still created per worker on first use
+        try:
+            from google import genai  # noqa: F401
+            from google.genai import types
+            self._types = types
+        except ImportError as e:
+            log.warning("⚠️ Could not preload the GenAI SDK: %s", e)
+
+    def after_fork(self):
+        self._client = None
+        self._lock = threading.Lock()
+
+    def _get_context_cache(self, system_prompt):
+        """Name of a server-side cached content holding this system prompt, or None."""
+        key = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()
+        now = time.time()
+        cached = self._context_caches.get(key)
+        if cached and cached[1] > now:
+            return cached[0]
+
+        client = self.client
+        with self._lock:
+            cached = self._context_caches.get(key)
+            if cached and cached[1] > now:
+                return cached[0]
+            try:
+                cache = client.caches.create(
+                    model=self.model_id,
+                    config=self._types.CreateCachedContentConfig(
+                        system_instruction=system_prompt,
+                        ttl=f"{self._context_cache_ttl}s",
+                    ),
+                )
+            except Exception as e:
+                # Model doesn't support caching (or prompt below its minimum size)
+                log.warning("⚠️ Context caching unavailable, sending full prompts: %s", e)
+                self._context_cache_enabled = False
+                return None
+            # Refresh a minute early so we never reference an expired cache
+            self._context_caches[key] = (cache.name, now + self._context_cache_ttl - 60)
+            return cache.name
+
+    def _request(self, prompt, system_prompt):
+        """(contents, config) for one prompt. The system prompt prefix is served
+        from the model's context cache when enabled, otherwise prepended."""
+        if system_prompt and self._context_cache_enabled:
+            cache_name = self._get_context_cache(system_prompt)
+            if cache_name:
+                return prompt, self._types.GenerateContentConfig(cached_content=cache_name)
+        if system_prompt:
+            prompt = f"{system_prompt}\n{prompt}"
+        return prompt, None
+
+    def send(self, prompt, system_prompt=None):
+        client = self.client
+        contents, config = self._request(prompt, system_prompt)
+        response = client.models.generate_content(model=self.model_id, contents=contents, config=config)
+        return LLMResponse(response.text)
+
+    def stream(self, prompt, system_prompt=None):
+        client = self.client
+        contents, config = self._request(prompt, system_prompt)
+        for chunk in client.models.generate_content_stream(model=self.model_id, contents=contents, config=config):
+            if chunk.text:
+                yield chunk.text
+
+    async def _arequest(self, prompt, system_prompt):
+        # Creating a context cache is a blocking call; keep it off the event loop
+        if system_prompt and self._context_cache_enabled:
+            return await asyncio.to_thread(self._request, prompt, system_prompt)
+        return self._request(prompt, system_prompt)
+
+    async def asend(self, prompt, system_prompt=None):
+        client = self.client
+        contents, config = await self._arequest(prompt, system_prompt)
+        response = await client.aio.models.generate_content(model=self.model_id, contents=contents, config=config)
+        return LLMResponse(response.text)
+
+    async def astream(self, prompt, system_prompt=None):
+        client = self.client
+        contents, config = await self._arequest(prompt, system_prompt)
+        stream = await client.aio.models.generate_content_stream(model=self.model_id, contents=contents, config=config)
+        async for chunk in stream:
+            if chunk.text:
+                yield chunk.text
+
+
+_COURSE_CODE_RE = re.compile(r"\b([A-Z]{3}\d{4}[A-Z]?)\b", re.IGNORECASE)
+_CLASS_NUM_RE = re.compile(r"\b(\d{5})\b")
+_USER_LINE_RE = re.compile(r"User: (.*)$", re.DOTALL)
+_CHUNK_RE = re.compile(r"\S+\s*|\s+")
+
+
+def default_script(prompt, system_prompt=None):
+    """Plausible model behaviour for load tests: search for course codes, add
+    5-digit class numbers, and answer in plain text after tool results."""
+    if prompt.startswith("Tool results:") or prompt.startswith("Do not return JSON"):
+        return "Here is what I found in the catalog. Would you prefer morning or afternoon sections?"
+
+    match = _USER_LINE_RE.search(prompt)
+    user_text = match.group(1) if match else prompt
+
+    class_nums = _CLASS_NUM_RE.findall(user_text)
+    if class_nums and "add" in user_text.lower():
+        return json.dumps({"tool_calls": [
+            {"name": "add_course", "parameters": {"classNum": int(n)}} for n in class_nums
+        ]})
+
+    codes = [c.upper() for c in _COURSE_CODE_RE.findall(user_text)]
+    if len(codes) == 1:
+        return json.dumps({"name": "search_catalog", "parameters": {"query": codes[0]}})
+    if codes:
+        return json.dumps({"tool_calls": [
+            {"name": "search_catalog", "parameters": {"query": code}} for code in codes
+        ]})
+
+    return "I can help with that. Which courses are you considering this semester?"
+
+
+class ScriptedProvider(LLMProvider):
+    """Deterministic stand-in for the model.
+
+    Args:
+        script: A list of response strings replayed in order (cycling), or a
+            callable (prompt, system_prompt) -> str. Defaults to default_script.
+        latency: Seconds to sleep per call, or a (min, max) tuple for uniform jitter.
+        seed: Seed for the jitter so runs are repeatable.
+    """
+
+    name = "fake"
+
+    def __init__(self, script=None, latency=0.0, seed=0):
+        self.script = script or default_script
+        self.latency = latency
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.call_count = 0
+        # Last few prompts, for assertions in tests (bounded for long load runs)
+        self.recent_prompts = deque(maxlen=50)
+
+    def _next_text(self, prompt, system_prompt):
+        with self._lock:
+            index = self.call_count
+            self.call_count += 1
+            self.recent_prompts.append(prompt)
+            if isinstance(self.latency, tuple):
+                delay = self._random.uniform(*self.latency)
+            else:
+                delay = self.latency
+        if callable(self.script):
+            text = self.script(prompt, system_prompt)
+        else:
+            text = self.script[index % len(self.script)]
+        return text, delay
+
+    def send(self, prompt, system_prompt=None):
+        text, delay = self._next_text(prompt, system_prompt)
+        if delay:
+            time.sleep(delay)
+        return LLMResponse(text)
+
+    def stream(self, prompt, system_prompt=None):
+        """Word-sized chunks; the first arrives after 30% of the latency, the
+        rest are spread over the remainder like a real token stream."""
+        text, delay = self._next_text(prompt, system_prompt)
+        chunks = _CHUNK_RE.findall(text) or [text]
+        if delay:
+            time.sleep(delay * 0.3)
+        gap = delay * 0.7 / len(chunks)
+        for i, chunk in enumerate(chunks):
+            if gap and i:
+                time.sleep(gap)
+            yield chunk
+
+    async def asend(self, prompt, system_prompt=None):
+        text, delay = self._next_text(prompt, system_prompt)
+        if delay:
+            await asyncio.sleep(delay)
+        return LLMResponse(text)
+
+    async def astream(self, prompt, system_prompt=None):
+        text, delay = self._next_text(prompt, system_prompt)
+        chunks = _CHUNK_RE.findall(text) or [text]
+        if delay:
+            await asyncio.sleep(delay * 0.3)
+        gap = delay * 0.7 / len(chunks)
+        for i, chunk in enumerate(chunks):
+            if gap and i:
+                await asyncio.sleep(gap)
+            yield chunk
+
+
+def create_provider(name=None):
+    """Provider named by SCHEDUGATOR_LLM ("gemini" or "fake")."""
+    name = (name or os.getenv("SCHEDUGATOR_LLM", "gemini")).lower()
+    if name in ("fake", "scripted"):
+        latency = float(os.getenv("SCHEDUGATOR_FAKE_LATENCY_MS", 0)) / 1000
+        return ScriptedProvider(latency=latency)
+    if name != "gemini":
+        log.warning("⚠️ Unknown LLM provider '%s' - using gemini", name)
+    return GeminiProvider()
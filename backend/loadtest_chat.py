@@ -0,0 +1,117 @@
+"""
+Offline load test for the chat pipeline using the scripted LLM stand-in.
+
+    python backend/loadtest_chat.py --concurrency 32 --requests 500 --latency-ms 800
+    python backend/loadtest_chat.py --mode async --concurrency 500 --requests 2000
+
+Every request runs the real GemmaBrain.process_input loop (prompt build,
+tool-call parsing, catalog search, add_course) against ScriptedProvider, so
+the numbers reflect our own overhead plus the simulated model latency.
+--mode async drives GemmaBrain.aprocess_input (what asgi.py serves) from one
+event loop instead of a thread per in-flight chat.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from brain import GemmaBrain
+from llm import ScriptedProvider
+from sessions import ChatSession
+
+DEFAULT_MESSAGES = [
+    "Find COP3502C sections",
+    "Show me MAC2312 and PHY2048",
+    "What electives should I take?",
+    "Add 10509 and 13780 to my schedule",
+]
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(latencies, wall_seconds, model_calls):
+    return {
+        'requests': len(latencies),
+        'wall_seconds': wall_seconds,
+        'throughput_rps': len(latencies) / wall_seconds if wall_seconds else 0.0,
+        'p50_ms': _percentile(latencies, 50) * 1000,
+        'p95_ms': _percentile(latencies, 95) * 1000,
+        'p99_ms': _percentile(latencies, 99) * 1000,
+        'mean_ms': statistics.mean(latencies) * 1000,
+        'model_calls_per_request': model_calls / len(latencies) if latencies else 0.0,
+    }
+
+
+def run_threaded(concurrency, total_requests, latency_seconds, messages=None):
+    """Drive process_input from a thread pool; one session per simulated user."""
+    messages = messages or DEFAULT_MESSAGES
+    provider = ScriptedProvider(latency=latency_seconds)
+    brain = GemmaBrain(provider=provider)
+
+    def one_request(i):
+        session = ChatSession(f"load-{i % concurrency}")
+        start = time.perf_counter()
+        brain.process_input(messages[i % len(messages)], session=session)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(one_request, range(total_requests)))
+    wall = time.perf_counter() - start
+    return summarize(latencies, wall, provider.call_count)
+
+
+def run_async(concurrency, total_requests, latency_seconds, messages=None):
+    """Drive aprocess_input from one event loop with at most `concurrency` chats in flight."""
+    messages = messages or DEFAULT_MESSAGES
+    provider = ScriptedProvider(latency=latency_seconds)
+    brain = GemmaBrain(provider=provider)
+
+    async def main():
+        limit = asyncio.Semaphore(concurrency)
+
+        async def one_request(i):
+            async with limit:
+                session = ChatSession(f"load-{i % concurrency}")
+                start = time.perf_counter()
+                await brain.aprocess_input(messages[i % len(messages)], session=session)
+                return time.perf_counter() - start
+
+        return await asyncio.gather(*(one_request(i) for i in range(total_requests)))
+
+    start = time.perf_counter()
+    latencies = asyncio.run(main())
+    wall = time.perf_counter() - start
+    return summarize(latencies, wall, provider.call_count)
+
+
+def print_summary(label, stats):
+    print(f"--- {label}: {stats['requests']} requests in {stats['wall_seconds']:.2f}s "
+          f"({stats['throughput_rps']:.1f} req/s) ---")
+    print(f"   ⏱️  p50 {stats['p50_ms']:.0f} ms | p95 {stats['p95_ms']:.0f} ms | "
+          f"p99 {stats['p99_ms']:.0f} ms | mean {stats['mean_ms']:.0f} ms")
+    print(f"   🧠 {stats['model_calls_per_request']:.2f} model calls per request")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test /api/chat's pipeline with a fake LLM")
+    parser.add_argument('--mode', choices=['threads', 'async'], default='threads')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--latency-ms', type=float, default=500.0,
+                        help='Simulated model latency per call')
+    args = parser.parse_args(argv)
+
+    run = run_async if args.mode == 'async' else run_threaded
+    stats = run(args.concurrency, args.requests, args.latency_ms / 1000)
+    print_summary(f"{args.mode} x{args.concurrency}", stats)
+
+
+if __name__ == '__main__':
+    main()
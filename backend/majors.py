@@ -0,0 +1,195 @@
+"""
+Major requirements registry.
+
+bucket_1.json is loaded once into a dict keyed by major code, and everything
+the API hands out per major is computed at load time instead of per request:
+
+    Major.rules            normalized requirements (critical tracking under required_courses)
+    Major.body / .etag     encoded /api/major/<code> response
+    Major.prompt_section   the major's part of the chat system prompt
+    MajorRegistry.listing()   encoded /api/majors response and its ETag
+
+The file's mtime is checked at most every SCHEDUGATOR_MAJORS_RELOAD_SECONDS
+(default 2), so an edited bucket_1.json is served without a restart.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+from tracing import get_logger
+
+log = get_logger("majors")
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+BUCKET_PATH = os.path.join(current_dir, '..', 'data', 'bucket_1.json')
+RELOAD_CHECK_SECONDS = float(os.getenv("SCHEDUGATOR_MAJORS_RELOAD_SECONDS", 2))
+
+_MAJOR_IN_PARENS_RE = re.compile(r"\(([A-Z]{2,4})\)")
+
+
+def normalize_major(major):
+    """Move critical tracking to required_courses if it was placed under gpa_gate."""
+    gpa_gate = major.get('gpa_gate')
+    if isinstance(gpa_gate, dict) and 'critical_tracking' in gpa_gate:
+        gpa_critical = gpa_gate.pop('critical_tracking')
+        if gpa_critical is not None:
+            required_courses = major.setdefault('required_courses', {})
+            if 'critical_tracking' not in required_courses:
+                required_courses['critical_tracking'] = gpa_critical
+    return major
+
+
+def major_code_from_context(major_context):
+    """'Computer Science (CPS)' or 'CPS - Engineering' -> 'CPS', else None."""
+    if not isinstance(major_context, str) or not major_context:
+        return None
+    match = _MAJOR_IN_PARENS_RE.search(major_context)
+    if match:
+        return match.group(1)
+    token = major_context.split("-")[0].strip().upper()
+    if 2 <= len(token) <= 4 and token.isalpha():
+        return token
+    return None
+
+
+def prompt_section(major_rules):
+    """The ACTIVE MAJOR REQUIREMENTS block appended to the system prompt."""
+    major_code = major_rules.get("major_code", "Unknown")
+    required_courses = major_rules.get("required_courses", {})
+    critical_tracking = required_courses.get("critical_tracking", []) if isinstance(required_courses, dict) else []
+    technical_electives = major_rules.get("technical_electives", {})
+    gpa_gate = major_rules.get("gpa_gate", {})
+    semester_plan = major_rules.get("semester_plan", [])
+
+    # Build the GOLD rules section for this specific major
+    major_section = f"\n--- ACTIVE MAJOR REQUIREMENTS: {major_code} ---\n"
+
+    if critical_tracking:
+        major_section += f"CRITICAL TRACKING COURSES (Gold Rules for {major_code}):\n"
+        major_section += f"These must be completed early and are GPA gates: {', '.join(critical_tracking)}\n"
+
+    if gpa_gate:
+        critical_min = gpa_gate.get("critical_tracking_min")
+        uf_min = gpa_gate.get("uf_cumulative_min")
+        if critical_min or uf_min:
+            major_section += "GPA GATES: "
+            gates = []
+            if critical_min:
+                gates.append(f"Critical Tracking min={critical_min}")
+            if uf_min:
+                gates.append(f"UF Cumulative min={uf_min}")
+            major_section += ", ".join(gates) + "\n"
+
+    if isinstance(technical_electives, dict) and technical_electives:
+        total_req = technical_electives.get("total_required", 0)
+        if total_req:
+            major_section += f"TECHNICAL ELECTIVES: Must complete {total_req} credit hours from approved list\n"
+
+    if semester_plan:
+        major_section += f"SUGGESTED SEQUENCE: {len(semester_plan)} semesters planned\n"
+
+    # Add the full major rules as JSON for reference (compact separators save tokens)
+    major_json = json.dumps(major_rules, separators=(",", ":"), ensure_ascii=True)
+    major_section += f"\nFull Major Requirements (JSON):\n{major_json}\n"
+    return major_section
+
+
+def _encode(payload):
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def _etag(body):
+    return hashlib.sha1(body).hexdigest()[:16]
+
+
+class Major:
+    """One major's rules plus its pre-encoded API body and prompt section."""
+
+    __slots__ = ('code', 'rules', 'body', 'etag', 'prompt_section')
+
+    def __init__(self, rules):
+        self.code = rules['major_code']
+        self.rules = rules
+        self.body = _encode({'major': rules, 'status': 'success'})
+        self.etag = _etag(self.body)
+        self.prompt_section = prompt_section(rules)
+
+
+class MajorRegistry:
+    """Majors by code, reloaded when the requirements file changes."""
+
+    def __init__(self, path=BUCKET_PATH, reload_seconds=RELOAD_CHECK_SECONDS):
+        self.path = path
+        self.reload_seconds = reload_seconds
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._checked_at = 0.0
+        self._majors = {}
+        self._listing = (b"", "")
+        self._load()
+
+    def _file_stamp(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self):
+        stamp = self._file_stamp()
+        with open(self.path, 'r') as f:
+            data = json.load(f)
+
+        majors = {}
+        for rules in data:
+            major = Major(normalize_major(rules))
+            majors[major.code.upper()] = major
+
+        listing = [
+            {
+                'major_code': m.code,
+                'college': m.rules.get('college', 'Unknown'),
+                'total_credits': m.rules.get('total_credits', 120)
+            }
+            for m in majors.values()
+        ]
+        list_body = _encode({'majors': listing, 'count': len(listing), 'status': 'success'})
+
+        # Readers see either the old or the new registry, never a mix
+        self._majors = majors
+        self._listing = (list_body, _etag(list_body))
+        self._stamp = stamp
+        log.info("🎓 Loaded %d majors from %s", len(majors), os.path.basename(self.path))
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_seconds:
+            return
+        with self._lock:
+            if now - self._checked_at < self.reload_seconds:
+                return
+            self._checked_at = now
+            try:
+                if self._file_stamp() != self._stamp:
+                    self._load()
+            except (OSError, ValueError) as e:
+                # Mid-write or broken edit: keep serving the last good version
+                log.warning("⚠️ Could not reload %s: %s", self.path, e)
+
+    def get(self, code):
+        """Major for a code (case-insensitive), or None."""
+        self._maybe_reload()
+        return self._majors.get(str(code or "").upper())
+
+    def rules(self, code):
+        major = self.get(code)
+        return major.rules if major else None
+
+    def listing(self):
+        """(body, etag) of the /api/majors response."""
+        self._maybe_reload()
+        return self._listing
+
+    def __len__(self):
+        return len(self._majors)
@@ -0,0 +1,176 @@
+"""
+Compact meeting-time normalization for ScheduGator.
+
+The schedule API describes each meeting with string periods ("E1"), clock
+strings ("10:40 AM") and a list of day letters. Ingestion turns every
+meeting into a compact slot once so search and the solver only compare
+integers:
+
+    [day_mask, period_begin, period_end, minute_begin, minute_end]
+
+Any field that cannot be parsed (TBA, online, irregular) is stored as None.
+"""
+
+# One bit per meeting day. Unknown day letters (e.g. Sunday) are ignored.
+DAY_BITS = {"M": 1, "T": 2, "W": 4, "R": 8, "F": 16, "S": 32}
+DAY_ORDER = ["M", "T", "W", "R", "F", "S"]
+
+# Map evening periods to continue the sequence (11 -> 12, 13, 14)
+PERIOD_INDEX = {
+    "1": 1, "2": 2, "3": 3, "4": 4, "5": 5, "6": 6,
+    "7": 7, "8": 8, "9": 9, "10": 10, "11": 11,
+    "E1": 12, "E2": 13, "E3": 14
+}
+PERIOD_LABELS = {index: label for label, index in PERIOD_INDEX.items()}
+
+# UF period start times (minutes since midnight), used when a meeting only
+# carries period numbers. Every period is 50 minutes long.
+PERIOD_START_MINUTES = {
+    1: 445, 2: 510, 3: 575, 4: 640, 5: 705, 6: 770, 7: 835,
+    8: 900, 9: 965, 10: 1030, 11: 1095, 12: 1160, 13: 1220, 14: 1280
+}
+PERIOD_LENGTH_MINUTES = 50
+
+# Sort key for sections without any usable meeting time
+NO_TIME = 999999
+
+
+def parse_clock(value):
+    """Convert a clock string like '10:40 AM' to minutes since midnight, or None."""
+    if not isinstance(value, str):
+        return None
+
+    text = value.strip().upper()
+    if 'AM' not in text and 'PM' not in text:
+        return None
+
+    is_pm = 'PM' in text
+    time_part = text.replace('AM', '').replace('PM', '').strip()
+    try:
+        if ':' in time_part:
+            hour, minute = time_part.split(':')
+            hour = int(hour)
+            minute = int(minute)
+        else:
+            hour = int(time_part)
+            minute = 0
+    except ValueError:
+        return None
+
+    # Convert to 24-hour format
+    if is_pm and hour != 12:
+        hour += 12
+    elif not is_pm and hour == 12:
+        hour = 0
+
+    return hour * 60 + minute
+
+
+def parse_period(value):
+    """Convert a period like 3, "3" or "E1" to its index (1-14), or None."""
+    if value is None:
+        return None
+    return PERIOD_INDEX.get(str(value).strip().upper())
+
+
+def day_mask(days):
+    """Fold a list of day letters into a bitmask."""
+    mask = 0
+    for day in days or []:
+        mask |= DAY_BITS.get(str(day).strip().upper(), 0)
+    return mask
+
+
+def normalize_meeting(meet_time):
+    """Turn one raw meetTimes dict into a compact slot list."""
+    period_begin = parse_period(meet_time.get('meetPeriodBegin'))
+    period_end = parse_period(meet_time.get('meetPeriodEnd'))
+
+    minute_begin = parse_clock(meet_time.get('meetTimeBegin'))
+    minute_end = parse_clock(meet_time.get('meetTimeEnd'))
+
+    # Fall back to the period table when the clock strings are missing
+    if minute_begin is None and period_begin is not None:
+        minute_begin = PERIOD_START_MINUTES[period_begin]
+    if minute_end is None and period_end is not None:
+        minute_end = PERIOD_START_MINUTES[period_end] + PERIOD_LENGTH_MINUTES
+
+    return [
+        day_mask(meet_time.get('meetDays')),
+        period_begin,
+        period_end,
+        minute_begin,
+        minute_end,
+    ]
+
+
+def normalize_meet_times(meet_times):
+    """Normalize a section's raw meetTimes list into compact slots."""
+    return [normalize_meeting(mt) for mt in meet_times or [] if isinstance(mt, dict)]
+
+
+def section_slots(section):
+    """Return the precomputed slots for a section, computing them for older catalogs."""
+    slots = section.get('slots')
+    if slots is None:
+        slots = normalize_meet_times(section.get('meetTimes'))
+    return slots
+
+
+def ensure_slots(catalog):
+    """Fill in 'slots' for every section of a catalog ingested before normalization."""
+    for course in catalog:
+        for section in course.get('sections', []):
+            if 'slots' not in section:
+                section['slots'] = normalize_meet_times(section.get('meetTimes'))
+    return catalog
+
+
+def earliest_minutes(section):
+    """Earliest meeting start (minutes since midnight) for a section."""
+    earliest = NO_TIME
+    for slot in section_slots(section):
+        minute_begin = slot[3]
+        if minute_begin is not None and minute_begin < earliest:
+            earliest = minute_begin
+    return earliest
+
+
+def _format_days(mask):
+    return "".join(day for day in DAY_ORDER if mask & DAY_BITS[day]) or "TBA"
+
+
+def _format_minutes(minutes):
+    return f"{minutes // 60}:{minutes % 60:02d}"
+
+
+def format_slot(slot):
+    """Render a slot as a short string like 'MWF 3 (9:35-10:25)'."""
+    days, period_begin, period_end, minute_begin, minute_end = slot
+    text = _format_days(days)
+
+    if period_begin is not None:
+        periods = PERIOD_LABELS[period_begin]
+        if period_end is not None and period_end != period_begin:
+            periods += "-" + PERIOD_LABELS[period_end]
+        text += f" {periods}"
+
+    if minute_begin is not None and minute_end is not None:
+        text += f" ({_format_minutes(minute_begin)}-{_format_minutes(minute_end)})"
+
+    return text
+
+
+def format_meetings(section):
+    """Compact meeting strings for a section, including building/room when known."""
+    meetings = []
+    raw_meet_times = section.get('meetTimes') or []
+    for i, slot in enumerate(section_slots(section)):
+        text = format_slot(slot)
+        raw = raw_meet_times[i] if i < len(raw_meet_times) else {}
+        building = raw.get('meetBuilding') if isinstance(raw, dict) else None
+        if building:
+            room = raw.get('meetRoom')
+            text += f" {building} {room}" if room else f" {building}"
+        meetings.append(text)
+    return meetings
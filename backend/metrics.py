@@ -0,0 +1,167 @@
+"""
+In-process counters, histograms and gauges, exposed in Prometheus text format.
+
+    increment('model_calls_total', purpose='answer')
+    observe('http_request_duration_seconds', 0.042, route='/api/search')
+    add_collector(lambda: [('sessions_active', len(store), {})])
+    snapshot()  ->  {'model_calls_total{purpose="answer"}': 1, ...}
+    render()    ->  text for GET /api/metrics
+
+Updates are a dict lookup and a few adds under one lock. Gauges are not
+stored: collectors are called when the metrics are rendered. Spans from
+tracing.py become stage_seconds histograms through observe_span.
+
+Everything is per worker process and resets on restart.
+"""
+
+import bisect
+import threading
+from collections import defaultdict
+
+_lock = threading.Lock()
+_counters = defaultdict(float)
+_histograms = {}  # (name, rendered labels) -> [bucket counts..., +Inf count, sum]
+_buckets = {}  # histogram name -> upper bounds
+_collectors = []
+
+# Seconds; Prometheus' defaults plus 30s and 60s for model-bound chat turns
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+# Backtracking nodes visited per solve
+NODE_BUCKETS = (1, 10, 100, 1000, 10000, 100000, 1000000)
+
+# Span attributes that become labels (others, like prompt_chars, would explode cardinality)
+SPAN_LABELS = ("purpose", "tool", "error")
+
+
+def _labels(labels):
+    return ",".join(f'{k}="{labels[k]}"' for k in sorted(labels))
+
+
+def _key(name, labels):
+    if not labels:
+        return name
+    return f"{name}{{{_labels(labels)}}}"
+
+
+def increment(name, amount=1, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] += amount
+
+
+def get(name, **labels):
+    with _lock:
+        return _counters.get(_key(name, labels), 0)
+
+
+def observe(name, value, buckets=LATENCY_BUCKETS, **labels):
+    """Record one value in a histogram. A name's buckets are fixed by its first use."""
+    key = (name, _labels(labels))
+    with _lock:
+        series = _histograms.get(key)
+        if series is None:
+            bounds = _buckets.setdefault(name, tuple(buckets))
+            series = _histograms[key] = [0] * (len(bounds) + 2)
+        else:
+            bounds = _buckets[name]
+        series[bisect.bisect_left(bounds, value)] += 1
+        series[-1] += value
+
+
+def get_histogram(name, **labels):
+    """{'count', 'sum', 'buckets': {upper bound: cumulative count}} or None."""
+    with _lock:
+        series = _histograms.get((name, _labels(labels)))
+        if series is None:
+            return None
+        series = list(series)
+        bounds = _buckets[name]
+    cumulative = 0
+    buckets = {}
+    for bound, count in zip(bounds + (float("inf"),), series):
+        cumulative += count
+        buckets[bound] = cumulative
+    return {"count": cumulative, "sum": series[-1], "buckets": buckets}
+
+
+def observe_span(name, seconds, attrs):
+    """tracing span listener: stage_seconds{stage=<span or trace name>}."""
+    labels = {k: attrs[k] for k in SPAN_LABELS if k in attrs}
+    observe("stage_seconds", seconds, stage=name, **labels)
+
+
+def add_collector(collector, kind="gauge"):
+    """collector() -> iterable of (name, value, labels dict), called on render.
+    kind="counter" for running totals kept elsewhere (e.g. TTLCache hits)."""
+    _collectors.append((collector, kind))
+
+
+def snapshot():
+    with _lock:
+        return dict(_counters)
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+        _buckets.clear()
+
+
+def _number(value):
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    value = float(value)
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _series(name, labels, extra=""):
+    labels = ",".join(part for part in (labels, extra) if part)
+    return f"{name}{{{labels}}}" if labels else name
+
+
+def render():
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: list(series) for key, series in _histograms.items()}
+        buckets = dict(_buckets)
+
+    lines = []
+    typed = set()
+
+    def type_line(name, kind):
+        if name not in typed:
+            typed.add(name)
+            lines.append(f"# TYPE {name} {kind}")
+
+    # Sorted by metric name first so each counter's series stay together
+    for key in sorted(counters, key=lambda key: (key.split("{", 1)[0], key)):
+        type_line(key.split("{", 1)[0], "counter")
+        lines.append(f"{key} {_number(counters[key])}")
+
+    for (name, labels) in sorted(histograms):
+        series = histograms[(name, labels)]
+        type_line(name, "histogram")
+        cumulative = 0
+        for bound, count in zip(buckets[name] + (float("inf"),), series):
+            cumulative += count
+            le = 'le="%s"' % _number(bound)
+            lines.append(f"{_series(name + '_bucket', labels, le)} {cumulative}")
+        lines.append(f"{_series(name + '_sum', labels)} {_number(series[-1])}")
+        lines.append(f"{_series(name + '_count', labels)} {cumulative}")
+
+    # Series of one metric must be listed together, whichever collectors report them
+    collected = {}
+    for collector, kind in _collectors:
+        for name, value, labels in collector():
+            if value is not None:
+                collected.setdefault(name, (kind, []))[1].append(f"{_key(name, labels)} {_number(value)}")
+    for name in sorted(collected):
+        kind, series = collected[name]
+        type_line(name, kind)
+        lines.extend(series)
+
+    return "\n".join(lines) + "\n"
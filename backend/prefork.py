@@ -0,0 +1,75 @@
+"""
+Startup bookkeeping for pre-forking servers (gunicorn --preload, see gunicorn.conf.py).
+
+    with startup_phase("catalog"):   # timed into the startup report
+        ...
+    startup_report()                 # {"phases": {...}, "total_seconds": ..., "memory": {...}}
+                                     # (total counted from the top of api.py, which imports this first)
+    memory_usage()                   # this process's RSS / PSS / private memory in MB
+    freeze()                         # just before fork: move everything loaded so far out of the GC
+
+With the app preloaded in the master, the catalog, its indexes, the majors
+and the prebuilt prompts are built once and shared copy-on-write by every
+worker. freeze() keeps it that way: CPython's collector writes to the header
+of every object it visits, which would copy the shared pages into each worker
+one by one. Anything that owns threads, sockets or file handles (tool pool,
+model client, SQLite connections, solver processes) is created lazily in the
+worker instead (api.after_fork).
+"""
+
+import gc
+import resource
+import time
+from contextlib import contextmanager
+
+_phases = {}
+_started = time.perf_counter()
+
+
+@contextmanager
+def startup_phase(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _phases[name] = _phases.get(name, 0.0) + time.perf_counter() - start
+
+
+def memory_usage():
+    """Resident, proportional (shared pages split between the processes using
+    them) and private memory in MB. Only RSS (peak) is available off Linux."""
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line and not line.startswith(" "))
+        kb = {name: int(value.split()[0]) for name, value in fields.items() if value.strip().endswith("kB")}
+        return {
+            "rss_mb": round(kb["Rss"] / 1024, 1),
+            "pss_mb": round(kb["Pss"] / 1024, 1),
+            "private_mb": round((kb["Private_Clean"] + kb["Private_Dirty"]) / 1024, 1),
+        }
+    except (OSError, KeyError, ValueError):
+        return {"rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)}
+
+
+def startup_report():
+    return {
+        "phases": {name: round(seconds, 3) for name, seconds in _phases.items()},
+        "total_seconds": round(time.perf_counter() - _started, 3),
+        "memory": memory_usage(),
+    }
+
+
+def format_memory(memory):
+    return ", ".join(f"{name[:-3]} {mb:.0f}MB" for name, mb in memory.items())
+
+
+def format_report(report):
+    phases = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in report["phases"].items())
+    return f"{report['total_seconds']:.2f}s ({phases}); {format_memory(report['memory'])}"
+
+
+def freeze():
+    """Move every object alive now to the GC's permanent generation (never
+    scanned again). Returns how many objects are frozen."""
+    gc.freeze()
+    return gc.get_freeze_count()
@@ -0,0 +1,318 @@
+"""
+Prerequisite parsing and eligibility checks for ScheduGator.
+
+The schedule API ships prerequisites as free text, e.g.
+"(MAC 2311 or MAC 2233) and PHY 2048 with a minimum grade of C".
+Ingestion compiles that text once into a small AND/OR expression over
+course codes:
+
+    "COP3502"                      a single required course
+    ["and", [expr, expr, ...]]     every child required
+    ["or", [expr, expr, ...]]      any one child is enough
+    None                           no course prerequisites
+
+Words that are not course codes ("instructor permission", grades) are
+ignored; only course requirements are enforced.
+"""
+
+import re
+
+_TOKEN_RE = re.compile(
+    r"(?P<code>\b[A-Z]{3}\s?\d{4}[A-Z]?\b)"
+    r"|(?P<and>\band\b|&)"
+    r"|(?P<or>\bor\b)"
+    r"|(?P<comma>,)"
+    r"|(?P<semi>;)"
+    r"|(?P<lp>\()"
+    r"|(?P<rp>\))",
+    re.IGNORECASE,
+)
+
+# Clause limit when expanding an expression to DNF for the bitset evaluator
+MAX_DNF_CLAUSES = 64
+
+
+def canonical_code(code):
+    """Normalize a course code for prerequisite matching.
+    'cop 3502c' and 'COP3502' both become 'COP3502' (the combined-lecture 'C'
+    suffix is dropped; lab suffixes like 'L' are kept since labs are separate courses)."""
+    code = re.sub(r"\s+", "", str(code)).upper()
+    if code.endswith("C") and len(code) > 7:
+        code = code[:-1]
+    return code
+
+
+def _tokenize(text):
+    tokens = []
+    for match in _TOKEN_RE.finditer(text):
+        kind = match.lastgroup
+        if kind == "code":
+            tokens.append(("code", canonical_code(match.group())))
+        else:
+            tokens.append((kind, None))
+    return _resolve_commas(tokens)
+
+
+def _resolve_commas(tokens):
+    """Give each comma the operator of the next and/or in the same group.
+    'A, B, or C' is an OR list; a bare 'A, B' is an AND list."""
+    resolved = []
+    for i, (kind, value) in enumerate(tokens):
+        if kind != "comma":
+            resolved.append((kind, value))
+            continue
+        operator = "and"
+        depth = 0
+        for next_kind, _ in tokens[i + 1:]:
+            if next_kind == "lp":
+                depth += 1
+            elif next_kind == "rp":
+                if depth == 0:
+                    break
+                depth -= 1
+            elif depth == 0 and next_kind == "semi":
+                break
+            elif depth == 0 and next_kind in ("and", "or"):
+                operator = next_kind
+                break
+        # 'A, or B' - the comma and the operator collapse into one
+        if i + 1 < len(tokens) and tokens[i + 1][0] in ("and", "or"):
+            continue
+        resolved.append((operator, None))
+    return resolved
+
+
+class _Parser:
+    """Forgiving recursive-descent parser: ';' separates AND-ed clauses, OR binds
+    looser than AND, adjacent codes are an implicit AND, and stray operators/parens are skipped."""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos][0] if self.pos < len(self.tokens) else None
+
+    def parse(self):
+        expr = None
+        # Keep going past ';' and unmatched ')' so trailing requirements are not lost
+        while self.pos < len(self.tokens):
+            part = self.parse_or()
+            expr = _combine("and", [expr, part])
+            if self.peek() is not None:
+                self.pos += 1
+        return expr
+
+    def parse_or(self):
+        terms = [self.parse_and()]
+        while self.peek() == "or":
+            self.pos += 1
+            terms.append(self.parse_and())
+        return _combine("or", terms)
+
+    def parse_and(self):
+        factors = [self.parse_atom()]
+        while self.peek() in ("and", "code", "lp"):
+            if self.peek() == "and":
+                self.pos += 1
+            factors.append(self.parse_atom())
+        return _combine("and", factors)
+
+    def parse_atom(self):
+        kind = self.peek()
+        if kind == "code":
+            value = self.tokens[self.pos][1]
+            self.pos += 1
+            return value
+        if kind == "lp":
+            self.pos += 1
+            expr = self.parse_or()
+            if self.peek() == "rp":
+                self.pos += 1
+            return expr
+        return None
+
+
+def _combine(op, children):
+    """Build an and/or node, dropping empty children and flattening same-op nesting."""
+    flat = []
+    for child in children:
+        if child is None:
+            continue
+        if isinstance(child, list) and child[0] == op:
+            flat.extend(child[1])
+        elif child not in flat:
+            flat.append(child)
+    if not flat:
+        return None
+    if len(flat) == 1:
+        return flat[0]
+    return [op, flat]
+
+
+def parse_prereqs(text):
+    """Compile a free-text prerequisite string into an AND/OR expression."""
+    if not text or not isinstance(text, str):
+        return None
+    return _Parser(_tokenize(text)).parse()
+
+
+def ensure_prereq_exprs(catalog):
+    """Fill in 'prereq_expr' for catalogs ingested before prerequisite parsing."""
+    for course in catalog:
+        if 'prereq_expr' not in course:
+            course['prereq_expr'] = parse_prereqs(course.get('prereqs'))
+    return catalog
+
+
+def expr_codes(expr):
+    """All course codes referenced by an expression."""
+    if expr is None:
+        return set()
+    if isinstance(expr, str):
+        return {expr}
+    codes = set()
+    for child in expr[1]:
+        codes |= expr_codes(child)
+    return codes
+
+
+def evaluate(expr, completed):
+    """Evaluate an expression against a set of canonical completed codes."""
+    if expr is None:
+        return True
+    if isinstance(expr, str):
+        return expr in completed
+    op, children = expr
+    if op == "and":
+        return all(evaluate(child, completed) for child in children)
+    return any(evaluate(child, completed) for child in children)
+
+
+def _course_expr(course):
+    if 'prereq_expr' in course:
+        return course['prereq_expr']
+    return parse_prereqs(course.get('prereqs'))
+
+
+def is_eligible(completed_codes, course):
+    """True if the completed courses satisfy a course's prerequisites.
+    Args:
+        completed_codes: Iterable of course codes (e.g., ['MAC2311', 'COP 3502C'])
+        course: Catalog course dict (uses 'prereq_expr', or parses 'prereqs')
+    """
+    completed = {canonical_code(code) for code in completed_codes or []}
+    return evaluate(_course_expr(course), completed)
+
+
+class PrereqGraph:
+    """Prerequisite DAG over the catalog with a bitset evaluator.
+
+    Every course code gets an integer id; a set of codes is an int bitmask.
+    Each course's expression is expanded once into DNF (a list of AND-clause
+    masks), so eligibility is `any(clause & completed == clause)`.
+    """
+
+    def __init__(self, catalog):
+        self.ids = {}
+        self.codes = []  # id -> code
+        self.exprs = {}
+        self.clauses = {}
+        # code -> set of codes it directly requires (edges of the DAG)
+        self.requires = {}
+
+        for course in catalog:
+            code = canonical_code(course['code'])
+            expr = _course_expr(course)
+            self._id(code)
+            for required in expr_codes(expr):
+                self._id(required)
+            self.exprs[code] = expr
+            self.requires[code] = expr_codes(expr)
+            self.clauses[code] = self._compile(expr)
+
+    def _id(self, code):
+        if code not in self.ids:
+            self.ids[code] = len(self.ids)
+            self.codes.append(code)
+        return self.ids[code]
+
+    def _compile(self, expr):
+        """Expand an expression to DNF masks, or None if it grows past MAX_DNF_CLAUSES."""
+        if expr is None:
+            return [0]
+        if isinstance(expr, str):
+            return [1 << self.ids[expr]]
+        op, children = expr
+        compiled = [self._compile(child) for child in children]
+        if any(c is None for c in compiled):
+            return None
+        if op == "or":
+            clauses = [clause for child in compiled for clause in child]
+        else:
+            clauses = [0]
+            for child in compiled:
+                clauses = [a | b for a in clauses for b in child]
+                if len(clauses) > MAX_DNF_CLAUSES:
+                    return None
+        if len(clauses) > MAX_DNF_CLAUSES:
+            return None
+        return sorted(set(clauses))
+
+    def mask(self, codes):
+        """Bitmask for a collection of course codes (unknown codes are ignored)."""
+        bits = 0
+        for code in codes or []:
+            course_id = self.ids.get(canonical_code(code))
+            if course_id is not None:
+                bits |= 1 << course_id
+        return bits
+
+    def _eligible(self, code, completed_mask, completed):
+        clauses = self.clauses.get(code)
+        if clauses is None:
+            if code not in self.exprs:
+                return True  # Not in the catalog: nothing to enforce
+            return evaluate(self.exprs[code], completed)
+        return any(clause & completed_mask == clause for clause in clauses)
+
+    def is_eligible(self, completed_codes, course_code):
+        completed = {canonical_code(code) for code in completed_codes or []}
+        return self._eligible(canonical_code(course_code), self.mask(completed), completed)
+
+    def eligible_courses(self, completed_codes, course_codes):
+        """Batch query: which of these course codes can the student take now?
+        Returns the eligible codes in input order."""
+        completed = {canonical_code(code) for code in completed_codes or []}
+        completed_mask = self.mask(completed)
+        return [
+            code for code in course_codes
+            if self._eligible(canonical_code(code), completed_mask, completed)
+        ]
+
+    def missing(self, completed_codes, course_code):
+        """The fewest courses still needed to satisfy a course's prerequisites:
+        the DNF clause with the fewest uncompleted codes ('A or B' needs one of
+        them, not both). Empty when the course is already eligible."""
+        completed = {canonical_code(code) for code in completed_codes or []}
+        code = canonical_code(course_code)
+        clauses = self.clauses.get(code)
+        if clauses is None:
+            return sorted(_cheapest_unmet(self.exprs.get(code), completed))
+        completed_mask = self.mask(completed)
+        needed = min((clause & ~completed_mask for clause in clauses), key=lambda bits: bin(bits).count("1"))
+        return sorted(self.codes[i] for i in range(needed.bit_length()) if needed >> i & 1)
+
+
+def _cheapest_unmet(expr, completed):
+    """Uncompleted codes for the cheapest way to satisfy an expression (for
+    expressions too large to expand to DNF)."""
+    if expr is None:
+        return set()
+    if isinstance(expr, str):
+        return set() if expr in completed else {expr}
+    op, children = expr
+    unmet = [_cheapest_unmet(child, completed) for child in children]
+    if op == "and":
+        return set().union(*unmet)
+    return min(unmet, key=len)
@@ -0,0 +1,254 @@
+"""
+Rate limiting and admission control.
+
+Endpoints fall into classes with their own per-client token buckets:
+
+    chat      /api/chat, /api/chat/stream          model-bound, seconds per request
+    solve     /api/generate-schedule(s)            CPU-bound
+    catalog   search, majors, eligibility, ...     cheap lookups
+    (exempt)  /api/health, /api/metrics, CORS preflights
+
+Chat also has a concurrency limit per worker. Under gunicorn's gthread
+worker every request needs one of the worker's threads, and a chat holds
+its thread for the whole model call, so chats may use at most
+SCHEDUGATOR_WORKER_THREADS - SCHEDUGATOR_RESERVED_THREADS threads (default
+8 - 2). The reserved threads stay free for the cheap endpoints. A chat
+over its limit or over its client's rate gets an immediate 429 with
+Retry-After instead of queueing behind the others.
+
+Bucket state lives in this process (default) or in a SQLite file shared by
+all workers on the host (SCHEDUGATOR_RATE_LIMIT_STORE=sqlite:///path, same
+form as the session store). Concurrency is always per process, since it
+protects this worker's threads. SCHEDUGATOR_RATE_LIMIT=0 turns limiting off.
+
+Rates are requests per minute with a burst size:
+SCHEDUGATOR_{CHAT,SOLVE,CATALOG}_RATE_PER_MIN and ..._BURST.
+Clients are identified by IP address. Behind proxies, set SCHEDUGATOR_PROXY_HOPS
+to the number of them so the client's address is taken from X-Forwarded-For.
+"""
+
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from flask import g, jsonify, request
+
+from cache import TTLCache
+from tracing import get_logger
+import metrics
+
+log = get_logger("ratelimit")
+
+Limit = namedtuple("Limit", "per_second burst")
+
+
+def _limit(name, per_minute, burst):
+    per_minute = float(os.getenv(f"SCHEDUGATOR_{name}_RATE_PER_MIN", per_minute))
+    return Limit(per_minute / 60, float(os.getenv(f"SCHEDUGATOR_{name}_BURST", burst)))
+
+
+ENABLED = os.getenv("SCHEDUGATOR_RATE_LIMIT", "1") == "1"
+LIMITS = {
+    "chat": _limit("CHAT", 20, 5),
+    "solve": _limit("SOLVE", 60, 10),
+    "catalog": _limit("CATALOG", 600, 100),
+}
+# Flask endpoint -> class; anything unlisted is "catalog"
+ROUTE_CLASSES = {
+    "chat": "chat",
+    "chat_stream": "chat",
+    "generate_schedule": "solve",
+    "generate_schedules": "solve",
+    "health_check": None,
+    "get_metrics": None,
+}
+
+PROXY_HOPS = int(os.getenv("SCHEDUGATOR_PROXY_HOPS", 0))
+
+WORKER_THREADS = int(os.getenv("SCHEDUGATOR_WORKER_THREADS", 8))
+RESERVED_THREADS = int(os.getenv("SCHEDUGATOR_RESERVED_THREADS", 2))
+CHAT_CONCURRENCY = int(os.getenv("SCHEDUGATOR_CHAT_CONCURRENCY", max(1, WORKER_THREADS - RESERVED_THREADS)))
+# Suggested wait when chat is at its concurrency limit (about one model call)
+BUSY_RETRY_AFTER = 2
+
+# Idle buckets are dropped after this long; by then they would be full anyway
+BUCKET_IDLE_SECONDS = 3600
+
+
+class MemoryBuckets:
+    """Token buckets in this process."""
+
+    def __init__(self, maxsize=100000):
+        self._buckets = TTLCache(maxsize=maxsize, ttl=BUCKET_IDLE_SECONDS)
+        self._lock = threading.Lock()
+
+    def take(self, key, limit, now=None):
+        """Take one token. Returns 0 if allowed, else seconds until a token is available."""
+        now = time.time() if now is None else now
+        with self._lock:
+            bucket = self._buckets.get(key)
+            tokens = limit.burst if bucket is None else min(limit.burst, bucket[0] + (now - bucket[1]) * limit.per_second)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets.set(key, (tokens, now))
+        return 0.0 if allowed else (1 - tokens) / limit.per_second
+
+
+class SQLiteBuckets:
+    """Token buckets in a SQLite file shared by every worker on the host."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._takes = 0
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        # sqlite3 connections are per-thread; reuse one per thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def take(self, key, limit, now=None):
+        now = time.time() if now is None else now
+        refill = "MIN(:burst, tokens + (:now - updated_at) * :rate)"
+        with self._connect() as conn:
+            # One statement, so the refill-and-take is atomic across workers;
+            # it changes no row when the bucket is empty
+            taken = conn.execute(
+                "INSERT INTO buckets (key, tokens, updated_at) VALUES (:key, :burst - 1, :now) "
+                f"ON CONFLICT(key) DO UPDATE SET tokens = {refill} - 1, updated_at = :now "
+                f"WHERE {refill} >= 1",
+                {"key": key, "burst": limit.burst, "rate": limit.per_second, "now": now},
+            ).rowcount
+            self._takes += 1
+            if self._takes % 1000 == 0:
+                conn.execute("DELETE FROM buckets WHERE updated_at < ?", (now - BUCKET_IDLE_SECONDS,))
+        if taken:
+            return 0.0
+        tokens, updated_at = self._connect().execute(
+            "SELECT tokens, updated_at FROM buckets WHERE key = ?", (key,)
+        ).fetchone()
+        tokens = min(limit.burst, tokens + (now - updated_at) * limit.per_second)
+        return max(0.0, (1 - tokens) / limit.per_second)
+
+    def after_fork(self):
+        self._local = threading.local()
+
+
+def create_bucket_store(spec=None):
+    """Build the store named by SCHEDUGATOR_RATE_LIMIT_STORE ('memory' or 'sqlite:///path')."""
+    spec = spec or os.getenv('SCHEDUGATOR_RATE_LIMIT_STORE', 'memory')
+    if spec.startswith('sqlite:///'):
+        return SQLiteBuckets(spec[len('sqlite:///'):])
+    if spec != 'memory':
+        log.warning("⚠️ Unknown rate limit store '%s' - using in-process buckets", spec)
+    return MemoryBuckets()
+
+
+class Limiter:
+    """Per-client token buckets per class, plus the chat concurrency limit."""
+
+    def __init__(self, store=None, limits=None, chat_concurrency=CHAT_CONCURRENCY):
+        self.store = store or create_bucket_store()
+        self.limits = limits or LIMITS
+        self.chat_concurrency = chat_concurrency
+        self.chat_in_flight = 0
+        self._lock = threading.Lock()
+
+    def admit(self, client, kind):
+        """Returns (release callback or None, retry_after seconds). When
+        retry_after is 0 the request may run; a release callback must then be
+        called once it has finished."""
+        if kind == "chat":
+            with self._lock:
+                if self.chat_in_flight >= self.chat_concurrency:
+                    metrics.increment("rate_limited_total", **{"class": kind, "reason": "busy"})
+                    return None, BUSY_RETRY_AFTER
+                self.chat_in_flight += 1
+
+        retry_after = self.store.take(f"{kind}:{client}", self.limits[kind])
+        if retry_after:
+            metrics.increment("rate_limited_total", **{"class": kind, "reason": "rate"})
+            if kind == "chat":
+                self._release_chat()
+            return None, retry_after
+        return (self._release_chat if kind == "chat" else _noop), 0
+
+    def _release_chat(self):
+        with self._lock:
+            self.chat_in_flight -= 1
+
+    def after_fork(self):
+        self.chat_in_flight = 0
+        self._lock = threading.Lock()
+        if hasattr(self.store, "after_fork"):
+            self.store.after_fork()
+
+
+def _noop():
+    pass
+
+
+def client_address(remote_addr, forwarded_for=None, hops=PROXY_HOPS):
+    """The client's IP: the address `hops` proxies back in X-Forwarded-For
+    (entries further left can be forged by the client), else the peer's."""
+    if hops and forwarded_for:
+        addresses = [a.strip() for a in forwarded_for.split(",")]
+        if len(addresses) >= hops:
+            return addresses[-hops]
+    return remote_addr or "unknown"
+
+
+def too_many_requests(retry_after):
+    """(body, status, headers) for a rejected request."""
+    seconds = max(1, math.ceil(retry_after))
+    return {'error': 'Too many requests', 'retry_after': seconds}, 429, {'Retry-After': str(seconds)}
+
+
+def init_app(app, limiter):
+    """Check every request against `limiter` before it runs."""
+
+    @app.before_request
+    def admit():
+        if not ENABLED or request.method == 'OPTIONS':
+            return None
+        kind = ROUTE_CLASSES.get(request.endpoint, "catalog")
+        if kind is None:
+            return None
+        client = client_address(request.remote_addr, request.headers.get('X-Forwarded-For'))
+        release, retry_after = limiter.admit(client, kind)
+        if release is None:
+            body, status, headers = too_many_requests(retry_after)
+            return jsonify(body), status, headers
+        g.release_admission = release
+        return None
+
+    @app.after_request
+    def hand_off(response):
+        release = g.pop('release_admission', None)
+        if release is not None:
+            if response.is_streamed:
+                # The chat stream keeps running after this returns
+                response.call_on_close(release)
+            else:
+                release()
+        return response
+
+    @app.teardown_request
+    def release_on_error(exc):
+        # after_request is skipped when the view raised
+        release = g.pop('release_admission', None)
+        if release is not None:
+            release()
@@ -1,11 +1,7 @@
-import json
-import os
-import re
-
-def _normalize_text(value: str) -> str:
-    if value is None:
-        return ""
-    return re.sub(r"[^a-z0-9]+", "", str(value).lower())
+from catalog import (
+    get_catalog, normalize_text as _normalize_text, dept_acronym,
+    GEN_ED_CIVIC, GEN_ED_INTERNATIONAL, GEN_ED_DIVERSITY,
+)
 
 
 def _normalize_word_count(value):
@@ -22,64 +18,72 @@ def _normalize_word_count(value):
     return count
 
 
-def _time_to_minutes(time_str):
-    """Convert time string like '8:30 AM' or period number to minutes since midnight."""
-    if isinstance(time_str, int):
-        # Period numbers (1-13 for UF): approximate conversion
-        # Period 1 starts at 7:25 AM, each period is ~55 min apart
-        return 445 + (time_str - 1) * 55
-    
-    if isinstance(time_str, str):
-        # Handle format like "8:30 AM" or "08:30 AM"
-        time_str = time_str.strip().upper()
-        try:
-            if 'AM' in time_str or 'PM' in time_str:
-                is_pm = 'PM' in time_str
-                time_part = time_str.replace('AM', '').replace('PM', '').strip()
-                
-                if ':' in time_part:
-                    hour, minute = time_part.split(':')
-                    hour = int(hour)
-                    minute = int(minute)
-                else:
-                    hour = int(time_part)
-                    minute = 0
-                
-                # Convert to 24-hour format
-                if is_pm and hour != 12:
-                    hour += 12
-                elif not is_pm and hour == 12:
-                    hour = 0
-                
-                return hour * 60 + minute
-        except (ValueError, AttributeError):
-            pass
-    
-    return 999999  # Return large value for invalid times (sorts to end)
+def _first_credits(course):
+    sections = course.get('sections') or []
+    return sections[0].get('credits') if sections else None
 
 
-def _get_earliest_time(section):
-    """Extract the earliest meeting time from a section."""
-    meet_times = section.get('meetTimes', [])
-    if not meet_times:
-        return 999999  # Sections without times sort to end
-    
-    earliest = 999999
-    for meet_time in meet_times:
-        # Prefer meetTimeBegin (actual time like "10:40 AM")
-        begin = meet_time.get('meetTimeBegin')
-        if not begin:
-            # Fallback to meetPeriodBegin if meetTimeBegin not available
-            begin = meet_time.get('meetPeriodBegin')
-        
-        if begin:
-            minutes = _time_to_minutes(begin)
-            earliest = min(earliest, minutes)
-    
-    return earliest
+# Fields a projection may ask for that are derived rather than stored
+COMPUTED_FIELDS = {
+    'credits': _first_credits,
+    'sections_count': lambda course: len(course.get('sections') or []),
+}
 
+# Named projections: fields="compact" is what a result list renders
+PRESETS = {
+    'compact': (('code', 'name', 'credits', 'sections_count'), None),
+}
 
-def _dept_matches(course_dept: str, dept_query: str) -> bool:
+
+def _field_list(value):
+    """Field names from a list or a comma-separated string."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.split(',')
+    return tuple(str(v).strip() for v in value if str(v).strip())
+
+
+def _projection(fields, section_fields):
+    """(course fields, section fields) to keep; None means everything."""
+    if isinstance(fields, str) and fields in PRESETS:
+        return PRESETS[fields]
+    fields = _field_list(fields)
+    section_fields = _field_list(section_fields)
+    if fields is not None and section_fields is not None and 'sections' not in fields:
+        fields += ('sections',)
+    return fields, section_fields
+
+
+def _project_course(course, fields, section_fields, order=None):
+    """Build the result dict for one course with only the requested fields;
+    `order` is the section order when sorting by time."""
+    sections = course.get('sections')
+    if sections is not None and (order is not None or section_fields is not None):
+        if order is None:
+            order = range(len(sections))
+        if section_fields is None:
+            sections = [sections[i] for i in order]
+        else:
+            sections = [{f: sections[i][f] for f in section_fields if f in sections[i]} for i in order]
+
+    if fields is None:
+        return course if sections is course.get('sections') else {**course, 'sections': sections}
+
+    projected = {}
+    for field in fields:
+        if field == 'sections':
+            if sections is not None:
+                projected['sections'] = sections
+        elif field in course:
+            projected[field] = course[field]
+        elif field in COMPUTED_FIELDS:
+            projected[field] = COMPUTED_FIELDS[field](course)
+    return projected
+
+
+def _dept_matches(course_dept: str, dept_query: str, dept_info=None) -> bool:
+    """dept_info is the precomputed [normalized, acronym] pair from the catalog artifacts."""
     if not dept_query:
         return True
 
@@ -88,14 +92,14 @@ def _dept_matches(course_dept: str, dept_query: str) -> bool:
     dept_query = str(dept_query) if dept_query else ""
 
     norm_query = _normalize_text(dept_query)
-    norm_course = _normalize_text(course_dept)
+    if dept_info is None:
+        dept_info = [_normalize_text(course_dept), dept_acronym(course_dept)]
+    norm_course, acronym = dept_info
 
     if norm_query in norm_course or norm_course in norm_query:
         return True
 
     # Check acronym match (e.g., CISE)
-    words = re.findall(r"[A-Za-z]+", course_dept)
-    acronym = "".join(word[0].lower() for word in words if len(word) > 1)
     if acronym and norm_query == acronym:
         return True
 
@@ -116,6 +120,8 @@ def search_catalog(
     civicLiteracy=False,
     international=False,
     diversity=False,
+    fields=None,
+    section_fields=None,
 ):
     """
     Search tool for the AI Agent to query the universal_base_catalog.json.
@@ -134,33 +140,17 @@ def search_catalog(
         civicLiteracy (bool): Filter for Civic Literacy requirement courses (POS2041, AMH2020, etc.).
         international (bool): Filter for International requirement courses.
         diversity (bool): Filter for Diversity requirement courses.
+        fields (list|str): Course fields to return (default: all), or a preset
+            name ("compact": code, name, credits, sections_count). Derived fields:
+            credits (first section's), sections_count.
+        section_fields (list): Section fields to return (default: all).
         Results are capped at 10 to keep responses compact.
     """
-    # Get the path relative to this file
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    catalog_path = os.path.join(current_dir, '..', 'data', 'universal_base_catalog.json')
-    uf_requirements_path = os.path.join(current_dir, '..', 'data', 'uf_universal_requirements.json')
-    
-    with open(catalog_path, 'r') as f:
-        catalog = json.load(f)
-    
-    # Load UF universal requirements reference
-    uf_requirements = {}
-    if os.path.exists(uf_requirements_path):
-        with open(uf_requirements_path, 'r') as f:
-            uf_requirements = json.load(f)
-    
-    # Extract well-known courses for each requirement
-    civic_literacy_courses = set(
-        course.upper() for course in 
-        uf_requirements.get('civicLiteracy', {}).get('courses', [])
-    )
-    international_courses = set(
-        course.upper() for course in 
-        uf_requirements.get('international', {}).get('examples', [])
-    )
-    # Note: diversity courses are harder to identify by code alone; we rely on description keywords
-    diversity_keywords = ['diversity', 'cultural', 'african', 'latino', 'lgbtq', 'gender', 'race', 'ethnicity']
+    # Shared in-memory catalog with precomputed indexes (see catalog.py)
+    catalog = get_catalog()
+    fields, section_fields = _projection(fields, section_fields)
+    # Sections are only touched if they are returned
+    wants_sections = fields is None or 'sections' in fields
 
     quest_filter = None
     if quest:
@@ -172,7 +162,7 @@ def search_catalog(
 
     results = []
     max_results = 10
-    for course in catalog:
+    for course_idx, course in enumerate(catalog.courses):
         # 1. Text Search (Code or Name)
         if query:
             query_str = str(query).lower()
@@ -197,7 +187,7 @@ def search_catalog(
         # If neither query nor queries provided, don't filter by query
 
         # 2. Department Filter
-        if dept and not _dept_matches(course.get('dept', ''), dept):
+        if dept and not _dept_matches(course.get('dept', ''), dept, catalog.depts.get(course.get('dept') or '')):
             continue
 
         # 3. Level Filters
@@ -238,42 +228,24 @@ def search_catalog(
             if max_words_norm is not None and writing_words > max_words_norm:
                 continue
 
-        # 7. Civic Literacy Filter
-        if civicLiteracy:
-            if course['code'].upper() not in civic_literacy_courses:
-                continue
-
-        # 8. International Filter
-        if international:
-            course_code = course['code'].upper()
-            matches = (
-                course_code in international_courses or
-                any(code in course_code for code in ['INT', 'ISS', 'LAT', 'AFH', 'ASH', 'EUH']) or
-                'international' in course['description'].lower()
-            )
-            if not matches:
-                continue
+        # 7-9. Civic Literacy / International / Diversity Filters (flags precomputed per course)
+        gen_ed = catalog.gen_ed_flags[course_idx]
+        if civicLiteracy and not gen_ed & GEN_ED_CIVIC:
+            continue
+        if international and not gen_ed & GEN_ED_INTERNATIONAL:
+            continue
+        if diversity and not gen_ed & GEN_ED_DIVERSITY:
+            continue
 
-        # 9. Diversity Filter
-        if diversity:
-            desc_lower = course['description'].lower()
-            name_lower = course['name'].lower()
-            matches = any(
-                keyword in desc_lower or keyword in name_lower
-                for keyword in diversity_keywords
-            )
-            if not matches:
-                continue
+        # Sort sections by time if requested (earliest start per section is precomputed)
+        order = None
+        if sort_by and wants_sections and course.get('sections'):
+            reverse = (str(sort_by).lower() == 'desc')
+            earliest = catalog.section_earliest[course_idx]
+            order = sorted(range(len(course['sections'])), key=earliest.__getitem__, reverse=reverse)
 
-        # Sort sections by time if requested
-        if sort_by and 'sections' in course:
-            sections = course.get('sections', [])
-            if sections:
-                reverse = (str(sort_by).lower() == 'desc')
-                sorted_sections = sorted(sections, key=_get_earliest_time, reverse=reverse)
-                course = {**course, 'sections': sorted_sections}
-        
-        results.append(course)
+        # Projected while assembling, so unrequested fields are never copied
+        results.append(_project_course(course, fields, section_fields, order))
         
         # Limit results to keep the AI's context window manageable
         if len(results) >= max_results:
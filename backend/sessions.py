@@ -0,0 +1,161 @@
+"""
+Per-session conversation state for the chat endpoint.
+
+Each browser session gets its own history and active major instead of
+sharing them on the single GemmaBrain instance. Two backends:
+
+    memory           in-process LRU with TTL eviction (default, one worker)
+    sqlite:///path   SQLite file shared by all gunicorn workers on a host
+
+Select with SCHEDUGATOR_SESSION_STORE, e.g. "sqlite:////var/lib/schedugator/sessions.db"
+(three slashes for a relative path, four for an absolute one).
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+
+from cache import TTLCache
+from tracing import get_logger
+
+log = get_logger("sessions")
+
+# Messages kept per session (the prompt only uses the last few)
+MAX_STORED_MESSAGES = 8
+SESSION_TTL_SECONDS = int(os.getenv('SCHEDUGATOR_SESSION_TTL', 6 * 3600))
+MAX_SESSIONS = int(os.getenv('SCHEDUGATOR_MAX_SESSIONS', 10000))
+
+
+def new_session_id():
+    return uuid.uuid4().hex
+
+
+class ChatSession:
+    """Conversation state for one user session, with bounded history."""
+
+    __slots__ = ('session_id', 'recent_messages', 'last_major_code', 'last_major_context', 'last_major_rules')
+
+    def __init__(self, session_id, recent_messages=None, last_major_code=None,
+                 last_major_context=None, last_major_rules=None):
+        self.session_id = session_id
+        self.recent_messages = deque(recent_messages or [], maxlen=MAX_STORED_MESSAGES)
+        self.last_major_code = last_major_code
+        self.last_major_context = last_major_context
+        self.last_major_rules = last_major_rules
+
+    def to_dict(self):
+        return {
+            'recent_messages': [list(m) for m in self.recent_messages],
+            'last_major_code': self.last_major_code,
+            'last_major_context': self.last_major_context,
+            'last_major_rules': self.last_major_rules,
+        }
+
+    @classmethod
+    def from_dict(cls, session_id, data):
+        return cls(
+            session_id,
+            recent_messages=[tuple(m) for m in data.get('recent_messages', [])],
+            last_major_code=data.get('last_major_code'),
+            last_major_context=data.get('last_major_context'),
+            last_major_rules=data.get('last_major_rules'),
+        )
+
+
+class MemorySessionStore:
+    """In-process sessions: LRU-bounded count, idle sessions expire after the TTL."""
+
+    def __init__(self, maxsize=MAX_SESSIONS, ttl=SESSION_TTL_SECONDS):
+        self._sessions = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, session_id):
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = ChatSession(session_id)
+            self._sessions.set(session_id, session)
+        return session
+
+    def save(self, session):
+        # Refreshes the TTL and LRU position
+        self._sessions.set(session.session_id, session)
+
+    def delete(self, session_id):
+        self._sessions.pop(session_id)
+
+    def after_fork(self):
+        pass
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+class SQLiteSessionStore:
+    """Sessions in a local SQLite file so every worker process sees the same state."""
+
+    def __init__(self, path, ttl=SESSION_TTL_SECONDS):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        self._saves = 0
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "session_id TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        # sqlite3 connections are per-thread; reuse one per thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, session_id):
+        row = self._connect().execute(
+            "SELECT data, updated_at FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None or row[1] + self.ttl <= time.time():
+            return ChatSession(session_id)
+        return ChatSession.from_dict(session_id, json.loads(row[0]))
+
+    def save(self, session):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, data, updated_at) VALUES (?, ?, ?)",
+                (session.session_id, json.dumps(session.to_dict()), now)
+            )
+            # Expire idle sessions every so often rather than on every write
+            self._saves += 1
+            if self._saves % 100 == 0:
+                conn.execute("DELETE FROM sessions WHERE updated_at < ?", (now - self.ttl,))
+
+    def delete(self, session_id):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def after_fork(self):
+        # A connection opened in the parent must not be used from a forked worker
+        self._local = threading.local()
+
+    def __len__(self):
+        cutoff = time.time() - self.ttl
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM sessions WHERE updated_at >= ?", (cutoff,)
+        ).fetchone()[0]
+
+
+def create_session_store(spec=None):
+    """Build the store named by SCHEDUGATOR_SESSION_STORE ('memory' or 'sqlite:///path')."""
+    spec = spec or os.getenv('SCHEDUGATOR_SESSION_STORE', 'memory')
+    if spec.startswith('sqlite:///'):
+        return SQLiteSessionStore(spec[len('sqlite:///'):])
+    if spec != 'memory':
+        log.warning("⚠️ Unknown session store '%s' - using in-memory sessions", spec)
+    return MemorySessionStore()
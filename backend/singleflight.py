@@ -0,0 +1,110 @@
+"""
+Request coalescing: identical calls that overlap in time run once.
+
+    searches = SingleFlight("search")
+    results = searches.do(key, search_catalog, **params)        # threads
+    schedule = await solves.ado(key, pool.validate_and_solve, codes, rules)  # event loop
+
+The first caller for a key (the leader) runs the function; callers arriving
+while it runs wait for it and get the same result object (or exception;
+LeaderAborted if the leader was stopped by SystemExit, KeyboardInterrupt
+or another BaseException).
+Nothing is kept once the call finishes, so this is not a cache: it only
+removes duplicate work during bursts, such as registration opening.
+Callers must treat the shared result as read-only.
+
+Counted in metrics as singleflight_calls_total{group=..., result=leader|coalesced}.
+"""
+
+import asyncio
+import threading
+
+import metrics
+
+
+class LeaderAborted(Exception):
+    """Raised in waiting callers when the leader stopped with a BaseException
+    that isn't an Exception, such as a worker timeout's SystemExit."""
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """One group of coalesced calls. Keys only need to be hashable."""
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> _Call (threads)
+        self._tasks = {}  # key -> asyncio.Task (event loop)
+        self.leaders = 0
+        self.coalesced = 0
+
+    def _count(self, leader):
+        with self._lock:
+            if leader:
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+        metrics.increment("singleflight_calls_total", group=self.name,
+                          result="leader" if leader else "coalesced")
+
+    def do(self, key, fn, *args, **kwargs):
+        """fn(*args, **kwargs), shared with any identical call already running."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        self._count(leader)
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        except BaseException as e:
+            # Not re-raised in the waiters' threads as-is: it's the leader's to handle
+            call.error = LeaderAborted(f"{self.name} call aborted by {type(e).__name__}")
+            call.error.__cause__ = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def ado(self, key, fn, *args, **kwargs):
+        """await fn(*args, **kwargs), shared with any identical call already
+        running on this event loop. The work runs as its own task, so a caller
+        that is cancelled (client gone) doesn't cancel it for the others."""
+        task = self._tasks.get(key)
+        leader = task is None
+        if leader:
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        self._count(leader)
+        return await asyncio.shield(task)
+
+    def stats(self):
+        calls = self.leaders + self.coalesced
+        return {
+            'in_flight': len(self._calls) + len(self._tasks),
+            'leaders': self.leaders,
+            'coalesced': self.coalesced,
+            'coalesced_rate': self.coalesced / calls if calls else 0.0,
+        }
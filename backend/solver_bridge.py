@@ -1,20 +1,84 @@
-import json
+import asyncio
+import multiprocessing
 import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
 from typing import List
-from conflicts import solve_schedule, has_global_conflict 
+from conflicts import occupancy_mask, solve_compiled
+from catalog import get_catalog, load_catalog
+from prereqs import PrereqGraph
+from tracing import get_logger
+import metrics
+
+log = get_logger("solver")
+
+
+def record_solve(stats):
+    """Solver time and backtracking nodes for one solve, in this process's metrics."""
+    metrics.increment("solver_solves_total", result="solved" if stats['solved'] else "no_schedule")
+    metrics.observe("solver_seconds", stats['seconds'])
+    metrics.observe("solver_nodes", stats['nodes'], buckets=metrics.NODE_BUCKETS)
+
 
 class SolverBridge:
     def __init__(self, catalog_path: str = None):
-        if catalog_path is None:
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            catalog_path = os.path.join(current_dir, '..', 'data', 'universal_base_catalog.json')
-        
-        with open(catalog_path, 'r') as f:
-            self.catalog = json.load(f)
+        # Default catalog is the shared, process-wide one (indexes precomputed by build_catalog.py)
+        self.index = get_catalog() if catalog_path is None else load_catalog(catalog_path)
+        self.catalog = self.index.courses
+
+        # Prerequisite DAG used for eligibility checks
+        self.prereqs = PrereqGraph(self.catalog)
+
+        # Course code -> [(occupancy mask, schedule entry)], shared by every solve
+        self._compiled = {}
+        # classNum -> (occupancy mask, course, section), for exports and conflict reports
+        self._sections = {}
+
+    def compile_course(self, code: str):
+        """All sections offered for a course code, each with its occupancy mask
+        and the entry returned in schedules (section fields plus code and name)."""
+        key = str(code).upper()
+        options = self._compiled.get(key)
+        if options is None:
+            options = [
+                (occupancy_mask(section), {
+                    'code': course['code'],
+                    'name': course.get('name'),
+                    **{k: v for k, v in section.items() if k != 'slots'},
+                })
+                for course in self.index.find_courses(key)
+                for section in course.get('sections') or []
+            ]
+            self._compiled[key] = options
+        return options
+
+    def compile_section(self, class_num):
+        """(occupancy mask, course, section) for a classNum, or None if it is not
+        in the catalog. Raises ValueError for a classNum that is not a number."""
+        key = int(class_num)
+        compiled = self._sections.get(key)
+        if compiled is None:
+            course, section = self.index.find_section(key)
+            if section is None:
+                return None
+            compiled = self._sections[key] = (occupancy_mask(section), course, section)
+        return compiled
 
     def get_full_course_data(self, course_codes: List[str]):
         """Finds all sections for a list of course codes."""
-        return [c for c in self.catalog if c['code'] in course_codes]
+        return [c for code in course_codes for c in self.index.find_courses(code)]
+
+    def check_eligibility(self, completed_codes: List[str], course_codes: List[str]):
+        """Splits course codes into those the student can take now and those
+        still blocked by prerequisites (with the missing codes)."""
+        eligible = self.prereqs.eligible_courses(completed_codes, course_codes)
+        eligible_set = set(eligible)
+        blocked = [
+            {'code': code, 'missing': self.prereqs.missing(completed_codes, code)}
+            for code in course_codes if code not in eligible_set
+        ]
+        return {'eligible': eligible, 'blocked': blocked}
 
     def validate_and_solve(self, ai_selections: List[str], major_rules: dict = None):
         """
@@ -23,28 +87,107 @@ class SolverBridge:
             ai_selections: List of course codes (e.g., ['COP3502', 'MAC2312'])
             major_rules: Optional dict for future prerequisite/requirement validation
         Returns:
-            List of sections forming a valid schedule, or None if no solution
+            List of sections (with code and name) forming a valid schedule, or None if no solution
         """
-        # 1. Fetch all possible sections for the courses the AI picked
-        required_courses_with_sections = []
+        schedule, stats = self.solve_with_stats(ai_selections, major_rules)
+        record_solve(stats)
+        return schedule
+
+    def solve_with_stats(self, ai_selections: List[str], major_rules: dict = None):
+        """validate_and_solve without recording metrics: (schedule, {'solved', 'nodes', 'seconds'})."""
+        start = time.perf_counter()
+        stats = {'nodes': 0}
+        # 1. Every section of every course picked, precompiled to occupancy masks
+        options = []
         for code in ai_selections:
-            sections = [s for s in self.catalog if s['code'] == code]
-            if sections:
-                required_courses_with_sections.append({
-                    'code': code,
-                    'sections': sections
-                })
+            course_options = self.compile_course(code)
+            if course_options:
+                options.append(course_options)
             else:
-                print(f"⚠️  Warning: Course {code} not found in catalog")
+                log.warning("⚠️ Course %s not found in catalog", code)
+
+        # 2. Run the Backtracking Solver: one section per course, no overlaps
+        schedule = solve_compiled(options, stats) if options else None
+        stats['solved'] = schedule is not None
+        stats['seconds'] = time.perf_counter() - start
+        return schedule, stats
+
+
+# One SolverBridge per worker process, built by the pool's initializer
+_worker_bridge = None
+
+
+def _init_worker(catalog_path):
+    global _worker_bridge
+    _worker_bridge = SolverBridge(catalog_path)
 
-        if not required_courses_with_sections:
-            return None
 
-        # 2. Run the Backtracking Solver
-        # Pass empty list as current_schedule (the second parameter)
-        final_schedule = solve_schedule(
-            required_courses_with_sections,
-            []  # Fixed: current_schedule parameter, not major_rules
+def _solve_in_worker(ai_selections, major_rules):
+    # Stats go back with the schedule: the worker's own metrics are never scraped
+    return _worker_bridge.solve_with_stats(ai_selections, major_rules)
+
+
+def _relay(worker_future, future):
+    """Record a worker solve's stats here and pass its schedule on."""
+    if future.cancelled():  # Caller gave up (e.g. client disconnected)
+        return
+    if worker_future.cancelled():
+        future.cancel()
+    elif worker_future.exception() is not None:
+        future.set_exception(worker_future.exception())
+    else:
+        schedule, stats = worker_future.result()
+        record_solve(stats)
+        future.set_result(schedule)
+
+
+SOLVER_WORKERS = int(os.getenv("SCHEDUGATOR_SOLVER_WORKERS", 2))
+
+
+class SolverPool:
+    """validate_and_solve on worker processes, for the async server: a long
+    backtracking search runs on another core instead of stalling the event
+    loop (threads wouldn't help, the solver is pure Python)."""
+
+    def __init__(self, workers=2, catalog_path: str = None):
+        # spawn: workers import only the solver, not the server that owns the pool
+        self._pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(catalog_path,),
         )
-        
-        return final_schedule
\ No newline at end of file
+
+    def submit(self, ai_selections: List[str], major_rules: dict = None):
+        """concurrent.futures.Future of one solve."""
+        future = Future()
+        worker_future = self._pool.submit(_solve_in_worker, ai_selections, major_rules)
+        worker_future.add_done_callback(lambda f: _relay(f, future))
+        return future
+
+    async def validate_and_solve(self, ai_selections: List[str], major_rules: dict = None):
+        return await asyncio.wrap_future(self.submit(ai_selections, major_rules))
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def after_fork():
+    """In a forked worker: the parent's solver processes belong to the parent."""
+    global _pool, _pool_lock
+    _pool = None
+    _pool_lock = threading.Lock()
+
+
+def get_solver_pool():
+    """Process-wide SolverPool with SCHEDUGATOR_SOLVER_WORKERS workers, created on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = SolverPool(workers=SOLVER_WORKERS)
+    return _pool
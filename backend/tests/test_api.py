@@ -7,10 +7,10 @@ import os
 # Test imports
 print("🧪 Testing API imports...")
 try:
-    from api import app, solver, major_requirements
+    from api import app, solver, majors
     print("   ✅ API module imported successfully")
     print(f"   📚 Catalog size: {len(solver.catalog)}")
-    print(f"   🎓 Majors loaded: {len(major_requirements)}")
+    print(f"   🎓 Majors loaded: {len(majors)}")
 except Exception as e:
     print(f"   ❌ Import failed: {e}")
     sys.exit(1)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the precompiled solver and the batch schedule endpoint
+"""
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+sys.path.insert(0, 'backend')
+
+os.environ.setdefault("SCHEDUGATOR_LLM", "fake")
+os.environ["SCHEDUGATOR_SOLVER_WORKERS"] = "0"  # Solve in-process; the pool is covered by test_async_chat
+
+import catalog
+from conflicts import occupancy_mask, solve_compiled
+from meetings import section_slots
+
+
+def section(class_num, days, begin, end):
+    return {"classNum": class_num, "credits": 3, "instructors": ["Staff"],
+            "meetTimes": [{"meetDays": days, "meetPeriodBegin": str(begin), "meetPeriodEnd": str(end)}]}
+
+
+def clash(sections):
+    """Reference check, meeting by meeting: two of the sections meet on a shared day in overlapping periods."""
+    for a, b in itertools.combinations(sections, 2):
+        for x in section_slots(a):
+            for y in section_slots(b):
+                if None not in (x[1], x[2], y[1], y[2]) and x[0] & y[0] and max(x[1], y[1]) <= min(x[2], y[2]):
+                    return True
+    return False
+
+
+COURSES = [
+    {"code": "COP3502C", "name": "Programming 1", "sections": [section(1, ["M", "W", "F"], 4, 4),
+                                                             section(2, ["T", "R"], 2, 3)]},
+    {"code": "MAC2312", "name": "Calculus 2", "sections": [section(3, ["M", "W", "F"], 4, 5)]},
+    {"code": "PHY2048", "name": "Physics 1", "sections": [section(4, ["T"], 3, 3), section(5, ["F"], 8, 8)]},
+    {"code": "ENC1101", "name": "Writing", "sections": [section(6, ["M"], 4, 4)]},
+]
+
+tmp = tempfile.mkdtemp()
+catalog_path = os.path.join(tmp, "catalog.json")
+with open(catalog_path, "w") as f:
+    json.dump(COURSES, f)
+catalog.set_catalog(catalog.load_catalog(catalog_path))
+
+print("=" * 70)
+print("TESTING PRECOMPILED SOLVER")
+print("=" * 70)
+
+rng = random.Random(45)
+days = ["M", "T", "W", "R", "F", "S"]
+random_sections = [section(i, rng.sample(days, rng.randint(0, 3)), b, b + rng.randint(0, 2))
+                   for i, b in enumerate(rng.randint(1, 12) for _ in range(200))]
+for a, b in itertools.combinations(random_sections[:60], 2):
+    assert bool(occupancy_mask(a) & occupancy_mask(b)) == clash([a, b]), (a, b)
+print("   ✅ Mask overlap agrees with a meeting-by-meeting check on 1770 random pairs")
+
+for _ in range(200):
+    options = [[(occupancy_mask(s), s) for s in rng.sample(random_sections, rng.randint(1, 3))]
+               for _ in range(rng.randint(1, 4))]
+    found = solve_compiled(options)
+    exists = any(not clash(combo)
+                 for combo in itertools.product(*[[s for _, s in o] for o in options]))
+    assert (found is not None) == exists
+    if found:
+        assert not clash(found) and all(s in [x for _, x in o] for s, o in zip(found, options))
+print("   ✅ solve_compiled finds a schedule exactly when brute force does")
+
+from api import app, solver
+
+schedule = solver.validate_and_solve(["COP3502C", "MAC2312"])
+assert [(s["code"], s["classNum"]) for s in schedule] == [("COP3502C", 2), ("MAC2312", 3)]
+assert "slots" not in schedule[0] and schedule[0]["meetTimes"]
+print("   ✅ validate_and_solve returns real sections (with code and name)")
+
+print("\n" + "=" * 70)
+print("TESTING /api/generate-schedules")
+print("=" * 70)
+
+client = app.test_client()
+response = client.post('/api/generate-schedules', json={"bundles": [
+    {"id": "alice", "courses": ["COP3502C", "MAC2312"]},
+    ["MAC2312", "ENC1101"],
+    ["COP3502C", "PHY2048"],
+    {"id": "bob", "courses": ["cop3502c", "mac2312"]},
+]})
+assert response.mimetype == 'application/x-ndjson'
+lines = [json.loads(line) for line in response.data.decode().splitlines()]
+by_index = {line["index"]: line for line in lines if "index" in line}
+assert by_index[0]["success"] and by_index[0]["id"] == "alice"
+assert not by_index[1]["success"], "MAC2312 and ENC1101 both meet M period 4"
+assert by_index[2]["courses_scheduled"] == 2
+assert by_index[3]["schedule"] == by_index[0]["schedule"] and by_index[3]["id"] == "bob"
+assert lines[-1]["done"] and lines[-1]["bundles"] == 4 and lines[-1]["solved"] == 3
+print(f"   ✅ {len(lines) - 1} bundle lines streamed, summary: {lines[-1]}")
+
+assert client.post('/api/generate-schedules', json={"bundles": []}).status_code == 400
+assert client.post('/api/generate-schedules', json={"bundles": [{"id": "x"}]}).status_code == 400
+print("   ✅ Malformed batches rejected")
+
+print("\n✨ Batch schedule tests passed!")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test script to verify catalog artifacts are rebuilt when the catalog changes
+"""
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+sys.path.insert(0, 'backend')
+
+import catalog
+
+
+def write_catalog(path, courses):
+    with open(path, "w") as f:
+        json.dump(courses, f)
+
+
+def read_artifacts(path):
+    with open(catalog.artifacts_path_for(path)) as f:
+        return json.load(f)
+
+
+COURSES = [{"code": "COP3502C", "name": "Programming 1", "sections": [
+    {"classNum": 101, "credits": 3, "instructors": ["Staff"],
+     "meetTimes": [{"meetDays": ["M"], "meetPeriodBegin": "3", "meetPeriodEnd": "3"}]}]}]
+
+print("=" * 70)
+print("TESTING CATALOG ARTIFACTS")
+print("=" * 70)
+
+tmp = tempfile.mkdtemp()
+catalog_path = os.path.join(tmp, "catalog.json")
+requirements_path = os.path.join(tmp, "requirements.json")
+write_catalog(catalog_path, COURSES)
+
+first = catalog.load_catalog(catalog_path, requirements_path)
+built_at = datetime.fromisoformat(first.stats["built_at"])
+assert built_at.utcoffset() == timedelta(0)
+assert abs(datetime.now(timezone.utc) - built_at) < timedelta(minutes=1)
+assert read_artifacts(catalog_path)["version"] == first.version
+print(f"   ✅ Artifacts saved with the content version and a UTC build time ({first.stats['built_at']})")
+
+# Stamp the saved file so a rebuild is visible
+artifacts = read_artifacts(catalog_path)
+artifacts["stats"]["built_at"] = "2000-01-01T00:00:00+00:00"
+with open(catalog.artifacts_path_for(catalog_path), "w") as f:
+    json.dump(artifacts, f)
+assert catalog.load_catalog(catalog_path, requirements_path).stats["built_at"] == "2000-01-01T00:00:00+00:00"
+print("   ✅ Unchanged catalog loads the saved artifacts")
+
+write_catalog(catalog_path, COURSES + [{"code": "MAC2311", "name": "Calculus 1", "sections": [
+    {"classNum": 201, "credits": 4, "instructors": ["Staff"], "meetTimes": []}]}])
+changed = catalog.load_catalog(catalog_path, requirements_path)
+assert changed.version != first.version
+assert changed.stats["built_at"] != "2000-01-01T00:00:00+00:00" and changed.stats["courses"] == 2
+assert read_artifacts(catalog_path)["version"] == changed.version
+assert changed.find_section(201)[0]["code"] == "MAC2311"
+print("   ✅ Modified catalog gets a new version and rebuilt artifacts")
+
+artifacts = read_artifacts(catalog_path)
+artifacts["format"] = catalog.ARTIFACT_FORMAT - 1
+with open(catalog.artifacts_path_for(catalog_path), "w") as f:
+    json.dump(artifacts, f)
+catalog.load_catalog(catalog_path, requirements_path)
+assert read_artifacts(catalog_path)["format"] == catalog.ARTIFACT_FORMAT
+print("   ✅ Artifacts from an older format are rebuilt")
+
+
+def meet(value):
+    return {"classNum": 1, "meetTimes": [{"meetDays": ["M"], "meetPeriodBegin": value}], "slots": [[1, value, 1]]}
+
+
+# Equal but differently typed values (True == 1 == 1.0) must not share one object
+courses = catalog.intern_catalog([{"code": "X", "sections": [meet(v) for v in (1, True, 1.0, 1)]}])
+sections = courses[0]["sections"]
+assert [type(s["meetTimes"][0]["meetPeriodBegin"]) for s in sections] == [int, bool, float, int]
+assert [type(s["slots"][0][1]) for s in sections] == [int, bool, float, int]
+assert sections[0]["meetTimes"] is sections[3]["meetTimes"] and sections[0]["meetTimes"] is not sections[1]["meetTimes"]
+assert sections[0]["slots"] is sections[3]["slots"] and sections[0]["slots"] is not sections[2]["slots"]
+print("   ✅ Interning shares equal meeting data but keeps True, 1 and 1.0 apart")
+
+print("\n✨ Catalog tests passed!")
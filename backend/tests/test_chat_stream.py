@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the streamed chat turn (events behind /api/chat/stream)
+"""
+import sys
+sys.path.insert(0, 'backend')
+
+from brain import GemmaBrain
+from llm import ScriptedProvider
+from sessions import ChatSession
+
+
+def events_for(script, text, tools=None):
+    brain = GemmaBrain(provider=ScriptedProvider(script=script))
+    if tools:
+        brain._tools = tools
+    return list(brain.run_turn(text, session=ChatSession("test")))
+
+
+def tokens(events):
+    return "".join(e["text"] for e in events if e["event"] == "token")
+
+
+print("=" * 70)
+print("TESTING STREAMED CHAT EVENTS")
+print("=" * 70)
+
+events = events_for(["Happy to help with your schedule."], "hi")
+assert [e["event"] for e in events][-1] == "done"
+assert len([e for e in events if e["event"] == "token"]) > 1
+assert tokens(events) == events[-1]["text"] == "Happy to help with your schedule."
+print("   ✅ Plain answers stream as several token events")
+
+fake_tools = {
+    "search_catalog": lambda **params: {"status": "success", "results": [], "count": 0},
+    "add_course": lambda classNum: {"status": "success", "message": f"Added {classNum}",
+                                    "course": {"code": "COP3502C", "classNum": classNum}},
+}
+events = events_for([
+    'Adding that now. {"tool_calls": [{"name": "add_course", "parameters": {"classNum": 10509}}]}',
+    "Done! COP3502C is on your schedule.",
+], "add 10509", tools=fake_tools)
+kinds = [e["event"] for e in events]
+assert kinds.index("tool_start") < kinds.index("tool_result") < kinds.index("courses_added") < kinds.index("done")
+assert "{" not in tokens(events), "Tool JSON must never be streamed"
+done = events[-1]
+assert done["courses_added"] == [{"code": "COP3502C", "classNum": 10509}]
+assert "__COURSES_ADDED_" not in done["text"]
+assert done["text"] == tokens(events)
+assert done["text"].startswith("Adding that now.") and done["text"].endswith("Done! COP3502C is on your schedule.")
+print("   ✅ Preamble, tool progress, structured courses_added and answer, in order")
+
+brain = GemmaBrain(provider=ScriptedProvider(script=[
+    '{"name": "add_course", "parameters": {"classNum": 10509}}', "Added."
+]))
+brain._tools = fake_tools
+response = brain.process_input("add 10509", session=ChatSession("legacy"))
+assert response.startswith("Added.") and "__COURSES_ADDED_" in response
+print("   ✅ process_input still returns the marker for /api/chat")
+
+print("\n✨ Chat stream tests passed!")
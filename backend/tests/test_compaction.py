@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test script to verify tool-result compaction fits the prompt budget
+"""
+import json
+import sys
+sys.path.insert(0, 'backend')
+
+from compaction import compact_course, fit_tool_results, requested_fields, truncate
+
+
+def make_course(code):
+    return {
+        "code": code,
+        "name": f"Course {code}",
+        "dept": "Computer & Information Science & Engineering",
+        "description": "A long description of the course " * 20,
+        "prereqs": "COP 3503C and MAC 2312",
+        "sections": [{
+            "classNum": 10000 + i,
+            "instructors": ["Instructor"],
+            "credits": 3,
+            "sectWeb": "PC",
+            "meetTimes": [{"meetDays": ["M", "W", "F"], "meetPeriodBegin": "3", "meetPeriodEnd": "4",
+                           "meetTimeBegin": "9:35 AM", "meetTimeEnd": "11:30 AM"}],
+        } for i in range(5)],
+    }
+
+
+def search_result(groups):
+    return [{
+        "name": "search_catalog",
+        "parameters": {"queries": list(groups)},
+        "result": {"status": "success", "results": [
+            {"query": query, "results": [compact_course(make_course(code)) for code in codes], "count": len(codes)}
+            for query, codes in groups.items()
+        ]},
+    }]
+
+
+print("=" * 70)
+print("TESTING TOOL RESULT COMPACTION")
+print("=" * 70)
+
+course = compact_course(make_course("COP4600"))
+assert len(course["description"]) <= 161 and course["description"].endswith("…")
+assert "dept" not in course and "sectWeb" not in course["sections"][0]
+assert course["sections"][0]["meetings"] == ["MWF 3-4 (9:35-11:30)"]
+assert len(course["sections"]) == 3 and course["sections_count"] == 5
+print("   ✅ Level 0: truncated description, compact meetings, no unrequested fields")
+
+assert "dept" in compact_course(make_course("COP4600"), requested_fields({"dept": "CISE"}))
+assert truncate("short", 10) == "short"
+print("   ✅ Filtered fields are kept when the search asked for them")
+
+small = search_result({"COP": ["COP4600"]})
+payload, stats = fit_tool_results(small, budget=10000)
+assert stats["level"] == 0 and stats["dropped"] == 0
+print("   ✅ Small results are sent as-is")
+
+big = search_result({"COP": [f"COP4{i:03d}" for i in range(10)],
+                     "CAP": [f"CAP4{i:03d}" for i in range(10)]})
+for budget in (6000, 3000, 1200):
+    payload, stats = fit_tool_results(big, budget=budget)
+    assert len(payload) <= budget, (budget, len(payload))
+    print(f"   ✅ Budget {budget}: {len(json.dumps(big))} -> {len(payload)} chars at level {stats['level']}, "
+          f"{stats['dropped']} dropped")
+
+groups = json.loads(payload)[0]["result"]["results"]
+assert all(group["results"] for group in groups), "Every query keeps its top result"
+assert sum(group.get("omitted", 0) for group in groups) == stats["dropped"]
+assert big[0]["result"]["results"][0]["results"][0].get("description"), "Input must not be modified"
+print("   ✅ Drops are round-robin across queries and reported as omitted")
+
+added = [{"name": "add_course", "parameters": {"classNum": 10000}, "result": {
+    "status": "success", "message": "Added",
+    "course": {"code": "COP4600", "name": "OS", "classNum": 10000, "credits": 3,
+               "meetTimes": make_course("COP4600")["sections"][0]["meetTimes"]}}}]
+payload, _ = fit_tool_results(added)
+assert "meetTimes" not in payload and "MWF 3-4" in payload
+print("   ✅ add_course results are summarized for the prompt")
+
+print("\n✨ Compaction tests passed!")
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the schedule conflict report and calendar (.ics) export
+"""
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+sys.path.insert(0, 'backend')
+
+os.environ.setdefault("SCHEDUGATOR_LLM", "fake")
+os.environ["SCHEDUGATOR_SOLVER_WORKERS"] = "0"
+
+import catalog
+from conflicts import conflict_report, occupancy_mask
+from export import build_ics, fold
+from meetings import section_slots
+
+
+def meeting(days, begin, end, clock=None, building=None, room=None):
+    meet_time = {"meetDays": days, "meetPeriodBegin": str(begin), "meetPeriodEnd": str(end)}
+    if clock:
+        meet_time.update(meetTimeBegin=clock[0], meetTimeEnd=clock[1])
+    if building:
+        meet_time.update(meetBuilding=building, meetRoom=room)
+    return meet_time
+
+
+def section(class_num, *meet_times, instructors=("Staff",)):
+    return {"classNum": class_num, "credits": 3, "instructors": list(instructors), "meetTimes": list(meet_times)}
+
+
+def clash(sections):
+    """Reference check, meeting by meeting: two of the sections meet on a shared day in overlapping periods."""
+    for a, b in itertools.combinations(sections, 2):
+        for x in section_slots(a):
+            for y in section_slots(b):
+                if None not in (x[1], x[2], y[1], y[2]) and x[0] & y[0] and max(x[1], y[1]) <= min(x[2], y[2]):
+                    return True
+    return False
+
+
+COURSES = [
+    {"code": "COP3502C", "name": "Programming 1", "sections": [
+        section(101, meeting(["M", "W", "F"], 3, 3, ("9:35 AM", "10:25 AM"), "CSE", "E119"),
+                instructors=("Smith, J", "Lee")),
+        section(102, meeting(["T", "R"], 2, 3))]},
+    # Lecture never clashes with COP3502C; the Friday lab (second meeting) does
+    {"code": "PHY2048L", "name": "Physics Lab", "sections": [
+        section(201, meeting(["T"], 5, 5), meeting(["F"], 2, 3, ("8:30 AM", "10:25 AM")))]},
+    {"code": "MAC2312", "name": "Calculus 2", "sections": [section(301, meeting(["M", "W", "F"], 6, 6))]},
+    {"code": "IDS2935", "name": "Online Quest", "sections": [section(401, meeting([], None, None))]},
+]
+
+tmp = tempfile.mkdtemp()
+catalog_path = os.path.join(tmp, "catalog.json")
+with open(catalog_path, "w") as f:
+    json.dump(COURSES, f)
+catalog.set_catalog(catalog.load_catalog(catalog_path))
+
+print("=" * 70)
+print("TESTING CONFLICT REPORT")
+print("=" * 70)
+
+rng = random.Random(50)
+days = ["M", "T", "W", "R", "F", "S"]
+random_sections = []
+for class_num in range(40):
+    meets = []
+    for _ in range(rng.randint(0, 2)):
+        begin = rng.randint(1, 12)
+        meets.append(meeting(rng.sample(days, rng.randint(0, 3)), begin, begin + rng.randint(0, 2)))
+    random_sections.append(section(class_num, *meets))
+options = [(occupancy_mask(s), s) for s in random_sections]
+pairs = {(i, j) for i, j, _ in conflict_report(options)}
+expected = {(i, j) for i, j in itertools.combinations(range(40), 2)
+            if clash([random_sections[i], random_sections[j]])}
+assert pairs == expected
+assert all(overlaps for _, _, overlaps in conflict_report(options))
+print(f"   ✅ Report agrees with a meeting-by-meeting check on 780 random pairs ({len(pairs)} conflicts)")
+
+import api
+
+client = api.app.test_client()
+report = client.post('/api/schedule/conflicts', json={'class_nums': [101, 201, 301, 401, 999]}).get_json()
+assert report['conflict_free'] is False and len(report['conflicts']) == 1
+conflict = report['conflicts'][0]
+assert [s['code'] for s in conflict['sections']] == ['COP3502C', 'PHY2048L']
+assert conflict['overlaps'] == [{'days': ['F'], 'periods': ['3', '3'], 'minutes': [575, 625],
+                                 'text': 'F 3 (9:35-10:25)'}]
+assert report['unscheduled'] == [401] and report['not_found'] == [999] and report['sections'] == 4
+print("   ✅ Conflict on a section's second meeting found, with the shared day and time")
+
+solved = client.post('/api/generate-schedule', json={'courses': ['COP3502C', 'PHY2048L', 'MAC2312']}).get_json()
+class_nums = [s['classNum'] for s in solved['schedule']]
+assert 102 in class_nums
+assert client.post('/api/schedule/conflicts', json={'class_nums': class_nums}).get_json()['conflict_free']
+print("   ✅ The solver's schedules report conflict-free")
+
+batch = client.post('/api/schedule/conflicts', json={'schedules': [
+    {'id': 'alice', 'class_nums': [101, 201]}, [102, 201]]}).get_json()['reports']
+assert [(r['id'], r['conflict_free']) for r in batch] == [('alice', False), (1, True)]
+for body in ({}, {'class_nums': ['abc']}, {'schedules': 'x'}, {'class_nums': list(range(1000))}):
+    assert client.post('/api/schedule/conflicts', json=body).status_code == 400, body
+print("   ✅ Batch reports; malformed requests get 400")
+
+print("\n" + "=" * 70)
+print("TESTING CALENDAR EXPORT")
+print("=" * 70)
+
+response = client.get('/api/schedule/ics?class_nums=101,201,401&name=Spring;%20Plan')
+assert response.status_code == 200 and response.mimetype == 'text/calendar'
+assert 'attachment' in response.headers['Content-Disposition']
+ics = response.get_data(as_text=True)
+lines = ics.split('\r\n')
+assert lines[0] == 'BEGIN:VCALENDAR' and lines[-2] == 'END:VCALENDAR' and lines[-1] == ''
+assert all(len(line.encode('utf-8')) <= 75 for line in lines)
+unfolded = ics.replace('\r\n ', '')
+assert 'X-WR-CALNAME:Spring\\; Plan' in unfolded
+assert unfolded.count('BEGIN:VEVENT') == 3, "Two lab meetings and the lecture; the online section has none"
+# Spring 2026 starts Monday 2026-01-12; the last day ends at 23:59:59 EDT
+assert 'DTSTART;TZID=America/New_York:20260112T093500' in unfolded
+assert 'DTEND;TZID=America/New_York:20260112T102500' in unfolded
+assert 'RRULE:FREQ=WEEKLY;BYDAY=MO,WE,FR;UNTIL=20260423T035959Z' in unfolded
+assert 'DTSTART;TZID=America/New_York:20260116T083000' in unfolded, "Friday lab from its clock times"
+assert 'DTSTART;TZID=America/New_York:20260113T114500' in unfolded, "Period 5 when there are no clock times"
+assert 'LOCATION:CSE E119' in unfolded
+assert 'DESCRIPTION:Section 101\\nInstructor: Smith\\, J\\, Lee' in unfolded
+assert 'UID:COP3502C-101-0@schedugator' in unfolded
+print("   ✅ Weekly events per meeting from the first class day, in campus time, RFC 5545 escaped and folded")
+
+# Every TZID used needs a VTIMEZONE (RFC 5545 3.2.19): EST at the start of the term, EDT from March 8
+vtimezone = unfolded[unfolded.index('BEGIN:VTIMEZONE'):unfolded.index('END:VTIMEZONE')]
+assert unfolded.index('END:VTIMEZONE') < unfolded.index('BEGIN:VEVENT')
+assert vtimezone.split('\r\n') == [
+    'BEGIN:VTIMEZONE', 'TZID:America/New_York',
+    'BEGIN:STANDARD', 'DTSTART:20260112T000000', 'TZOFFSETFROM:-0500', 'TZOFFSETTO:-0500', 'TZNAME:EST',
+    'END:STANDARD',
+    'BEGIN:DAYLIGHT', 'DTSTART:20260308T020000', 'TZOFFSETFROM:-0500', 'TZOFFSETTO:-0400', 'TZNAME:EDT',
+    'END:DAYLIGHT', '']
+print("   ✅ VTIMEZONE for the campus time zone with the term's daylight saving change")
+
+etag = response.headers['ETag']
+again = client.get('/api/schedule/ics?class_nums=101,201,401&name=Spring;%20Plan', headers={'If-None-Match': etag})
+assert again.status_code == 304
+assert client.get('/api/schedule/ics?class_nums=101,201,401&name=Spring;%20Plan').get_data(as_text=True) == ics
+print("   ✅ Same body for the same ETag; subscribed calendars get 304")
+
+posted = client.post('/api/schedule/ics', json={'class_nums': [301], 'start': '2026-05-11', 'end': '2026-06-19',
+                                                 'tz': 'America/Chicago'}).get_data(as_text=True)
+assert 'DTSTART;TZID=America/Chicago:20260511T' in posted and 'UNTIL=20260620T045959Z' in posted
+assert 'TZID:America/Chicago' in posted and 'TZNAME:CDT' in posted and 'BEGIN:STANDARD' not in posted
+assert client.get('/api/schedule/ics?class_nums=101,999').get_json()['not_found'] == [999]
+assert client.get('/api/schedule/ics?class_nums=101&tz=Mars/Base').status_code == 400
+assert client.get('/api/schedule/ics?class_nums=101&start=2026-05-01&end=2026-01-01').status_code == 400
+assert client.get('/api/schedule/ics').status_code == 400
+for start, end in (('0001-01-02', '3000-01-01'), ('2026-01-12', '9999-12-31'), ('2026-01-01', '2028-01-01')):
+    rejected = client.get(f'/api/schedule/ics?class_nums=101&start={start}&end={end}')
+    assert rejected.status_code == 400 and 'error' in rejected.get_json(), (start, end)
+print("   ✅ POST with custom term and time zone; unknown sections 404; bad parameters and huge ranges 400")
+
+assert fold('X' * 200) == ['X' * 75, ' ' + 'X' * 74, ' ' + 'X' * 51]
+assert build_ics([]).count('VEVENT') == 0
+print("   ✅ Line folding and empty calendars")
+
+print("\n✨ Export tests passed!")
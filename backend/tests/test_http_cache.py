@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test script to verify HTTP caching (ETags, 304s, Cache-Control) and compression
+"""
+import gzip
+import json
+import os
+import sys
+import tempfile
+sys.path.insert(0, 'backend')
+
+os.environ.setdefault("SCHEDUGATOR_LLM", "fake")
+
+import catalog
+
+COURSES = [{
+    "code": f"COP{3500 + i}",
+    "name": f"Programming Course {i}",
+    "description": "Covers programming topics in depth. " * 10,
+    "sections": [{"classNum": 10500 + i, "instructors": ["Staff"], "credits": 3, "meetTimes": [
+        {"meetDays": ["M", "W", "F"], "meetPeriodBegin": "4", "meetPeriodEnd": "4"}]}],
+} for i in range(20)]
+
+tmp = tempfile.mkdtemp()
+catalog_path = os.path.join(tmp, "catalog.json")
+with open(catalog_path, "w") as f:
+    json.dump(COURSES, f)
+catalog.set_catalog(catalog.load_catalog(catalog_path))
+
+from api import app
+
+print("=" * 70)
+print("TESTING HTTP CACHING")
+print("=" * 70)
+
+client = app.test_client()
+
+first = client.post('/api/search', json={'query': 'COP'})
+etag = first.headers['ETag']
+assert first.status_code == 200 and first.headers['Cache-Control'] == 'no-cache'
+again = client.post('/api/search', json={'query': 'cop', 'dept': None}, headers={'If-None-Match': etag})
+assert again.status_code == 304 and not again.data
+print(f"   ✅ Repeat search (normalized) is a 304 for ETag {etag}")
+
+get = client.get('/api/search?query=COP&min_level=1000')
+assert get.status_code == 200 and get.headers['ETag'] == etag
+assert get.get_json()['count'] == first.get_json()['count']
+assert client.get('/api/search?query=COP', headers={'If-None-Match': etag}).status_code == 304
+assert client.post('/api/search', json={'query': 'COP3501'}, headers={'If-None-Match': etag}).status_code == 200
+assert client.get('/api/search?min_level=abc').status_code == 400
+print("   ✅ GET /api/search shares the ETag; different queries miss")
+
+majors = client.get('/api/majors')
+assert majors.headers['Cache-Control'] == 'public, max-age=300'
+assert client.get('/api/majors', headers={'If-None-Match': majors.headers['ETag']}).status_code == 304
+assert client.get('/api/health').headers['Cache-Control'] == 'no-store'
+print("   ✅ Per-endpoint Cache-Control; majors revalidate to 304")
+
+print("\n" + "=" * 70)
+print("TESTING COMPRESSION")
+print("=" * 70)
+
+plain = client.post('/api/search', json={'query': 'COP'})
+zipped = client.post('/api/search', json={'query': 'COP'}, headers={'Accept-Encoding': 'gzip'})
+assert 'Content-Encoding' not in plain.headers
+assert zipped.headers['Content-Encoding'] == 'gzip' and 'Accept-Encoding' in zipped.headers['Vary']
+assert gzip.decompress(zipped.data) == plain.data
+assert zipped.headers['ETag'] == 'W/' + plain.headers['ETag']
+print(f"   ✅ gzip: {len(plain.data)} -> {len(zipped.data)} bytes, weak ETag")
+
+assert client.post('/api/search', json={'query': 'COP'},
+                   headers={'Accept-Encoding': 'gzip', 'If-None-Match': zipped.headers['ETag']}).status_code == 304
+print("   ✅ Weak ETag of the compressed copy still revalidates")
+
+small = client.post('/api/search', json={'query': 'NOPE'}, headers={'Accept-Encoding': 'gzip'})
+assert 'Content-Encoding' not in small.headers
+print("   ✅ Small responses are sent uncompressed")
+
+print("\n✨ HTTP cache tests passed!")
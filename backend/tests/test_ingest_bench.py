@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test script to verify recording and replaying the schedule API for the ingest benchmark
+"""
+import json
+import os
+import sys
+import tempfile
+sys.path.insert(0, 'backend')
+
+from ingest_bench import IncompleteRecording, ReplaySession, record, run_benchmark
+
+
+def raw_course(code, class_number):
+    return {"code": code, "name": f"Course {code}", "prerequisites": "", "sections": [{
+        "classNumber": class_number, "credits": 3, "deptName": "Computer Science",
+        "instructors": [{"name": "Staff"}],
+        "meetTimes": [{"meetDays": ["M"], "meetPeriodBegin": "3", "meetPeriodEnd": "3"}]}]}
+
+
+# Two pages of courses, then the API's empty answer
+PAGES = {
+    0: [{"COURSES": [raw_course("COP3502C", 1), raw_course("COP3503C", 2)], "LASTCONTROLNUMBER": 10}],
+    10: [{"COURSES": [raw_course("MAC2311", 3)], "LASTCONTROLNUMBER": 20}],
+    20: [],
+}
+
+
+class StubResponse:
+    def __init__(self, body):
+        self.body = body
+
+    def raise_for_status(self):
+        if isinstance(self.body, Exception):
+            raise self.body
+
+    def json(self):
+        return self.body
+
+
+class StubSession:
+    """The schedule API, offline; fail_at makes one page fail like a dropped connection."""
+
+    def __init__(self, fail_at=None):
+        self.fail_at = fail_at
+
+    def get(self, url, params=None, headers=None):
+        control = params["last-control-number"]
+        if control == self.fail_at:
+            return StubResponse(ConnectionError("connection reset"))
+        return StubResponse(PAGES[control])
+
+
+print("=" * 70)
+print("TESTING RECORD AND REPLAY")
+print("=" * 70)
+
+tmp = tempfile.mkdtemp()
+good = os.path.join(tmp, "good")
+assert record(good, session=StubSession()) == (3, 3)
+with open(os.path.join(good, "manifest.json")) as f:
+    assert json.load(f)["complete"] is True
+print("   ✅ Recorded every page (and the end-of-data probe) with a complete manifest")
+
+runs = run_benchmark(good, repeat=2)
+assert [(r["pages"], r["courses"], r["sections"]) for r in runs] == [(2, 3, 3), (2, 3, 3)]
+assert all(r["peak_rss_mb"] and r["peak_rss_mb"] < 500 for r in runs)
+print(f"   ✅ Replayed twice offline, each run in its own process (peak RSS {[round(r['peak_rss_mb']) for r in runs]} MB)")
+
+partial = os.path.join(tmp, "partial")
+try:
+    record(partial, session=StubSession(fail_at=10))
+    raise AssertionError("A failed fetch must fail the recording")
+except IncompleteRecording as e:
+    assert "after 1 pages" in str(e)
+with open(os.path.join(partial, "manifest.json")) as f:
+    manifest = json.load(f)
+assert manifest["complete"] is False and "connection reset" in manifest["error"]
+for fixture_dir in (partial, os.path.join(tmp, "missing")):
+    try:
+        ReplaySession(fixture_dir)
+        raise AssertionError("Incomplete recordings must not replay")
+    except IncompleteRecording:
+        pass
+print("   ✅ A failed fetch marks the recording incomplete, and it is refused for replay")
+
+# Recording again over a partial recording starts clean
+assert record(partial, session=StubSession()) == (3, 3)
+assert ReplaySession(partial).pages_by_control.keys() == {"0", "10", "20"}
+print("   ✅ Re-recording replaces the old pages")
+
+print("\n✨ Ingest benchmark tests passed!")
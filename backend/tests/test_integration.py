@@ -30,7 +30,7 @@ except Exception as e:
     sys.exit(1)
 
 try:
-    from conflicts import solve_schedule, has_global_conflict
+    from conflicts import occupancy_mask, solve_compiled
     print("   ✅ conflicts.py imported successfully")
 except Exception as e:
     print(f"   ❌ Failed to import conflicts: {e}")
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the major registry (lookup, pre-encoded bodies, hot reload)
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+sys.path.insert(0, 'backend')
+
+from brain import GemmaBrain, GEMMA_SYSTEM_PROMPT
+from llm import ScriptedProvider
+from majors import MajorRegistry, major_code_from_context
+
+MAJORS = [
+    {"major_code": "CPS", "college": "Engineering", "total_credits": 120,
+     "gpa_gate": {"critical_tracking_min": 2.5, "critical_tracking": ["COP3502C", "MAC2311"]}},
+    {"major_code": "MTH", "college": "Liberal Arts", "total_credits": 120},
+]
+
+tmp = tempfile.mkdtemp()
+path = os.path.join(tmp, "bucket_1.json")
+with open(path, "w") as f:
+    json.dump(MAJORS, f)
+
+print("=" * 70)
+print("TESTING MAJOR REGISTRY")
+print("=" * 70)
+
+registry = MajorRegistry(path, reload_seconds=0)
+cps = registry.get("cps")
+assert cps is registry.get("CPS") and len(registry) == 2 and registry.get("XYZ") is None
+assert cps.rules["required_courses"]["critical_tracking"] == ["COP3502C", "MAC2311"]
+assert "critical_tracking" not in cps.rules["gpa_gate"]
+print("   ✅ Lookup by code, critical tracking normalized at load")
+
+assert json.loads(cps.body) == {"major": cps.rules, "status": "success"}
+body, etag = registry.listing()
+assert json.loads(body)["count"] == 2 and etag == registry.listing()[1]
+print(f"   ✅ Pre-encoded bodies ({len(cps.body)} and {len(body)} bytes) with stable ETags")
+
+assert major_code_from_context("Computer Science (CPS)") == "CPS"
+assert major_code_from_context("CPS - Engineering") == "CPS"
+assert major_code_from_context("Undeclared student") is None
+print("   ✅ Major code parsed from the UI's major label")
+
+brain = GemmaBrain(provider=ScriptedProvider(), majors=registry)
+prompt = brain._build_system_prompt_with_major(cps.rules)
+assert prompt == GEMMA_SYSTEM_PROMPT + cps.prompt_section
+assert "ACTIVE MAJOR REQUIREMENTS: CPS" in prompt
+assert brain._build_system_prompt_with_major(dict(cps.rules)) == prompt, "Copies render the same prompt"
+print("   ✅ System prompt uses the prebuilt section")
+
+time.sleep(0.01)
+with open(path, "w") as f:
+    json.dump(MAJORS + [{"major_code": "POL", "college": "Liberal Arts"}], f)
+assert registry.get("POL") is not None and registry.listing()[1] != etag
+print("   ✅ Edited file is reloaded, listing ETag changes")
+
+with open(path, "w") as f:
+    f.write("[{broken")
+assert registry.get("POL") is not None, "A broken edit keeps the last good registry"
+print("   ✅ Broken edit keeps serving the last good version")
+
+print("\n✨ Major registry tests passed!")
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Test script to verify ingest-time meeting normalization and slot-based conflicts
+"""
+import sys
+sys.path.insert(0, 'backend')
+
+from meetings import normalize_meet_times, earliest_minutes, format_meetings
+from conflicts import conflict_report, occupancy_mask
+
+print("=" * 70)
+print("TESTING MEETING NORMALIZATION")
+print("=" * 70)
+
+raw_meet_times = [
+    {"meetDays": ["M", "W", "F"], "meetPeriodBegin": "4", "meetPeriodEnd": "4",
+     "meetTimeBegin": "10:40 AM", "meetTimeEnd": "11:30 AM", "meetBuilding": "CSE", "meetRoom": "E121"},
+    {"meetDays": ["T"], "meetPeriodBegin": "E1", "meetPeriodEnd": "E3"},
+    {"meetDays": [], "meetPeriodBegin": "", "meetPeriodEnd": ""},
+]
+
+slots = normalize_meet_times(raw_meet_times)
+assert slots[0] == [1 | 4 | 16, 4, 4, 640, 690], slots[0]
+assert slots[1] == [2, 12, 14, 1160, 1330], slots[1]
+assert slots[2] == [0, None, None, None, None], slots[2]
+print(f"   ✅ Slots: {slots}")
+
+section = {"meetTimes": raw_meet_times, "slots": slots}
+assert earliest_minutes(section) == 640
+assert earliest_minutes({"meetTimes": []}) == 999999
+print("   ✅ Earliest start read from slots")
+
+meetings = format_meetings(section)
+assert meetings[0] == "MWF 4 (10:40-11:30) CSE E121", meetings[0]
+assert meetings[1] == "T E1-E3 (19:20-22:10)", meetings[1]
+print(f"   ✅ Compact strings: {meetings}")
+
+print("\n" + "=" * 70)
+print("TESTING SLOT-BASED CONFLICTS")
+print("=" * 70)
+
+mwf_4 = {"slots": [[1 | 4 | 16, 4, 4, 640, 690]]}
+tr_4 = {"slots": [[2 | 8, 4, 5, 640, 755]]}
+m_3_4 = {"slots": [[1, 3, 4, 575, 690]]}
+legacy = {"meetTimes": [{"meetDays": ["T"], "meetPeriodBegin": 5, "meetPeriodEnd": 5}]}
+
+assert not occupancy_mask(mwf_4) & occupancy_mask(tr_4)
+assert occupancy_mask(mwf_4) & occupancy_mask(m_3_4)
+assert occupancy_mask(tr_4) & occupancy_mask(legacy)  # raw meetTimes still handled
+report = conflict_report([(occupancy_mask(s), s) for s in (mwf_4, tr_4, m_3_4, legacy)])
+assert [(i, j) for i, j, _ in report] == [(0, 2), (1, 3)]
+assert report[0][2] == [[1, 4, 4, 640, 690]]
+print("   ✅ Day masks and period overlaps detected correctly")
+
+print("\n✨ Meeting normalization tests passed!")
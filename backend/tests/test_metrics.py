@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test script to verify histograms, the Prometheus endpoint and per-stage timings
+"""
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+sys.path.insert(0, 'backend')
+
+os.environ.setdefault("SCHEDUGATOR_LLM", "fake")
+os.environ["SCHEDUGATOR_SOLVER_WORKERS"] = "0"
+
+import catalog
+import metrics
+
+COURSES = [
+    {"code": "COP3502C", "name": "Programming 1", "sections": [
+        {"classNum": 1, "credits": 4, "instructors": ["A"], "meetTimes": [
+            {"meetDays": ["M", "W", "F"], "meetPeriodBegin": "4", "meetPeriodEnd": "4"}]},
+        {"classNum": 2, "credits": 4, "instructors": ["B"], "meetTimes": [
+            {"meetDays": ["T"], "meetPeriodBegin": "2", "meetPeriodEnd": "3"}]}]},
+    {"code": "MAC2312", "name": "Calculus 2", "sections": [
+        {"classNum": 3, "credits": 4, "instructors": ["C"], "meetTimes": [
+            {"meetDays": ["M"], "meetPeriodBegin": "4", "meetPeriodEnd": "4"}]}]},
+]
+
+tmp = tempfile.mkdtemp()
+catalog_path = os.path.join(tmp, "catalog.json")
+with open(catalog_path, "w") as f:
+    json.dump(COURSES, f)
+catalog.set_catalog(catalog.load_catalog(catalog_path))
+
+print("=" * 70)
+print("TESTING HISTOGRAMS")
+print("=" * 70)
+
+for value in (0.003, 0.04, 0.04, 7):
+    metrics.observe("test_seconds", value, route="/x")
+histogram = metrics.get_histogram("test_seconds", route="/x")
+assert histogram["count"] == 4 and abs(histogram["sum"] - 7.083) < 1e-9
+assert histogram["buckets"][0.005] == 1 and histogram["buckets"][0.05] == 3 and histogram["buckets"][10] == 4
+print("   ✅ Cumulative buckets, count and sum")
+
+text = metrics.render()
+assert '# TYPE test_seconds histogram' in text
+assert 'test_seconds_bucket{route="/x",le="0.05"} 3' in text
+assert 'test_seconds_bucket{route="/x",le="+Inf"} 4' in text and 'test_seconds_count{route="/x"} 4' in text
+print("   ✅ Prometheus exposition of a histogram")
+
+start = time.perf_counter()
+for _ in range(100000):
+    metrics.observe("bench_seconds", 0.01, route="/api/search")
+per_call = (time.perf_counter() - start) / 100000
+assert per_call < 20e-6, per_call
+print(f"   ✅ observe() costs {per_call * 1e6:.2f}µs")
+
+print("\n" + "=" * 70)
+print("TESTING /api/metrics")
+print("=" * 70)
+
+import api
+
+client = api.app.test_client()
+client.post('/api/search', json={'query': 'COP'})
+client.get('/api/major/CPS')
+client.post('/api/generate-schedule', json={'courses': ['COP3502C', 'MAC2312']})
+chat = client.post('/api/chat', json={'message': 'Find COP3502C sections'})
+assert chat.status_code == 200
+
+response = client.get('/api/metrics')
+assert response.status_code == 200 and response.content_type.startswith('text/plain; version=0.0.4')
+text = response.get_data(as_text=True)
+
+assert 'http_request_duration_seconds_count{method="POST",route="/api/search",status="200"} 1' in text
+assert re.search(r'http_request_duration_seconds_count\{method="GET",route="/api/major/<major_code>",status="\d+"\} 1', text)
+print("   ✅ Request latency per route (URL rule, not path)")
+
+for stage in ('purpose="initial",stage="prompt_build"', 'purpose="initial",stage="model_call"',
+              'stage="tool_call",tool="search_catalog"', 'stage="chat_turn"'):
+    assert f'stage_seconds_count{{{stage}}}' in text, stage
+print("   ✅ Stage timings: prompt build, model calls, tools, whole turn")
+
+assert 'solver_solves_total{result="solved"} 1' in text
+assert 'solver_nodes_count 1' in text and 'solver_seconds_count 1' in text
+nodes = metrics.get_histogram("solver_nodes")
+assert nodes["sum"] == 3, "MAC2312 placed first, then both COP3502C sections tried"
+print(f"   ✅ Solver time and node counts ({nodes['sum']:.0f} nodes)")
+
+assert 'catalog_courses 2' in text and 'catalog_load_seconds ' in text
+assert 'sessions_active 1' in text
+assert 'cache_misses_total{cache="search"}' in text and '# TYPE cache_hits_total counter' in text
+assert 'search_cache_lookups_total{result="miss"}' in text
+print("   ✅ Catalog, session and cache state")
+
+names = [line.split()[2] for line in text.splitlines() if line.startswith('# TYPE')]
+assert len(names) == len(set(names)), "Each metric is typed once"
+for line in text.splitlines():
+    if not line.startswith('#'):
+        assert re.fullmatch(r'[a-zA-Z_:][\w:]*(\{.*\})? [-+\w.]+', line), line
+print(f"   ✅ {len(text.splitlines())} well-formed lines")
+
+print("\n✨ Metrics tests passed!")
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the preload/fork startup path (gunicorn.conf.py, api.after_fork)
+"""
+import gc
+import json
+import os
+import runpy
+import sys
+import tempfile
+sys.path.insert(0, 'backend')
+
+os.environ.setdefault("SCHEDUGATOR_LLM", "fake")
+
+import catalog
+
+COURSES = [{"code": "COP3502C", "name": "Programming 1", "sections": [
+    {"classNum": 1, "credits": 4, "instructors": ["A"], "meetTimes": [
+        {"meetDays": ["M"], "meetPeriodBegin": "4", "meetPeriodEnd": "4"}]}]}]
+
+tmp = tempfile.mkdtemp()
+catalog_path = os.path.join(tmp, "catalog.json")
+with open(catalog_path, "w") as f:
+    json.dump(COURSES, f)
+catalog.set_catalog(catalog.load_catalog(catalog_path))
+
+print("=" * 70)
+print("TESTING STARTUP REPORT")
+print("=" * 70)
+
+import api
+from sessions import SQLiteSessionStore
+
+report = api.STARTUP
+assert set(report["phases"]) == {"majors", "catalog", "solver", "brain"}
+assert report["total_seconds"] >= sum(report["phases"].values()) - 1e-3
+assert report["memory"]["rss_mb"] > 0
+health = api.app.test_client().get('/api/health').get_json()["services"]
+assert health["startup"] == report and "rss_mb" in health["memory"]
+assert 'startup_seconds{phase="catalog"}' in api.app.test_client().get('/api/metrics').get_data(as_text=True)
+print(f"   ✅ Startup report: {report}")
+
+config = runpy.run_path('backend/gunicorn.conf.py')
+gc.enable()  # The config disables it until the master is ready
+assert config["wsgi_app"] == "api:app" and config["preload_app"] is True
+assert config["chdir"] == os.path.abspath('backend')
+print("   ✅ gunicorn.conf.py preloads api:app from backend/")
+
+print("\n" + "=" * 70)
+print("TESTING FORKED WORKERS")
+print("=" * 70)
+
+# The parent uses everything a worker must not inherit
+api.session_store = SQLiteSessionStore(os.path.join(tmp, "sessions.db"))
+parent_conn = api.session_store._connect()
+client = api.app.test_client()
+assert client.post('/api/chat', json={'message': 'Find COP3502C'}).status_code == 200
+parent_pool = api.brain._tool_pool
+
+read_end, write_end = os.pipe()
+pid = os.fork()
+if pid == 0:
+    try:
+        api.after_fork()
+        result = {
+            "new_pool": api.brain._tool_pool is not parent_pool,
+            "new_conn": api.session_store._connect() is not parent_conn,
+            "chat": client.post('/api/chat', json={'message': 'Find COP3502C'}).status_code,
+            "search": client.get('/api/search?query=COP').get_json()["count"],
+        }
+    except Exception as e:
+        result = {"error": repr(e)}
+    os.write(write_end, json.dumps(result).encode())
+    os._exit(0)
+
+os.close(write_end)
+os.waitpid(pid, 0)
+result = json.loads(os.read(read_end, 4096))
+assert result == {"new_pool": True, "new_conn": True, "chat": 200, "search": 1}, result
+print("   ✅ Forked worker gets its own tool pool and SQLite connection, and serves requests")
+
+assert client.post('/api/chat', json={'message': 'Find COP3502C'}).status_code == 200
+print("   ✅ Parent unaffected")
+
+print("\n✨ Prefork tests passed!")
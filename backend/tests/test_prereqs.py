@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test script to verify prerequisite parsing and bitset eligibility checks
+"""
+import json
+import os
+import sys
+import tempfile
+sys.path.insert(0, 'backend')
+
+os.environ.setdefault("SCHEDUGATOR_LLM", "fake")
+
+from prereqs import parse_prereqs, is_eligible, PrereqGraph
+
+print("=" * 70)
+print("TESTING PREREQUISITE PARSING")
+print("=" * 70)
+
+cases = [
+    ("(MAC 2311 or MAC 2233) and PHY 2048 with a minimum grade of C",
+     ["and", [["or", ["MAC2311", "MAC2233"]], "PHY2048"]]),
+    ("Prereq: COP 3502C", "COP3502"),
+    ("MAC 2311, MAC 2312, or MAC 2313", ["or", ["MAC2311", "MAC2312", "MAC2313"]]),
+    ("COP 3503C and COT 3100, with minimum grades of C.", ["and", ["COP3503", "COT3100"]]),
+    ("MAC 2311 or MAC 2233; COP 3502", ["and", [["or", ["MAC2311", "MAC2233"]], "COP3502"]]),
+    ("Instructor permission required.", None),
+    ("", None),
+]
+
+for text, expected in cases:
+    parsed = parse_prereqs(text)
+    status = "✅" if parsed == expected else "❌"
+    print(f"{status} {text!r} -> {parsed}")
+    assert parsed == expected, f"expected {expected}"
+
+print("\n" + "=" * 70)
+print("TESTING ELIGIBILITY")
+print("=" * 70)
+
+catalog = [
+    {"code": "MAC2311", "prereqs": ""},
+    {"code": "MAC2312", "prereqs": "MAC 2311"},
+    {"code": "MAC2313", "prereqs": "MAC 2312"},
+    {"code": "COP3530", "prereqs": "COP 3503C and (COT 3100 or MAD 2104)"},
+]
+
+assert is_eligible(["mac 2311"], catalog[1])
+assert not is_eligible([], catalog[1])
+print("   ✅ is_eligible handles codes with spaces and lowercase")
+
+graph = PrereqGraph(catalog)
+wanted = ["MAC2313", "COP3530", "MAC2311", "MAC2312"]
+
+eligible = graph.eligible_courses(["MAC2311", "COP3503C", "MAD2104"], wanted)
+assert eligible == ["COP3530", "MAC2311", "MAC2312"], eligible
+print(f"   ✅ Batch eligibility: {eligible}")
+
+assert graph.missing([], "COP3530") == ["COP3503", "COT3100"], "One side of the OR, not both"
+assert graph.missing(["COP3503"], "COP3530") == ["COT3100"]
+assert graph.missing(["MAD2104"], "COP3530") == ["COP3503"]
+assert graph.missing(["COP3503", "MAD2104"], "COP3530") == []
+assert graph.missing([], "MAC2311") == [] and graph.missing([], "XYZ1234") == []
+
+# 2^7 = 128 DNF clauses: too many to expand, answered from the expression instead
+big_text = " and ".join(f"(ABC{1000 + i} or DEF{1000 + i})" for i in range(7))
+big = PrereqGraph([{"code": "BIG4999", "prereqs": big_text}])
+assert big.clauses["BIG4999"] is None
+assert big.missing(["DEF1000"], "BIG4999") == [f"ABC{1000 + i}" for i in range(1, 7)]
+assert graph.eligible_courses([], ["XYZ1234"]) == ["XYZ1234"]  # Unknown courses are not blocked
+print("   ✅ Missing prerequisites reported")
+
+print("\n" + "=" * 70)
+print("TESTING /api/eligibility")
+print("=" * 70)
+
+import catalog as catalog_module
+
+tmp = tempfile.mkdtemp()
+catalog_path = os.path.join(tmp, "catalog.json")
+with open(catalog_path, "w") as f:
+    json.dump([dict(course, name=course["code"], sections=[]) for course in catalog], f)
+catalog_module.set_catalog(catalog_module.load_catalog(catalog_path))
+
+import api
+
+client = api.app.test_client()
+result = client.post('/api/eligibility', json={'completed': ['COP3503C'], 'courses': ['COP3530', 'MAC2311']}).get_json()
+assert result['eligible'] == ['MAC2311'] and result['blocked'] == [{'code': 'COP3530', 'missing': ['COT3100']}]
+print("   ✅ Blocked courses list the cheapest way to unblock them")
+
+for kwargs in ({'data': 'not json', 'content_type': 'application/json'}, {}, {'json': {'courses': 'COP3530'}}):
+    response = client.post('/api/eligibility', **kwargs)
+    assert response.status_code == 400, kwargs
+print("   ✅ Missing or malformed bodies get 400")
+
+print("\n✨ Prerequisite tests passed!")
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Test script to verify per-client rate limits and chat admission control
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+sys.path.insert(0, 'backend')
+
+os.environ.setdefault("SCHEDUGATOR_LLM", "fake")
+os.environ["SCHEDUGATOR_CHAT_RATE_PER_MIN"] = "60"
+os.environ["SCHEDUGATOR_CHAT_BURST"] = "3"
+os.environ["SCHEDUGATOR_PROXY_HOPS"] = "1"
+
+import catalog
+from ratelimit import Limit, Limiter, MemoryBuckets, SQLiteBuckets, client_address
+
+COURSES = [{"code": "COP3502C", "name": "Programming 1", "sections": [
+    {"classNum": 1, "credits": 4, "instructors": ["A"], "meetTimes": [
+        {"meetDays": ["M"], "meetPeriodBegin": "4", "meetPeriodEnd": "4"}]}]}]
+
+tmp = tempfile.mkdtemp()
+catalog_path = os.path.join(tmp, "catalog.json")
+with open(catalog_path, "w") as f:
+    json.dump(COURSES, f)
+catalog.set_catalog(catalog.load_catalog(catalog_path))
+
+print("=" * 70)
+print("TESTING TOKEN BUCKETS")
+print("=" * 70)
+
+limit = Limit(per_second=0.5, burst=2)
+db = os.path.join(tmp, "buckets.db")
+for name, store, other in (("memory", MemoryBuckets(), None), ("sqlite", SQLiteBuckets(db), SQLiteBuckets(db))):
+    assert store.take("a", limit, now=100) == 0 and store.take("a", limit, now=100) == 0
+    assert store.take("a", limit, now=100) == 2.0, "Empty: one token every 2s"
+    assert store.take("b", limit, now=100) == 0, "Buckets are per key"
+    assert store.take("a", limit, now=101) == 1.0
+    assert store.take("a", limit, now=102) == 0, "Refilled"
+    assert store.take("a", limit, now=1000) == 0 and store.take("a", limit, now=1000) == 0
+    assert store.take("a", limit, now=1000) > 0, "Refill is capped at the burst"
+    if other is not None:
+        assert other.take("a", limit, now=1000) > 0, "Another worker sees the same bucket"
+    print(f"   ✅ {name}: burst, refill, per-key, capped")
+
+assert client_address("10.0.0.1", "6.6.6.6, 1.2.3.4", hops=1) == "1.2.3.4"
+assert client_address("10.0.0.1", "1.2.3.4", hops=0) == "10.0.0.1"
+assert client_address("10.0.0.1", None, hops=1) == "10.0.0.1"
+print("   ✅ Client address from X-Forwarded-For only through trusted hops")
+
+limiter = Limiter(store=MemoryBuckets(), limits={"chat": Limit(100, 100)}, chat_concurrency=2)
+first, _ = limiter.admit("a", "chat")
+second, _ = limiter.admit("b", "chat")
+assert limiter.admit("c", "chat") == (None, 2)
+first()
+third, retry_after = limiter.admit("c", "chat")
+assert third is not None and retry_after == 0 and limiter.chat_in_flight == 2
+print("   ✅ Chat concurrency limit: rejected when full, admitted after a release")
+
+print("\n" + "=" * 70)
+print("TESTING ENDPOINTS")
+print("=" * 70)
+
+import api
+
+client = api.app.test_client()
+alice = {'X-Forwarded-For': '1.1.1.1'}
+for _ in range(3):
+    assert client.post('/api/chat', json={'message': 'hi'}, headers=alice).status_code == 200
+limited = client.post('/api/chat', json={'message': 'hi'}, headers=alice)
+assert limited.status_code == 429 and limited.headers['Retry-After'] == '1'
+assert limited.get_json()['retry_after'] == 1
+assert limited.headers['Access-Control-Allow-Origin'] == '*'
+print("   ✅ 4th chat in a burst of 3 gets 429 with Retry-After")
+
+assert client.post('/api/chat', json={'message': 'hi'}, headers={'X-Forwarded-For': '2.2.2.2'}).status_code == 200
+assert client.get('/api/search?query=COP', headers=alice).status_code == 200
+print("   ✅ Other clients, and the same client's searches, are unaffected")
+
+api.limiter.chat_in_flight = api.limiter.chat_concurrency
+busy = client.post('/api/chat', json={'message': 'hi'}, headers={'X-Forwarded-For': '3.3.3.3'})
+assert busy.status_code == 429 and busy.headers['Retry-After'] == '2'
+assert client.get('/api/search?query=COP').status_code == 200
+assert client.get('/api/health').status_code == 200
+api.limiter.chat_in_flight = 0
+print("   ✅ Chat at its concurrency limit: chats rejected, search and health still served")
+
+stream = client.post('/api/chat/stream', json={'message': 'hi'}, headers={'X-Forwarded-For': '4.4.4.4'})
+assert api.limiter.chat_in_flight == 1, "A streaming chat holds its slot until the stream closes"
+stream.get_data()
+stream.close()
+assert api.limiter.chat_in_flight == 0
+print("   ✅ Streaming chats release their slot when the stream closes")
+
+calls = api.brain.provider.call_count
+api.brain.provider.latency = 0.5
+stream = client.post('/api/chat/stream', json={'message': 'Find COP3502C'}, headers={'X-Forwarded-For': '4.4.4.5'},
+                     buffered=False)
+assert next(iter(stream.response)).startswith(b"event: session")
+stream.close()  # The browser goes away while the model is still thinking
+deadline = time.time() + 5
+while any(t.name == "chat-stream" for t in threading.enumerate()) and time.time() < deadline:
+    time.sleep(0.05)
+api.brain.provider.latency = 0
+assert not any(t.name == "chat-stream" for t in threading.enumerate()), "The turn kept running"
+assert api.brain.provider.call_count == calls + 1, "No tool or answer calls after the client left"
+print("   ✅ A closed stream stops its turn before the next tool or model call")
+
+metrics_text = client.get('/api/metrics').get_data(as_text=True)
+assert 'rate_limited_total{class="chat",reason="rate"} 1' in metrics_text
+assert 'rate_limited_total{class="chat",reason="busy"} 2' in metrics_text  # Plus the Limiter check above
+print("   ✅ Rejections counted in /api/metrics")
+
+import asgi
+
+
+async def asgi_chat(ip):
+    sent = []
+    messages = [{"type": "http.request", "body": b'{"message": "hi"}'}]
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "POST", "path": "/api/chat", "client": ("127.0.0.1", 1),
+             "headers": [(b"x-forwarded-for", ip.encode())]}
+    await asgi.app(scope, receive, send)
+    return sent[0]["status"], dict(sent[0]["headers"])
+
+statuses = [asyncio.run(asgi_chat("5.5.5.5")) for _ in range(4)]
+assert [status for status, _ in statuses] == [200, 200, 200, 429]
+assert statuses[-1][1][b"retry-after"] == b"1" and asgi.limiter.chat_in_flight == 0
+print("   ✅ ASGI chat routes enforce the same per-client limits")
+
+
+async def asgi_stream_disconnect():
+    sent = []
+    messages = [{"type": "http.request", "body": b'{"message": "hi"}'}]
+    client_gone = asyncio.Event()
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await client_gone.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+        if len(sent) == 2:  # Headers and the first frame delivered: the client leaves
+            client_gone.set()
+
+    scope = {"type": "http", "method": "POST", "path": "/api/chat/stream", "client": ("6.6.6.6", 1), "headers": []}
+    await asyncio.wait_for(asgi.app(scope, receive, send), timeout=3)
+    return sent
+
+
+api.brain.provider.latency = 30  # The turn would outlast the test
+sent = asyncio.run(asgi_stream_disconnect())
+api.brain.provider.latency = 0
+assert sent[0]["status"] == 200 and len(sent) == 2 and asgi.limiter.chat_in_flight == 0
+print("   ✅ ASGI chat stream returns when the client disconnects and releases its slot")
+
+print("\n✨ Rate limit tests passed!")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the search result (L1) and answer (L2) caches
+"""
+import json
+import os
+import sys
+import tempfile
+sys.path.insert(0, 'backend')
+
+import catalog
+from brain import GemmaBrain, search_cache_key, normalize_message, schedule_fingerprint
+from cache import TTLCache
+from llm import ScriptedProvider
+from sessions import ChatSession
+
+COURSES = [{
+    "code": "COP3502C",
+    "name": "Programming Fundamentals 1",
+    "dept": "Computer & Information Science & Engineering",
+    "sections": [{"classNum": 10509, "instructors": ["Staff"], "credits": 3, "meetTimes": []}],
+}, {
+    "code": "CAP4621",
+    "name": "Artificial Intelligence",
+    "isAI": True,
+    "sections": [{"classNum": 20001, "instructors": ["Staff"], "credits": 3, "meetTimes": []}],
+}]
+
+tmp = tempfile.mkdtemp()
+catalog_path = os.path.join(tmp, "catalog.json")
+with open(catalog_path, "w") as f:
+    json.dump(COURSES, f)
+catalog.set_catalog(catalog.load_catalog(catalog_path))
+
+print("=" * 70)
+print("TESTING SEARCH RESULT CACHE (L1)")
+print("=" * 70)
+
+assert search_cache_key({"query": "COP3502C", "dept": None}) == search_cache_key({"query": "cop3502c"})
+assert search_cache_key({"query": ["COP"]}) == search_cache_key({"queries": ["cop"]})
+assert search_cache_key({"query": "COP", "min_level": 3000}) != search_cache_key({"query": "COP"})
+print("   ✅ Equivalent parameters share a key")
+
+brain = GemmaBrain(provider=ScriptedProvider())
+first = brain.search_catalog_tool(query="COP3502C")
+second = brain.search_catalog_tool(query="cop3502c", diversity=False)
+assert first is second and first["count"] == 1
+stats = brain.cache_stats()["search"]
+assert stats["hits"] == 1 and stats["misses"] == 1
+print(f"   ✅ Repeated search served from cache (hit rate {stats['hit_rate']:.0%})")
+
+assert search_cache_key({"is_ai": False}) != search_cache_key({"is_ai": None})
+everything = brain.search_catalog_tool()
+not_ai = brain.search_catalog_tool(is_ai=False)
+assert everything["count"] == 2 and [c["code"] for c in not_ai["results"]] == ["COP3502C"]
+print("   ✅ is_ai=False is a filter, not a default: it never shares a key with no filter")
+
+print("\n" + "=" * 70)
+print("TESTING ANSWER CACHE (L2)")
+print("=" * 70)
+
+assert normalize_message("  Show me CS   tracking courses? ") == normalize_message("show me cs tracking courses")
+assert schedule_fingerprint([{"code": "A", "classNum": 1}, {"code": "B", "classNum": 2}]) == \
+    schedule_fingerprint([{"code": "B", "classNum": 2}, {"code": "A", "classNum": 1}])
+print("   ✅ Message and schedule normalization")
+
+provider = ScriptedProvider()
+brain = GemmaBrain(provider=provider)
+brain.answer_cache = TTLCache(maxsize=8, ttl=60)
+
+answer = brain.process_input("Find COP3502C sections", major_code="CPS", session=ChatSession("a"))
+calls = provider.call_count
+assert calls == 2
+again = brain.process_input("find cop3502c sections!", major_code="CPS", session=ChatSession("b"))
+assert again == answer and provider.call_count == calls
+print("   ✅ Repeated question answered with zero model calls")
+
+brain.process_input("Find COP3502C sections", major_code="MTH", session=ChatSession("c"))
+assert provider.call_count == calls + 2
+print("   ✅ Different major misses")
+
+brain.process_input("Add 10509 to my schedule", major_code="CPS", session=ChatSession("d"))
+calls = provider.call_count
+brain.process_input("Add 10509 to my schedule", major_code="CPS", session=ChatSession("e"))
+assert provider.call_count == calls + 2
+print("   ✅ Turns that change the schedule are never cached")
+
+stats = brain.cache_stats()["answer"]
+print(f"   ✅ Answer cache hit rate {stats['hit_rate']:.0%} ({stats['hits']} hits, {stats['misses']} misses)")
+
+print("\n✨ Response cache tests passed!")
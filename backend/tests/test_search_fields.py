@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Test script to verify field projection in search_catalog
+"""
+import json
+import os
+import sys
+import tempfile
+sys.path.insert(0, 'backend')
+
+import catalog
+from search import search_catalog
+
+COURSES = [{
+    "code": "COP3502C",
+    "name": "Programming Fundamentals 1",
+    "dept": "Computer & Information Science & Engineering",
+    "description": "Introduction to programming. " * 20,
+    "sections": [
+        {"classNum": 10509, "instructors": ["A"], "credits": 4, "meetTimes": [
+            {"meetDays": ["M", "W", "F"], "meetPeriodBegin": "6", "meetPeriodEnd": "6"}]},
+        {"classNum": 10510, "instructors": ["B"], "credits": 4, "meetTimes": [
+            {"meetDays": ["T"], "meetPeriodBegin": "2", "meetPeriodEnd": "3"}]},
+    ],
+}]
+
+tmp = tempfile.mkdtemp()
+catalog_path = os.path.join(tmp, "catalog.json")
+with open(catalog_path, "w") as f:
+    json.dump(COURSES, f)
+catalog.set_catalog(catalog.load_catalog(catalog_path))
+
+print("=" * 70)
+print("TESTING SEARCH FIELD PROJECTION")
+print("=" * 70)
+
+full = search_catalog(query="COP")[0]
+assert full is catalog.get_catalog().courses[0], "No projection returns the catalog entry as before"
+
+compact = search_catalog(query="COP", fields="compact")[0]
+assert compact == {"code": "COP3502C", "name": "Programming Fundamentals 1", "credits": 4, "sections_count": 2}
+print(f"   ✅ compact preset: {len(json.dumps(full))} -> {len(json.dumps(compact))} bytes")
+
+picked = search_catalog(query="COP", fields=["code", "description"], section_fields=["classNum"])[0]
+assert set(picked) == {"code", "description", "sections"}
+assert picked["sections"] == [{"classNum": 10509}, {"classNum": 10510}]
+print("   ✅ Explicit fields; section_fields brings sections along")
+
+sorted_sections = search_catalog(query="COP", sort_by="asc", section_fields="classNum,credits")[0]
+assert [s["classNum"] for s in sorted_sections["sections"]] == [10510, 10509]
+assert "description" in sorted_sections and "meetTimes" not in sorted_sections["sections"][0]
+print("   ✅ Section projection composes with time sorting")
+
+assert "sections" in full and full["sections"][0].get("meetTimes"), "The catalog is never modified"
+print("   ✅ Catalog entries untouched")
+
+print("\n✨ Search field projection tests passed!")
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test script to verify per-session chat state (memory LRU/TTL and SQLite backends)
+"""
+import os
+import sys
+import tempfile
+import time
+sys.path.insert(0, 'backend')
+
+from sessions import MemorySessionStore, SQLiteSessionStore, MAX_STORED_MESSAGES
+
+print("=" * 70)
+print("TESTING IN-MEMORY SESSION STORE")
+print("=" * 70)
+
+store = MemorySessionStore(maxsize=2, ttl=0.2)
+alice = store.get("alice")
+alice.last_major_code = "CPS"
+for i in range(20):
+    alice.recent_messages.append(("user", f"message {i}"))
+store.save(alice)
+
+bob = store.get("bob")
+assert bob.last_major_code is None, "Sessions must not share the active major"
+assert len(alice.recent_messages) == MAX_STORED_MESSAGES
+print(f"   ✅ Sessions isolated, history bounded to {MAX_STORED_MESSAGES} messages")
+
+store.get("carol")  # Evicts the least recently used session (alice)
+assert store.get("alice").last_major_code is None
+print("   ✅ LRU eviction at maxsize")
+
+time.sleep(0.25)
+assert len(store.get("bob").recent_messages) == 0
+print("   ✅ Idle sessions expire after the TTL")
+
+print("\n" + "=" * 70)
+print("TESTING SQLITE SESSION STORE")
+print("=" * 70)
+
+with tempfile.TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, "sessions.db")
+    writer = SQLiteSessionStore(path)
+    session = writer.get("abc")
+    session.last_major_code = "CPS"
+    session.last_major_rules = {"major_code": "CPS"}
+    session.recent_messages.append(("user", "hi"))
+    writer.save(session)
+
+    # A second store on the same file stands in for another gunicorn worker
+    reader = SQLiteSessionStore(path)
+    loaded = reader.get("abc")
+    assert loaded.last_major_code == "CPS"
+    assert loaded.last_major_rules == {"major_code": "CPS"}
+    assert list(loaded.recent_messages) == [("user", "hi")]
+    assert len(reader) == 1
+    print("   ✅ Session state shared across store instances")
+
+print("\n✨ Session store tests passed!")
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Test script to verify request coalescing (single-flight) for searches and solves
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+sys.path.insert(0, 'backend')
+
+os.environ.setdefault("SCHEDUGATOR_LLM", "fake")
+
+import catalog
+import metrics
+from singleflight import LeaderAborted, SingleFlight
+
+COURSES = [{"code": "COP3502C", "name": "Programming 1", "sections": [
+    {"classNum": 1, "credits": 4, "instructors": ["A"], "meetTimes": [
+        {"meetDays": ["M", "W", "F"], "meetPeriodBegin": "4", "meetPeriodEnd": "4"}]}]}]
+
+tmp = tempfile.mkdtemp()
+catalog_path = os.path.join(tmp, "catalog.json")
+with open(catalog_path, "w") as f:
+    json.dump(COURSES, f)
+catalog.set_catalog(catalog.load_catalog(catalog_path))
+
+
+def run_together(n, fn):
+    """Call fn from n threads released at the same moment; return their results."""
+    barrier = threading.Barrier(n)
+    results = [None] * n
+
+    def worker(i):
+        barrier.wait()
+        try:
+            results[i] = fn()
+        except BaseException as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def slow(calls, value, delay=0.2):
+    def fn(*args, **kwargs):
+        calls.append(args)
+        time.sleep(delay)
+        if isinstance(value, BaseException):
+            raise value
+        return value
+    return fn
+
+
+print("=" * 70)
+print("TESTING SINGLE-FLIGHT")
+print("=" * 70)
+
+flight = SingleFlight("test")
+calls = []
+shared = {"rows": [1, 2, 3]}
+results = run_together(20, lambda: flight.do("k", slow(calls, shared)))
+assert len(calls) == 1 and all(r is shared for r in results)
+assert flight.stats()["leaders"] == 1 and flight.stats()["coalesced"] == 19
+assert metrics.get("singleflight_calls_total", group="test", result="coalesced") == 19
+print("   ✅ 20 concurrent identical calls ran once and shared the result")
+
+calls.clear()
+results = run_together(5, lambda: flight.do("boom", slow(calls, ValueError("bad input"))))
+assert len(calls) == 1 and all(isinstance(r, ValueError) for r in results)
+assert flight.stats()["in_flight"] == 0
+print("   ✅ The leader's exception reaches every waiter")
+
+calls.clear()
+results = run_together(5, lambda: flight.do("abort", slow(calls, SystemExit(1))))
+assert len(calls) == 1 and sum(isinstance(r, SystemExit) for r in results) == 1
+aborted = [r for r in results if isinstance(r, LeaderAborted)]
+assert len(aborted) == 4 and isinstance(aborted[0].__cause__, SystemExit)
+assert flight.stats()["in_flight"] == 0
+print("   ✅ A leader stopped by SystemExit makes every waiter raise LeaderAborted, not return None")
+
+calls.clear()
+flight.do("k", slow(calls, shared, 0))
+flight.do("k", slow(calls, shared, 0))
+assert len(calls) == 2
+print("   ✅ Calls that don't overlap both run (not a cache)")
+
+
+async def async_checks():
+    aflight = SingleFlight("test_async")
+    runs = []
+
+    async def solve(value):
+        runs.append(value)
+        await asyncio.sleep(0.1)
+        return [value]
+
+    results = await asyncio.gather(*[aflight.ado("k", solve, "x") for _ in range(10)])
+    assert len(runs) == 1 and all(r is results[0] for r in results)
+
+    first = asyncio.ensure_future(aflight.ado("k2", solve, "y"))
+    second = asyncio.ensure_future(aflight.ado("k2", solve, "y"))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    assert await second == ["y"], "A cancelled caller doesn't cancel the shared solve"
+    assert aflight.stats()["in_flight"] == 0
+
+asyncio.run(async_checks())
+print("   ✅ Async callers on the event loop coalesce; cancellation is per caller")
+
+print("\n" + "=" * 70)
+print("TESTING COALESCED ENDPOINTS")
+print("=" * 70)
+
+import api
+
+search_calls = []
+real_search = api.search_catalog
+api.search_catalog = lambda **params: slow(search_calls, real_search(**params))()
+responses = run_together(10, lambda: api.app.test_client().get('/api/search?query=COP'))
+api.search_catalog = real_search
+assert len(search_calls) == 1 and all(r.get_json()["count"] == 1 for r in responses)
+print("   ✅ 10 simultaneous searches ran search_catalog once")
+
+solve_calls = []
+real_solve = api.solver.validate_and_solve
+api.solver.validate_and_solve = lambda codes, rules=None: slow(solve_calls, real_solve(codes, rules))()
+responses = run_together(8, lambda: api.app.test_client().post(
+    '/api/generate-schedule', json={"courses": ["COP3502C"]}))
+api.solver.validate_and_solve = real_solve
+assert len(solve_calls) == 1 and all(r.get_json()["success"] for r in responses)
+print("   ✅ 8 simultaneous identical solves ran the solver once")
+
+coalescing = api.app.test_client().get('/api/health').get_json()["services"]["coalescing"]
+assert coalescing["search"]["coalesced"] == 9 and coalescing["solve"]["coalesced"] == 7
+print(f"   ✅ /api/health reports coalescing: {coalescing['search']}")
+
+print("\n✨ Single-flight tests passed!")
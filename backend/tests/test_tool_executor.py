@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test script to verify tool calls run concurrently, deduplicated and in order
+"""
+import sys
+import time
+sys.path.insert(0, 'backend')
+
+from brain import GemmaBrain
+from llm import ScriptedProvider
+from sessions import ChatSession
+
+print("=" * 70)
+print("TESTING PARALLEL TOOL EXECUTION")
+print("=" * 70)
+
+brain = GemmaBrain(provider=ScriptedProvider())
+executed = []
+
+
+def slow_search(**params):
+    executed.append(("search_catalog", params))
+    time.sleep(0.2)
+    return {"status": "success", "results": [], "count": 0, "query": params.get("query")}
+
+
+def slow_add(classNum):
+    executed.append(("add_course", classNum))
+    time.sleep(0.2)
+    return {"status": "success", "message": f"Added {classNum}"}
+
+
+brain._tools = {"search_catalog": slow_search, "add_course": slow_add}
+
+calls = [
+    {"name": "add_course", "parameters": {"classNum": 10509}},
+    {"name": "add_course", "parameters": {"classNum": 13780}},
+    {"name": "search_catalog", "parameters": {"query": "CAP", "min_level": 4000}},
+    {"name": "search_catalog", "parameters": {"min_level": 4000, "query": "CAP"}},
+    {"name": "not_a_tool", "parameters": {}},
+]
+
+start = time.perf_counter()
+results = brain._execute_tool_calls(calls, ChatSession("test"))
+elapsed = time.perf_counter() - start
+
+assert [r["name"] for r in results] == ["add_course", "add_course", "search_catalog", "search_catalog"]
+assert results[0]["result"]["message"] == "Added 10509"
+assert results[1]["result"]["message"] == "Added 13780"
+print("   ✅ Results in the original call order, unknown tools skipped")
+
+assert len(executed) == 3, executed
+assert results[2]["result"] is results[3]["result"]
+print("   ✅ Identical calls executed once")
+
+assert elapsed < 0.35, f"took {elapsed:.2f}s"
+print(f"   ✅ 3 x 200 ms tools finished in {elapsed * 1000:.0f} ms")
+
+
+def broken_search(**params):
+    raise RuntimeError("index unavailable")
+
+
+brain._tools["search_catalog"] = broken_search
+results = brain._execute_tool_calls([{"name": "search_catalog", "parameters": {"query": "COP"}}], ChatSession("test"))
+assert results[0]["result"]["status"] == "error"
+print("   ✅ A failing tool becomes an error result")
+
+print("\n✨ Tool executor tests passed!")
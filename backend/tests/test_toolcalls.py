@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test script to verify tool-call extraction from model responses
+"""
+import json
+import random
+import sys
+import time
+sys.path.insert(0, 'backend')
+
+from toolcalls import SAMPLES, extract_tool_calls, strip_code_fences
+
+print("=" * 70)
+print("TESTING TOOL-CALL EXTRACTION")
+print("=" * 70)
+
+call = {"name": "search_catalog", "parameters": {"query": "COP3502C"}}
+assert extract_tool_calls(json.dumps(call)) == ([call], "")
+assert extract_tool_calls(json.dumps({"tool_calls": [call, call]})) == ([call, call], "")
+assert extract_tool_calls('{"tool_calls": []}') == (None, '{"tool_calls": []}')
+assert extract_tool_calls(strip_code_fences(f"```json\n{json.dumps(call)}\n```")) == ([call], "")
+assert extract_tool_calls(f"Let me check.\n{json.dumps(call)}") == ([call], "Let me check.")
+print("   ✅ Bare, wrapped, fenced and preambled calls")
+
+tricky = {"name": "search_catalog", "parameters": {"query": "weird } { \" ] [ text"}}
+assert extract_tool_calls(f'Hmm {{not json}} "a {{ quote" {json.dumps(tricky)} done')[0] == [tricky]
+assert extract_tool_calls("Sections {like 10509} meet MWF 3. [See below]") == (None, "")
+print("   ✅ Braces and quotes inside strings and prose")
+
+PROSE = ["Sure", "{", "}", "[", "]", '"', "{\"", "\\", ":", ",", "MWF 3", "{x}", "[1, 2", "COP3502C", "\n", " "]
+rng = random.Random(40)
+for _ in range(2000):
+    inserted = [{"name": rng.choice(["search_catalog", "add_course"]),
+                 "parameters": {"query": "".join(rng.choice(PROSE) for _ in range(rng.randint(0, 4)))}}
+                for _ in range(rng.randint(0, 3))]
+    parts = []
+    for c in inserted:
+        parts.append("".join(rng.choice(PROSE) for _ in range(rng.randint(0, 8))))
+        parts.append(" " + json.dumps(c) + " ")
+    parts.append("".join(rng.choice(PROSE) for _ in range(rng.randint(0, 8))))
+    text = "".join(parts)
+    calls, _ = extract_tool_calls(text)
+    # Prose may swallow a call into a larger value ('[' before it), but never invent one
+    for found in calls or []:
+        assert found in inserted, (text, found)
+    if not any(ch in "[{" for ch in parts[0]) and inserted:
+        assert calls and calls[0] == inserted[0], (text, calls)
+print("   ✅ 2000 fuzzed responses parsed without errors or invented calls")
+
+for label, text in [("'[' x 20000", "[" * 20000), ("'{' x 20000", "{" * 20000),
+                    ('\'{"a":\' x 5000', '{"a":' * 5000), ("prose x 500", SAMPLES[-1] * 20),
+                    ("'x [' x 8000", "x [" * 8000), ('\'[{"\' x 8000', '[{"' * 8000),
+                    ('\'x {"a" \' x 8000', 'x {"a" ' * 8000)]:
+    start = time.perf_counter()
+    extract_tool_calls(text)
+    elapsed = time.perf_counter() - start
+    assert elapsed < 0.5, (label, elapsed)
+    print(f"   ✅ {label}: {elapsed * 1000:.1f} ms")
+
+# Failed decodes cost O(position), so bracket-heavy prose used to be quadratic (~100 ms here)
+call = json.loads(SAMPLES[0])
+for text, expected in (("x [" * 8000, [call]), ('x {"a" ' * 8000, None)):
+    start = time.perf_counter()
+    assert extract_tool_calls(text + SAMPLES[0])[0] == expected
+    assert time.perf_counter() - start < 0.03
+assert extract_tool_calls("See [1], [2] and {\"x\"} " * 10 + '[' + SAMPLES[0] + ']')[0] == [call]
+print("   ✅ Bracket-heavy prose is linear (past the failure cap the rest is prose); "
+      "calls after ordinary brackets are still found")
+
+print("\n✨ Tool-call extraction tests passed!")
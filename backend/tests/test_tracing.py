@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test script to verify structured tracing (spans, sampling, lazy log arguments)
+"""
+import io
+import json
+import logging
+import sys
+sys.path.insert(0, 'backend')
+
+import tracing
+from brain import GemmaBrain
+from llm import ScriptedProvider
+from sessions import ChatSession
+
+print("=" * 70)
+print("TESTING TRACING")
+print("=" * 70)
+
+calls = []
+expensive = tracing.lazy(lambda: calls.append(1) or "payload")
+log = tracing.get_logger("test")
+logging.getLogger(tracing.LOGGER_NAME).setLevel(logging.INFO)
+log.debug("never formatted: %s", expensive)
+assert calls == [], "Debug arguments must not be formatted at INFO"
+print("   ✅ Lazy arguments are skipped when the level is off")
+
+seen = []
+tracing.add_span_listener(lambda name, seconds, attrs: seen.append(name))
+
+stream = io.StringIO()
+handler = logging.StreamHandler(stream)
+handler.setFormatter(tracing.JsonFormatter())
+logging.getLogger(tracing.LOGGER_NAME).addHandler(handler)
+
+with tracing.start_trace("unsampled", sampled=False):
+    with tracing.span("work"):
+        pass
+assert stream.getvalue() == "", "Unsampled fast traces are not logged"
+assert seen == ["work", "unsampled"]
+print("   ✅ Unsampled traces only reach span listeners")
+
+brain = GemmaBrain(provider=ScriptedProvider(script=[
+    '{"tool_calls": [{"name": "add_course", "parameters": {"classNum": 1}},'
+    ' {"name": "add_course", "parameters": {"classNum": 2}}]}',
+    "Added both.",
+]))
+brain._tools["add_course"] = lambda classNum: {"status": "error", "message": "not found"}
+tracing.SAMPLE_RATE = 1.0
+brain.process_input("add 1 and 2", session=ChatSession("t"))
+
+lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+turn = next(line for line in lines if line.get("trace") == "chat_turn")
+span_names = [s["name"] for s in turn["spans"]]
+assert span_names.count("model_call") == 2
+assert "parse_tool_calls" in span_names and "tools" in span_names
+assert span_names.count("tool_call") == 2, "Spans from pool threads join the request's trace"
+print(f"   ✅ Sampled turn logged as one JSON line: {span_names}")
+
+print("\n✨ Tracing tests passed!")
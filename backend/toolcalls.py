@@ -0,0 +1,160 @@
+"""
+Tool-call extraction from model responses.
+
+The model is asked to answer with bare JSON when it calls tools, but in
+practice responses also come as JSON after some prose, wrapped in code
+fences, several objects in a row, or prose that merely contains braces.
+extract_tool_calls scans the text once: at each '{' or '[' it lets
+json.JSONDecoder.raw_decode parse the value (so braces and quotes inside
+strings are handled), and on failure resumes at the error position, so no
+character is parsed more than a bounded number of times. Only a '[' that
+opens with an object is tried, and the scan gives up after
+MAX_FAILED_DECODES failures: each failure costs time proportional to its
+position (json builds the error's line and column), so bracket-heavy prose
+would otherwise take quadratic time.
+
+    python backend/toolcalls.py --bench [--samples captured.jsonl] [--repeat 2000]
+
+times extraction over representative responses, or over captured ones
+(JSON lines with a "text" field).
+"""
+
+import argparse
+import json
+import re
+import time
+
+_decoder = json.JSONDecoder()
+# An object worth decoding opens with a key or is empty; a list of calls opens with an object
+_VALUE_START_RE = re.compile(r'\{(?=\s*["}])|\[(?=\s*\{)')
+# Failed decodes per response before the rest is treated as prose
+MAX_FAILED_DECODES = 64
+FENCE_START_RE = re.compile(r'^\s*```(?:json)?\s*')
+FENCE_END_RE = re.compile(r'\s*```\s*$')
+EMPTY_TOOL_CALLS_RE = re.compile(r'^\s*{\s*"tool_calls"\s*:\s*\[\s*\]\s*}\s*$')
+
+
+def strip_code_fences(text):
+    """Drop a ```json ... ``` wrapper around the whole response."""
+    return FENCE_END_RE.sub('', FENCE_START_RE.sub('', text))
+
+
+def _calls_in(value):
+    """Tool calls carried by one decoded JSON value, or None if it isn't a tool call."""
+    if isinstance(value, dict):
+        if isinstance(value.get("tool_calls"), list):
+            return [call for call in value["tool_calls"] if isinstance(call, dict)]
+        if "name" in value:
+            return [value]
+        # Occasional malformed form: {"tool_call": {"name": ..., "parameters": ...}}
+        if isinstance(value.get("tool_call"), dict) and "name" in value["tool_call"]:
+            return [value["tool_call"]]
+        return None
+    if isinstance(value, list) and value and all(isinstance(v, dict) and "name" in v for v in value):
+        return value
+    return None
+
+
+def extract_tool_calls(text):
+    """Return (calls, preamble): the tool calls in a response (None if there are
+    none) and the text before the first of them. A response that is exactly
+    {"tool_calls": []} returns (None, text)."""
+    stripped = text.strip()
+
+    # Fast path: the whole response is one JSON value
+    if stripped[:1] in ("{", "["):
+        try:
+            value, end = _decoder.raw_decode(stripped)
+        except (json.JSONDecodeError, RecursionError):
+            value, end = None, 0
+        if end == len(stripped):
+            if isinstance(value, dict) and value.get("tool_calls") == []:
+                return None, text
+            calls = _calls_in(value)
+            if calls:
+                return calls, ""
+
+    calls = []
+    preamble_end = None
+    failures = 0
+    pos = 0
+    length = len(text)
+    while pos < length:
+        match = _VALUE_START_RE.search(text, pos)
+        if not match:
+            break
+        start = match.start()
+        try:
+            value, end = _decoder.raw_decode(text, start)
+        except json.JSONDecodeError as e:
+            failures += 1
+            if failures >= MAX_FAILED_DECODES:
+                break
+            # An object that fails part-way resumes at the failure point instead of
+            # start + 1, so its contents aren't parsed again. ('[{' may fail as a
+            # list and still hold a call, so it resumes at the '{'.)
+            pos = max(start + 1, e.pos) if text[start] == '{' else start + 1
+            continue
+        except RecursionError:
+            # Nesting deeper than the interpreter allows: not a tool call, and
+            # nothing after it can be top-level either
+            break
+        found = _calls_in(value)
+        if found:
+            if preamble_end is None:
+                preamble_end = start
+            calls.extend(found)
+        # Skip past the whole value either way: top-level values only
+        pos = end
+
+    preamble = text[:preamble_end].strip() if preamble_end else ""
+    return (calls or None), preamble
+
+
+SAMPLES = [
+    '{"name": "search_catalog", "parameters": {"query": "COP3502C"}}',
+    '{"tool_calls": [{"name": "add_course", "parameters": {"classNum": 10509}}, '
+    '{"name": "add_course", "parameters": {"classNum": 13780}}]}',
+    'Sure! Let me look that up for you.\n{"name": "search_catalog", "parameters": '
+    '{"queries": ["COP", "CIS", "CAP"], "min_level": 3000}}',
+    '```json\n{"name": "search_catalog", "parameters": {"diversity": true}}\n```',
+    '{"tool_calls": []}',
+    'COP3502C (Programming Fundamentals 1) has sections 10509 (MWF 4) and 10510 (TR 2-3). '
+    'Would you prefer morning or afternoon sections?',
+    'Here are options {like these} with "quotes" and {"braces": "inside {strings}"}. '
+    + 'Section 12345 meets MWF 3. ' * 40,
+]
+
+
+def benchmark(samples, repeat=2000):
+    """Microseconds per extraction for each sample."""
+    timings = []
+    for text in samples:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            extract_tool_calls(text)
+        timings.append((time.perf_counter() - start) / repeat * 1e6)
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Microbenchmark tool-call extraction")
+    parser.add_argument('--bench', action='store_true', help='Run the benchmark')
+    parser.add_argument('--samples', help='JSON lines of captured responses ({"text": ...})')
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    samples = SAMPLES
+    if args.samples:
+        with open(args.samples) as f:
+            samples = [json.loads(line)["text"] for line in f if line.strip()]
+
+    timings = benchmark(samples, args.repeat)
+    for text, micros in zip(samples, timings):
+        label = text[:50].replace("\n", " ")
+        print(f"   {micros:8.1f} µs  {len(text):6} chars  {label}")
+    print(f"   ⏱️  mean {sum(timings) / len(timings):.1f} µs over {len(samples)} samples")
+
+
+if __name__ == '__main__':
+    main()
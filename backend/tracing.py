@@ -0,0 +1,199 @@
+"""
+Logging and per-request tracing for the request path.
+
+    log = get_logger(__name__)
+    log.debug("🧠 Raw model response: %s", text)          # formatted only if emitted
+    log.debug("🔧 Tool results: %s", lazy(json.dumps, results))
+
+    with start_trace("chat_turn", major=code) as t:
+        with span("model_call", purpose="initial"):
+            ...
+
+Spans cost two perf_counter() calls and a list append, so they stay on in
+production. A finished trace is logged as one structured line when it is
+sampled (SCHEDUGATOR_TRACE_SAMPLE, fraction of traces, default 0.05) or
+slower than SCHEDUGATOR_TRACE_SLOW_MS (default 5000). Span listeners
+(add_span_listener) see every span regardless of sampling.
+
+Settings: SCHEDUGATOR_LOG_LEVEL (default INFO), SCHEDUGATOR_LOG_FORMAT
+("text" or "json").
+"""
+
+import contextvars
+import json
+import logging
+import os
+import random
+import sys
+import time
+import uuid
+
+LOGGER_NAME = "schedugator"
+
+_current = contextvars.ContextVar("schedugator_trace", default=None)
+_listeners = []
+_configured = False
+
+
+class lazy:
+    """Defer an expensive log argument until the record is actually formatted."""
+
+    __slots__ = ('func', 'args')
+
+    def __init__(self, func, *args):
+        self.func = func
+        self.args = args
+
+    def __str__(self):
+        return str(self.func(*self.args))
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        trace = _current.get()
+        if trace is not None and "trace_id" not in entry:
+            entry["trace_id"] = trace.trace_id
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure(level=None, fmt=None):
+    """Attach a stdout handler to the schedugator logger (once per process)."""
+    global _configured
+    if _configured:
+        return
+    _configured = True
+    level = level or os.getenv("SCHEDUGATOR_LOG_LEVEL", "INFO")
+    fmt = fmt or os.getenv("SCHEDUGATOR_LOG_FORMAT", "text")
+
+    handler = logging.StreamHandler(sys.stdout)
+    if fmt == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.addHandler(handler)
+    logger.setLevel(level.upper())
+    logger.propagate = False
+
+
+def get_logger(name):
+    """Logger under the schedugator namespace (brain.py -> schedugator.brain)."""
+    configure()
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+_log = get_logger("trace")
+SAMPLE_RATE = float(os.getenv("SCHEDUGATOR_TRACE_SAMPLE", 0.05))
+SLOW_SECONDS = float(os.getenv("SCHEDUGATOR_TRACE_SLOW_MS", 5000)) / 1000
+
+
+def add_span_listener(listener):
+    """Call listener(name, seconds, attrs) for every finished span, sampled or not."""
+    _listeners.append(listener)
+
+
+class Span:
+    __slots__ = ('trace', 'name', 'attrs', 'start')
+
+    def __init__(self, trace, name, attrs):
+        self.trace = trace
+        self.name = name
+        self.attrs = attrs
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.start
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        if self.trace is not None:
+            self.trace.spans.append((self.name, self.start, seconds, self.attrs))
+        for listener in _listeners:
+            listener(self.name, seconds, self.attrs)
+        return False
+
+
+class Trace:
+    """Spans of one request; logged as a single line when sampled or slow."""
+
+    __slots__ = ('name', 'trace_id', 'attrs', 'spans', 'start', 'sampled', '_previous')
+
+    def __init__(self, name, sampled=None, **attrs):
+        self.name = name
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.attrs = attrs
+        self.spans = []
+        self.start = time.perf_counter()
+        self.sampled = random.random() < SAMPLE_RATE if sampled is None else sampled
+        self._previous = None
+
+    def __enter__(self):
+        self._previous = _current.get()
+        _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # set() rather than reset(): generator-based turns may exit in another context
+        _current.set(self._previous)
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.finish()
+        return False
+
+    def span(self, name, **attrs):
+        return Span(self, name, attrs)
+
+    def finish(self):
+        seconds = time.perf_counter() - self.start
+        for listener in _listeners:
+            listener(self.name, seconds, self.attrs)
+        if (self.sampled or seconds >= SLOW_SECONDS) and _log.isEnabledFor(logging.INFO):
+            summary = self.summary(seconds)
+            _log.info("%s %s %.0fms %s", self.name, self.trace_id, seconds * 1000,
+                      lazy(_spans_text, summary["spans"]), extra={"fields": summary})
+
+    def summary(self, seconds=None):
+        seconds = time.perf_counter() - self.start if seconds is None else seconds
+        return {
+            "trace": self.name,
+            "trace_id": self.trace_id,
+            "ms": round(seconds * 1000, 1),
+            **self.attrs,
+            "spans": [
+                {"name": name, "at_ms": round((start - self.start) * 1000, 1),
+                 "ms": round(duration * 1000, 1), **attrs}
+                for name, start, duration, attrs in self.spans
+            ],
+        }
+
+
+def _spans_text(spans):
+    return " ".join(f"{s['name']}={s['ms']}ms" for s in spans)
+
+
+def start_trace(name, sampled=None, **attrs):
+    """New trace that becomes current inside its `with` block."""
+    return Trace(name, sampled=sampled, **attrs)
+
+
+def current_trace():
+    return _current.get()
+
+
+def span(name, **attrs):
+    """Time a block within the current trace (still reported to listeners without one)."""
+    return Span(_current.get(), name, attrs)
@@ -205,15 +205,24 @@ export function App() {
           classNum: c.classNum || 0,
         })) || [];
       
-      const chatResponse = await api.chat(message, store.selectedMajor, majorCode, currentCourses);
-      
+      // The AI message fills in as the answer streams; the final text replaces it when done
       const aiMsg: ChatMessage = {
         id: generateId(),
         type: 'ai',
-        content: chatResponse.response,
+        content: '',
         timestamp: new Date(),
       };
       store.addMessage(aiMsg);
+      let streamedText = '';
+      const chatResponse = await api.chatStream(message, (event) => {
+        if (event.event === 'token' && event.text) {
+          streamedText += event.text;
+          store.updateMessage(aiMsg.id, streamedText);
+        } else if (event.event === 'tool_start' && !streamedText) {
+          store.updateMessage(aiMsg.id, '🔍 Checking the catalog…');
+        }
+      }, store.selectedMajor, majorCode, currentCourses);
+      store.updateMessage(aiMsg.id, chatResponse.response);
       
       // Check if any courses were added
       if (chatResponse.added_courses && chatResponse.added_courses.length > 0) {
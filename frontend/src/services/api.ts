@@ -59,6 +59,18 @@ export interface ChatResponse {
     meetTimes: MeetTime[];
     dept?: string;
   }>;
+  session_id?: string;
+}
+
+export interface ChatStreamEvent {
+  event: 'session' | 'token' | 'tool_start' | 'tool_result' | 'courses_added' | 'done' | 'error';
+  session_id?: string;
+  text?: string;
+  calls?: Array<{ name: string; parameters: Record<string, unknown> }>;
+  name?: string;
+  courses?: ChatResponse['added_courses'];
+  courses_added?: ChatResponse['added_courses'];
+  message?: string;
 }
 
 export interface SearchResponse {
@@ -87,11 +99,16 @@ export interface HealthResponse {
 
 // ==================== API Client ====================
 
+const SESSION_STORAGE_KEY = 'schedugator_session_id';
+
 class ApiClient {
   private baseUrl: string;
+  private sessionId: string | null;
 
   constructor(baseUrl: string = API_BASE_URL) {
     this.baseUrl = baseUrl;
+    // Chat history and active major are kept per session on the backend
+    this.sessionId = sessionStorage.getItem(SESSION_STORAGE_KEY);
   }
 
   private async request<T>(
@@ -104,6 +121,7 @@ class ApiClient {
       ...options,
       headers: {
         'Content-Type': 'application/json',
+        ...(this.sessionId ? { 'X-Session-Id': this.sessionId } : {}),
         ...options.headers,
       },
     };
@@ -115,7 +133,12 @@ class ApiClient {
         throw new Error(`API Error: ${response.status} ${response.statusText}`);
       }
 
-      return await response.json();
+      const data = await response.json();
+      if (data && typeof data.session_id === 'string' && data.session_id !== this.sessionId) {
+        this.sessionId = data.session_id;
+        sessionStorage.setItem(SESSION_STORAGE_KEY, data.session_id);
+      }
+      return data;
     } catch (error) {
       console.error('API request failed:', error);
       throw error;
@@ -135,6 +158,68 @@ class ApiClient {
     });
   }
 
+  // Chat with AI, streaming events (Server-Sent Events) as the answer is produced.
+  // Resolves with the same shape as chat() once the turn is done.
+  async chatStream(
+    message: string,
+    onEvent: (event: ChatStreamEvent) => void,
+    major?: string,
+    majorCode?: string,
+    currentCourses?: Array<{code: string; name: string; classNum: number}>
+  ): Promise<ChatResponse> {
+    const response = await fetch(`${this.baseUrl}/chat/stream`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        ...(this.sessionId ? { 'X-Session-Id': this.sessionId } : {}),
+      },
+      body: JSON.stringify({ message, major, major_code: majorCode, current_courses: currentCourses }),
+    });
+    if (!response.ok || !response.body) {
+      throw new Error(`API Error: ${response.status} ${response.statusText}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let result: ChatResponse | null = null;
+
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      // Frames are separated by a blank line; keep any partial frame for the next read
+      const frames = buffer.split('\n\n');
+      buffer = frames.pop() || '';
+      for (const frame of frames) {
+        const dataLine = frame.split('\n').find((line) => line.startsWith('data: '));
+        if (!dataLine) continue; // keep-alive comment
+        const event: ChatStreamEvent = JSON.parse(dataLine.slice('data: '.length));
+
+        if (event.event === 'session' && event.session_id && event.session_id !== this.sessionId) {
+          this.sessionId = event.session_id;
+          sessionStorage.setItem(SESSION_STORAGE_KEY, event.session_id);
+        } else if (event.event === 'done') {
+          result = {
+            response: event.text || '',
+            status: 'success',
+            added_courses: event.courses_added || [],
+            session_id: this.sessionId || undefined,
+          };
+        } else if (event.event === 'error') {
+          throw new Error(event.message || 'Chat stream failed');
+        }
+        onEvent(event);
+      }
+    }
+
+    if (!result) {
+      throw new Error('Chat stream ended before the answer was complete');
+    }
+    return result;
+  }
+
   // Search Courses
   async searchCourses(params: {
     query?: string;
@@ -143,11 +228,17 @@ class ApiClient {
     max_level?: number;
     is_ai?: boolean;
     sort_by?: 'asc' | 'desc';
+    fields?: string; // 'compact' or comma-separated course fields
+    section_fields?: string;
   }): Promise<SearchResponse> {
-    return this.request<SearchResponse>('/search', {
-      method: 'POST',
-      body: JSON.stringify(params),
+    // GET so the browser cache can revalidate repeat searches (304 via ETag)
+    const query = new URLSearchParams();
+    Object.entries(params).forEach(([key, value]) => {
+      if (value !== undefined && value !== null) {
+        query.set(key, String(value));
+      }
     });
+    return this.request<SearchResponse>(`/search?${query.toString()}`);
   }
 
   // Generate Schedule
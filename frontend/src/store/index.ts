@@ -17,6 +17,7 @@ interface ScheduleStore extends UIState {
   // Chat
   messages: ChatMessage[];
   addMessage: (message: ChatMessage) => void;
+  updateMessage: (id: string, content: string) => void;
   clearMessages: () => void;
   
   // Get computed values
@@ -80,6 +81,11 @@ export const useScheduleStore = create<ScheduleStore>((set, get) => ({
       messages: [...state.messages, message],
     })),
 
+  updateMessage: (id, content) =>
+    set((state) => ({
+      messages: state.messages.map((m) => (m.id === id ? { ...m, content } : m)),
+    })),
+
   clearMessages: () =>
     set({ messages: [] }),
 